@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for the option_analyzer layers
+
+Each target is imported in a fresh interpreter, so the timings are cold
+process start costs as paid by short-lived workers. Light targets must not
+load any of the heavy modules; --check turns that into the exit status.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')
+
+HEAVY_MODULES = ("matplotlib", "scipy.stats")
+
+# Target module -> whether it has to stay free of HEAVY_MODULES
+TARGETS = {
+    "option_analyzer": True,
+    "option_analyzer.pricing": True,
+    "option_analyzer.strategies": True,
+    "option_analyzer.factory": True,
+    "option_analyzer.analytics": True,
+    "option_analyzer.visualization": True,
+    "option_analyzer.visualization.visualization_engine": False,
+}
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds,
+                  "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def probe(module: str):
+    """Import module in a fresh interpreter; returns (seconds, heavy modules loaded)"""
+    env = dict(os.environ, PYTHONPATH=SRC_DIR, MPLBACKEND="Agg")
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return result["seconds"], result["loaded"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold import time of the option_analyzer layers")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per target (default: 5)")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit with status 1 if a light target loads a heavy module")
+    args = parser.parse_args()
+
+    violations = []
+    print(f"{'module':<50} {'median ms':>10} {'min ms':>8}  heavy modules loaded")
+    for module, light in TARGETS.items():
+        runs = [probe(module) for _ in range(args.repeat)]
+        seconds = [run[0] for run in runs]
+        loaded = runs[-1][1]
+        print(f"{module:<50} {statistics.median(seconds) * 1e3:>10.1f} "
+              f"{min(seconds) * 1e3:>8.1f}  {', '.join(loaded) or '-'}")
+        if light and loaded:
+            violations.append((module, loaded))
+
+    for module, loaded in violations:
+        print(f"❌ {module} loads {', '.join(loaded)}")
+    if args.check and violations:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark the normal CDF/PDF kernels against scipy.stats.norm
+
+Times scalar calls (the hedge CLI and scalar Black-Scholes path), array
+calls, and the end-to-end scalar call delta, and reports the accuracy of
+both kernel paths against scipy.stats.norm.
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+from scipy.stats import norm
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from option_analyzer.pricing import BlackScholesCalculator, GreeksCalculator, norm_cdf, norm_pdf
+
+
+def per_call_us(stmt, number: int) -> float:
+    """Best-of-5 microseconds per call of stmt"""
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Normal CDF/PDF kernel benchmark")
+    parser.add_argument("--number", type=int, default=20000, help="Scalar calls per timing (default: 20000)")
+    parser.add_argument("--size", type=int, default=100000, help="Array length (default: 100000)")
+    args = parser.parse_args()
+
+    x = 0.37
+    xs = np.random.default_rng(0).normal(size=args.size)
+    greeks = GreeksCalculator()
+    pricer = BlackScholesCalculator()
+    rows = [
+        ("scalar cdf", lambda: norm.cdf(x), lambda: norm_cdf(x), args.number),
+        ("scalar pdf", lambda: norm.pdf(x), lambda: norm_pdf(x), args.number),
+        (f"array cdf ({args.size})", lambda: norm.cdf(xs), lambda: norm_cdf(xs), 20),
+        (f"array pdf ({args.size})", lambda: norm.pdf(xs), lambda: norm_pdf(xs), 20),
+        ("call delta", lambda: float(greeks.calculate_delta(100.0, 105.0, 0.25, 0.05, 0.2, True)),
+         lambda: greeks.calculate_call_delta(100.0, 105.0, 0.25, 0.05, 0.2), args.number // 4),
+        ("scalar call price", lambda: pricer.calculate_call_prices(100.0, 105.0, 0.25, 0.05, 0.2),
+         lambda: pricer.calculate_call_price(100.0, 105.0, 0.25, 0.05, 0.2), args.number // 4),
+    ]
+
+    print(f"{'kernel':<24} {'baseline us':>12} {'kernel us':>10} {'speedup':>8}")
+    for name, baseline, kernel, number in rows:
+        before, after = per_call_us(baseline, number), per_call_us(kernel, number)
+        print(f"{name:<24} {before:>12.2f} {after:>10.2f} {before / after:>7.1f}x")
+    print("(call delta and scalar call price baselines are the array API on one element)")
+
+    grid = np.linspace(-37, 37, 20001)
+    reference_cdf, reference_pdf = norm.cdf(grid), norm.pdf(grid)
+    scalar_cdf = np.array([norm_cdf(float(v)) for v in grid])
+    scalar_pdf = np.array([norm_pdf(float(v)) for v in grid])
+    print("\nAccuracy on [-37, 37] against scipy.stats.norm (max abs / max rel error)")
+    for name, values, reference in (("scalar cdf", scalar_cdf, reference_cdf),
+                                    ("array cdf", norm_cdf(grid), reference_cdf),
+                                    ("scalar pdf", scalar_pdf, reference_pdf),
+                                    ("array pdf", norm_pdf(grid), reference_pdf)):
+        error = np.abs(values - reference)
+        print(f"{name:<12} {error.max():.2e} / {(error / reference).max():.2e}")
+
+
+if __name__ == "__main__":
+    main()
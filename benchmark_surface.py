@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark PnLSurface lookups against exact Black-Scholes pricing
+
+Times warm batch and single-point queries of a strategy's P&L surface
+against pricing the same points through its LegTable, and reports the
+interpolation error. Points in blocks that could not reach tolerance
+(strikes close to expiry) are priced exactly either way, so the batch
+speedup shrinks with their share. --check exits with status 1 if the
+surface is slower than exact pricing on either query, beyond TIMING_NOISE.
+Single-leg Black-Scholes strategies get an exact_only surface, which is
+exact pricing by construction, so there is nothing to compare.
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from option_analyzer import PnLSurface, StrategyFactory
+
+# Relative timing jitter tolerated by --check between two equally fast calls
+TIMING_NOISE = 0.05
+
+
+def per_call_ms(stmt, number: int) -> float:
+    """Best-of-5 milliseconds per call of stmt"""
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description="P&L surface lookup benchmark")
+    parser.add_argument("--strategy", default="S22", help="Strategy code (default: S22)")
+    parser.add_argument("--size", type=int, default=20000, help="Points per batch query (default: 20000)")
+    parser.add_argument("--number", type=int, default=2000, help="Single-point calls per timing (default: 2000)")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit with status 1 if the surface is slower than exact pricing")
+    args = parser.parse_args()
+
+    strategy = StrategyFactory().create_strategy(args.strategy)
+    surface = PnLSurface(strategy)
+    rng = np.random.default_rng(0)
+    S = rng.uniform(0.6, 1.4, args.size) * strategy.base_price
+    tau = rng.uniform(0, strategy.time_to_expiration, args.size)
+    sigma = rng.uniform(0.1, 0.6, args.size)
+    point = (np.array([1.2 * strategy.base_price]), np.array([strategy.time_to_expiration / 2]),
+             np.array([strategy.volatility]))
+    if surface.exact_only:
+        print(f"{args.strategy} has {surface.legs.n_legs} leg(s) on the Black-Scholes pricer: "
+              f"the surface prices every query exactly")
+        return
+    surface.pnl(S, tau, sigma)  # build every block the queries touch
+
+    rows = [
+        (f"batch ({args.size})", lambda: surface._exact(S, tau, sigma), lambda: surface.pnl(S, tau, sigma), 20),
+        ("single point", lambda: surface._exact(*point), lambda: surface.pnl(*point), args.number),
+    ]
+    print(f"{'query':<16} {'exact ms':>10} {'surface ms':>11} {'speedup':>8}")
+    speedups = []
+    for name, exact, lookup, number in rows:
+        before, after = per_call_ms(exact, number), per_call_ms(lookup, number)
+        speedups.append(before / after)
+        print(f"{name:<16} {before:>10.4f} {after:>11.4f} {before / after:>7.1f}x")
+
+    error = np.abs(surface.pnl(S, tau, sigma) - surface._exact(S, tau, sigma))
+    exact_blocks = sum(values is None for values in surface._blocks.values())
+    print(f"\nMax abs error {error.max():.2e} (tolerance {surface.tolerance:g}); "
+          f"{exact_blocks} of {len(surface._blocks)} blocks priced exactly")
+    if args.check and min(speedups) < 1 - TIMING_NOISE:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
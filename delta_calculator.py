@@ -1,44 +1,104 @@
 import math
-from scipy.stats import norm
+import os
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+# Add the src directory to Python path so the shared pricing engine is importable
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from option_analyzer.pricing import GreeksCalculator, ImpliedVolatilityCalculator
+
+# TQQQ is 3x leveraged: it moves 3% for every 1% QQQ move. A leverage_ratio
+# is in TQQQ dollars per QQQ dollar, i.e. 3 * TQQQ price / QQQ price (see
+# dollar_leverage_ratio). As a leverage_ratio, 3.0 is the legacy point-for-point
+# ratio, which is only right when TQQQ and QQQ trade at the same price.
+LEVERAGE_RATIO = 3.0
+
+# Hedge options with a smaller |delta| get a zero quantity instead of a division by ~0
+MIN_HEDGE_DELTA = 1e-10
+
+# Result of OptionCalculator.calculate_book_hedge. Per TQQQ line: line_deltas.
+# Per QQQ candidate: quantities (exact), contracts (rounded) and residual_delta
+# (book delta left after trading contracts of that candidate alone).
+BookHedge = namedtuple("BookHedge", ["quantities", "contracts", "residual_delta", "book_delta",
+                                     "line_deltas", "hedge_deltas"])
+
+# Result of OptionCalculator.calculate_hedge_quantities: one entry per position
+LineHedges = namedtuple("LineHedges", ["quantities", "tqqq_deltas", "qqq_deltas"])
+
+
+def dollar_leverage_ratio(tqqq_price, qqq_price, leverage=LEVERAGE_RATIO):
+    """Instantaneous TQQQ dollars per QQQ dollar of a daily-reset fund: leverage * TQQQ / QQQ"""
+    return leverage * np.asarray(tqqq_price, dtype=float) / np.asarray(qqq_price, dtype=float)
 
 
 class OptionCalculator:
     """Calculator for option Greeks and hedging ratios between QQQ and TQQQ"""
     
+    def __init__(self):
+        self.greeks_calculator = GreeksCalculator()
+        self.iv_calculator = ImpliedVolatilityCalculator(self.greeks_calculator.pricer)
+    
     def calculate_call_delta(self, underlying_price, strike_price, time_to_expiry, risk_free_rate, volatility):
         """Calculate call option delta using Black-Scholes formula"""
         if time_to_expiry <= 0:
             return 1.0 if underlying_price > strike_price else 0.0
-            
-        d1 = (math.log(underlying_price / strike_price) + 
-              (risk_free_rate + 0.5 * volatility**2) * time_to_expiry) / (volatility * math.sqrt(time_to_expiry))
         
-        return norm.cdf(d1)
+        return self.greeks_calculator.calculate_call_delta(
+            float(underlying_price), float(strike_price), float(time_to_expiry),
+            float(risk_free_rate), float(volatility)
+        )
     
     def calculate_put_delta(self, underlying_price, strike_price, time_to_expiry, risk_free_rate, volatility):
         """Calculate put option delta using Black-Scholes formula"""
         call_delta = self.calculate_call_delta(underlying_price, strike_price, time_to_expiry, risk_free_rate, volatility)
         return call_delta - 1.0
     
+    def calculate_implied_volatility(self, option_price, underlying_price, strike_price, time_to_expiry,
+                                     risk_free_rate, option_type):
+        """Back out the Black-Scholes implied volatility of a quoted option price"""
+        volatility = float(self.iv_calculator.calculate_implied_volatility(
+            option_price, underlying_price, strike_price, time_to_expiry, risk_free_rate,
+            option_type.lower() == 'call'
+        ))
+        if math.isnan(volatility):
+            raise ValueError(f"No implied volatility for {option_type} price {option_price} "
+                             f"(underlying {underlying_price}, strike {strike_price})")
+        return volatility
+    
     def calculate_hedge_quantity(self, tqqq_price, tqqq_strike, tqqq_quantity, tqqq_option_type,
                                qqq_price, qqq_strike, qqq_option_type, time_to_expiry, 
-                               risk_free_rate, volatility):
-        """Calculate required QQQ hedge quantity for TQQQ position to maintain delta neutrality"""
+                               risk_free_rate, volatility, tqqq_volatility=None, qqq_volatility=None,
+                               leverage_ratio=None):
+        """Calculate required QQQ hedge quantity for TQQQ position to maintain delta neutrality
+        
+        tqqq_volatility / qqq_volatility override the shared volatility per leg,
+        e.g. with implied volatilities from calculate_implied_volatility.
+        leverage_ratio is the TQQQ dollar move per QQQ dollar move, e.g.
+        dollar_leverage_ratio(tqqq_price, qqq_price) or a horizon hedge ratio
+        from leveraged_etf.LeveragedETFModel. The default LEVERAGE_RATIO = 3.0
+        is the legacy point-for-point ratio: at TQQQ 45 / QQQ 370 it
+        overhedges about 8x.
+        """
+        tqqq_vol = volatility if tqqq_volatility is None else tqqq_volatility
+        qqq_vol = volatility if qqq_volatility is None else qqq_volatility
+        
         # Calculate TQQQ option delta
         if tqqq_option_type.lower() == 'call':
-            tqqq_delta = self.calculate_call_delta(tqqq_price, tqqq_strike, time_to_expiry, risk_free_rate, volatility)
+            tqqq_delta = self.calculate_call_delta(tqqq_price, tqqq_strike, time_to_expiry, risk_free_rate, tqqq_vol)
         else:
-            tqqq_delta = self.calculate_put_delta(tqqq_price, tqqq_strike, time_to_expiry, risk_free_rate, volatility)
+            tqqq_delta = self.calculate_put_delta(tqqq_price, tqqq_strike, time_to_expiry, risk_free_rate, tqqq_vol)
         
         # Calculate QQQ option delta
         if qqq_option_type.lower() == 'call':
-            qqq_delta = self.calculate_call_delta(qqq_price, qqq_strike, time_to_expiry, risk_free_rate, volatility)
+            qqq_delta = self.calculate_call_delta(qqq_price, qqq_strike, time_to_expiry, risk_free_rate, qqq_vol)
         else:
-            qqq_delta = self.calculate_put_delta(qqq_price, qqq_strike, time_to_expiry, risk_free_rate, volatility)
+            qqq_delta = self.calculate_put_delta(qqq_price, qqq_strike, time_to_expiry, risk_free_rate, qqq_vol)
         
-        # TQQQ is 3x leveraged, so 1 point move in NDX100 = 3 points in TQQQ, 1 point in QQQ
         # Leverage adjustment factor
-        leverage_ratio = 3.0
+        leverage_ratio = LEVERAGE_RATIO if leverage_ratio is None else leverage_ratio
         
         # Calculate total delta exposure from TQQQ position
         tqqq_total_delta = tqqq_quantity * tqqq_delta * leverage_ratio
@@ -46,9 +106,82 @@ class OptionCalculator:
         # Calculate required QQQ quantity to neutralize this delta
         # We want: tqqq_total_delta + qqq_quantity * qqq_delta = 0
         # So: qqq_quantity = -tqqq_total_delta / qqq_delta
-        if abs(qqq_delta) < 1e-10:  # Avoid division by zero
+        if abs(qqq_delta) < MIN_HEDGE_DELTA:
             return 0.0
             
         qqq_hedge_quantity = -tqqq_total_delta / qqq_delta
         
-        return qqq_hedge_quantity 
\ No newline at end of file
+        return qqq_hedge_quantity
+    
+    def calculate_hedge_quantities(self, tqqq_prices, tqqq_strikes, tqqq_quantities, tqqq_option_types,
+                                   qqq_prices, qqq_strikes, qqq_option_types, times_to_expiry,
+                                   risk_free_rates, volatilities, tqqq_volatilities=None,
+                                   qqq_volatilities=None, qqq_times_to_expiry=None, leverage_ratio=None):
+        """calculate_hedge_quantity for arrays of independent positions, one hedge per position
+        
+        Every argument broadcasts against the others; option types are
+        'call'/'put' strings or booleans (True for calls). qqq_times_to_expiry
+        gives the hedge options their own expiries (default: times_to_expiry).
+        leverage_ratio is as in calculate_hedge_quantity and may be an array;
+        it defaults to dollar_leverage_ratio(tqqq_prices, qqq_prices).
+        """
+        tqqq_deltas = self._deltas(tqqq_prices, tqqq_strikes, times_to_expiry, risk_free_rates,
+                                   volatilities if tqqq_volatilities is None else tqqq_volatilities,
+                                   tqqq_option_types)
+        qqq_deltas = self._deltas(qqq_prices, qqq_strikes,
+                                  times_to_expiry if qqq_times_to_expiry is None else qqq_times_to_expiry,
+                                  risk_free_rates,
+                                  volatilities if qqq_volatilities is None else qqq_volatilities,
+                                  qqq_option_types)
+        tqqq_total_deltas, qqq_deltas = np.broadcast_arrays(
+            np.asarray(tqqq_quantities, dtype=float) * tqqq_deltas
+            * (dollar_leverage_ratio(tqqq_prices, qqq_prices) if leverage_ratio is None
+               else np.asarray(leverage_ratio, dtype=float)),
+            qqq_deltas
+        )
+        hedgeable = np.abs(qqq_deltas) >= MIN_HEDGE_DELTA
+        quantities = np.zeros(qqq_deltas.shape)
+        quantities[hedgeable] = -tqqq_total_deltas[hedgeable] / qqq_deltas[hedgeable]
+        return LineHedges(quantities, tqqq_deltas, qqq_deltas)
+    
+    def calculate_book_hedge(self, tqqq_price, tqqq_strikes, tqqq_quantities, tqqq_option_types,
+                             tqqq_expiries, qqq_price, qqq_strikes, qqq_option_types, qqq_expiries,
+                             risk_free_rate, volatility, tqqq_volatilities=None, qqq_volatilities=None,
+                             leverage_ratio=None):
+        """Net the delta of a whole TQQQ option book and size each QQQ candidate against it
+        
+        tqqq_strikes, tqqq_quantities, tqqq_option_types ('call'/'put', or True for calls) and
+        tqqq_expiries (years) are per-line arrays; the qqq_* arrays describe
+        candidate hedge options. Volatility arrays override the shared
+        volatility per line or candidate. Every delta is computed in one
+        vectorized call per side, and each candidate's quantity is what
+        calculate_hedge_quantity would return for the netted book. leverage_ratio
+        defaults to dollar_leverage_ratio(tqqq_price, qqq_price).
+        """
+        tqqq_deltas = self._deltas(tqqq_price, tqqq_strikes, tqqq_expiries, risk_free_rate,
+                                   volatility if tqqq_volatilities is None else tqqq_volatilities,
+                                   tqqq_option_types)
+        if leverage_ratio is None:
+            leverage_ratio = dollar_leverage_ratio(tqqq_price, qqq_price)
+        line_deltas = np.asarray(tqqq_quantities, dtype=float) * tqqq_deltas * leverage_ratio
+        book_delta = float(line_deltas.sum())
+        
+        hedge_deltas = self._deltas(qqq_price, qqq_strikes, qqq_expiries, risk_free_rate,
+                                    volatility if qqq_volatilities is None else qqq_volatilities,
+                                    qqq_option_types)
+        hedgeable = np.abs(hedge_deltas) >= MIN_HEDGE_DELTA
+        quantities = np.zeros_like(hedge_deltas)
+        quantities[hedgeable] = -book_delta / hedge_deltas[hedgeable]
+        contracts = np.round(quantities)
+        residual_delta = book_delta + contracts * hedge_deltas
+        return BookHedge(quantities, contracts, residual_delta, book_delta, line_deltas, hedge_deltas)
+    
+    def _deltas(self, underlying_price, strikes, expiries, risk_free_rate, volatilities, option_types):
+        """Black-Scholes deltas of option lines given as arrays, shape (n_lines,)"""
+        option_types = np.atleast_1d(np.asarray(option_types))
+        # Boolean arrays (True for calls) skip the string comparison
+        is_call = option_types if option_types.dtype == bool else np.char.lower(option_types.astype(str)) == 'call'
+        strikes = np.atleast_1d(np.asarray(strikes, dtype=float))
+        return np.atleast_1d(self.greeks_calculator.calculate_delta(
+            underlying_price, strikes, expiries, risk_free_rate, volatilities, is_call
+        ))
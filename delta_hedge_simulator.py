@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Discrete delta-hedging backtest of a TQQQ option position hedged with QQQ options
+Replays a rebalance schedule over many price paths at once
+"""
+
+import argparse
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+from delta_calculator import LEVERAGE_RATIO, OptionCalculator
+from leveraged_etf import TRADING_DAYS, LeveragedETFModel
+
+
+@dataclass
+class HedgeBacktest:
+    """Per-path outcome of a hedge schedule, in currency at the horizon
+
+    hedge_pnl = hedging_error - transaction_costs. hedging_error is the
+    P&L of the option plus its hedge and cash before costs, i.e. how far
+    the discrete delta hedge was from replicating the option.
+    unhedged_pnl is the option position's P&L with no hedge.
+    """
+    times: np.ndarray              # (n_steps + 1,) years since entry
+    rebalance_times: np.ndarray    # (n_rebalances,) times the hedge was reset
+    hedge_pnl: np.ndarray          # (n_paths,)
+    hedging_error: np.ndarray      # (n_paths,)
+    transaction_costs: np.ndarray  # (n_paths,)
+    unhedged_pnl: np.ndarray       # (n_paths,)
+    contracts_traded: np.ndarray   # (n_paths,) QQQ option contracts bought and sold
+    final_hedge: np.ndarray        # (n_paths,) QQQ option contracts held at the horizon
+
+    @property
+    def n_paths(self) -> int:
+        return len(self.hedge_pnl)
+
+    def quantiles(self, q, of: str = "hedge_pnl") -> np.ndarray:
+        """Quantiles of one per-path result"""
+        return np.quantile(getattr(self, of), q)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Mean, standard deviation and 5%/95% quantiles of every per-path result"""
+        names = ("hedge_pnl", "hedging_error", "transaction_costs", "unhedged_pnl", "contracts_traded")
+        return {name: {"mean": float(np.mean(getattr(self, name))),
+                       "std": float(np.std(getattr(self, name))),
+                       "p05": float(self.quantiles(0.05, name)),
+                       "p95": float(self.quantiles(0.95, name))}
+                for name in names}
+
+
+class DeltaHedgeSimulator:
+    """Vectorized replay of discrete TQQQ/QQQ delta hedging
+
+    Paths lie along axis 0 and time along axis 1. Every rebalance time of
+    every path is sized in one OptionCalculator.calculate_hedge_quantities
+    call and every option is valued in one BlackScholesCalculator call, so
+    the backtest has no per-path or per-step Python loop; paths are only
+    split into chunks of at most max_chunk_elements grid points.
+
+    The hedge is reset every rebalance_every steps and held in between,
+    financed by a cash account at the risk-free rate. Trading costs are
+    commission per QQQ contract plus spread, a fraction of the QQQ option
+    price, on every contract traded (including the opening hedge; the
+    hedge is marked at model value at the horizon, not unwound).
+    dollar_neutral sizes the hedge at the dollar leverage ratio 3 * TQQQ
+    price / QQQ price, so it offsets dollar moves; False replays the legacy
+    point-for-point ratio LEVERAGE_RATIO.
+    """
+
+    def __init__(self, calculator: Optional[OptionCalculator] = None, rebalance_every: int = 1,
+                 commission: float = 0.0, spread: float = 0.0, contract_multiplier: float = 100.0,
+                 dollar_neutral: bool = True, max_chunk_elements: int = 4_000_000):
+        if rebalance_every < 1:
+            raise ValueError(f"rebalance_every must be at least 1 step, got {rebalance_every}")
+        self.calculator = calculator or OptionCalculator()
+        self.pricer = self.calculator.greeks_calculator.pricer
+        self.rebalance_every = rebalance_every
+        self.commission = commission
+        self.spread = spread
+        self.contract_multiplier = contract_multiplier
+        self.dollar_neutral = dollar_neutral
+        self.max_chunk_elements = max_chunk_elements
+
+    def run(self, times, qqq_paths, tqqq_paths, tqqq_strike: float, tqqq_quantity: float,
+            tqqq_option_type: str, qqq_strike: float, qqq_option_type: str,
+            qqq_expiry: Optional[float] = None, risk_free_rate: float = 0.05,
+            tqqq_volatility: float = 0.75, qqq_volatility: float = 0.25) -> HedgeBacktest:
+        """Backtest hedging a TQQQ option expiring at times[-1] over simulated or historical paths
+
+        times (years since entry) has one entry per column of the
+        (n_paths, n_steps + 1) price arrays; a single historical path may be
+        given as 1-d arrays. Simulated paths come from
+        leveraged_etf.LeveragedETFModel.simulate, whose TQQQ pays financing
+        on its borrowed exposure and so grows at the rate the options are
+        priced at.
+        qqq_expiry defaults to the TQQQ expiry.
+        """
+        times = np.asarray(times, dtype=float)
+        qqq_paths, tqqq_paths = (np.atleast_2d(np.asarray(x, dtype=float)) for x in (qqq_paths, tqqq_paths))
+        if qqq_paths.shape != tqqq_paths.shape or qqq_paths.shape[1] != len(times):
+            raise ValueError("QQQ and TQQQ paths must have the same shape, one column per time")
+        horizon = float(times[-1])
+        qqq_expiry = horizon if qqq_expiry is None else qqq_expiry
+        if qqq_expiry < horizon:
+            raise ValueError(f"The QQQ hedge expires at {qqq_expiry} before the TQQQ option at {horizon}")
+        option = dict(tqqq_strike=tqqq_strike, tqqq_quantity=tqqq_quantity,
+                      tqqq_call=tqqq_option_type.lower() == 'call', qqq_strike=qqq_strike,
+                      qqq_call=qqq_option_type.lower() == 'call', qqq_expiry=qqq_expiry,
+                      r=risk_free_rate, tqqq_vol=tqqq_volatility, qqq_vol=qqq_volatility)
+
+        rebalance = np.arange(0, len(times) - 1, self.rebalance_every)
+        chunk = max(1, self.max_chunk_elements // len(times))
+        parts = [self._run_chunk(times, rebalance, qqq_paths[start:start + chunk],
+                                 tqqq_paths[start:start + chunk], **option)
+                 for start in range(0, len(qqq_paths), chunk)]
+        results = [np.concatenate(values) for values in zip(*parts)]
+        return HedgeBacktest(times, times[rebalance], *results)
+
+    def _run_chunk(self, times, rebalance, qqq, tqqq, tqqq_strike, tqqq_quantity, tqqq_call,
+                   qqq_strike, qqq_call, qqq_expiry, r, tqqq_vol, qqq_vol):
+        """Per-path results of one block of paths, all steps at once"""
+        horizon = times[-1]
+        t = times[rebalance]
+        hedges = self.calculator.calculate_hedge_quantities(
+            tqqq[:, rebalance], tqqq_strike, tqqq_quantity, tqqq_call, qqq[:, rebalance], qqq_strike,
+            qqq_call, horizon - t, r, qqq_vol, tqqq_vol, qqq_vol, qqq_times_to_expiry=qqq_expiry - t,
+            leverage_ratio=None if self.dollar_neutral else LEVERAGE_RATIO
+        ).quantities                                                        # (n, n_rebalances)
+
+        # Discounted QQQ option values at every step; the hedge set at each rebalance is held until the next
+        discount = np.exp(-r * times)
+        qqq_values = self.pricer.calculate_option_prices(qqq, qqq_strike, qqq_expiry - times, r, qqq_vol, qqq_call)
+        held = np.repeat(hedges, np.diff(np.append(rebalance, len(times) - 1)), axis=1)
+        hedge_gains = np.sum(held * np.diff(qqq_values * discount, axis=1), axis=1)
+
+        tqqq_entry = self.pricer.calculate_option_prices(tqqq[:, 0], tqqq_strike, horizon, r, tqqq_vol, tqqq_call)
+        tqqq_payoff = np.maximum((tqqq[:, -1] - tqqq_strike) * (1 if tqqq_call else -1), 0)
+        option_gains = tqqq_quantity * (tqqq_payoff * discount[-1] - tqqq_entry)
+
+        trades = np.abs(np.diff(hedges, axis=1, prepend=0.0))
+        costs = np.sum(trades * (self.commission + self.spread * qqq_values[:, rebalance] * self.contract_multiplier)
+                       * discount[rebalance], axis=1)
+
+        # Back to currency at the horizon, per contract multiplier
+        scale = self.contract_multiplier / discount[-1]
+        hedging_error = (option_gains + hedge_gains) * scale
+        transaction_costs = costs / discount[-1]
+        return (hedging_error - transaction_costs, hedging_error, transaction_costs,
+                option_gains * scale, trades.sum(axis=1), hedges[:, -1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest discrete delta hedging of a TQQQ option with QQQ options")
+    parser.add_argument('--tqqq-price', type=float, default=45.0, help='TQQQ price at entry (default: 45)')
+    parser.add_argument('--tqqq-strike', type=float, default=46.0, help='TQQQ option strike (default: 46)')
+    parser.add_argument('--tqqq-quantity', type=float, default=-10, help='TQQQ contracts, negative short (default: -10)')
+    parser.add_argument('--tqqq-type', choices=['call', 'put'], default='call')
+    parser.add_argument('--qqq-price', type=float, default=370.0, help='QQQ price at entry (default: 370)')
+    parser.add_argument('--qqq-strike', type=float, default=380.0, help='QQQ hedge option strike (default: 380)')
+    parser.add_argument('--qqq-type', choices=['call', 'put'], default='call')
+    parser.add_argument('--days', type=int, default=21, help='Trading days to the TQQQ expiry (default: 21)')
+    parser.add_argument('--qqq-days', type=int, help='Trading days to the QQQ expiry (default: --days)')
+    parser.add_argument('--volatility', type=float, default=0.25, help='QQQ volatility (default: 0.25)')
+    parser.add_argument('--drift', type=float, default=0.05, help='QQQ drift of the simulated paths (default: 0.05)')
+    parser.add_argument('--risk-free-rate', type=float, default=0.05)
+    parser.add_argument('--paths', type=int, default=10_000, help='Simulated paths (default: 10000)')
+    parser.add_argument('--rebalance-every', type=int, nargs='+', default=[1, 5],
+                        help='Rebalance frequencies in days to compare (default: 1 5)')
+    parser.add_argument('--commission', type=float, default=0.65, help='Commission per QQQ contract (default: 0.65)')
+    parser.add_argument('--spread', type=float, default=0.01,
+                        help='Spread paid as a fraction of the QQQ option price (default: 0.01)')
+    parser.add_argument('--point-ratio', action='store_true',
+                        help='Hedge with the legacy point-for-point ratio 3.0 instead of dollar deltas')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    paths = LeveragedETFModel().simulate(args.qqq_price, args.tqqq_price, args.days, args.volatility,
+                                         args.risk_free_rate, args.drift, args.paths, args.seed)
+    qqq_expiry = None if args.qqq_days is None else args.qqq_days / TRADING_DAYS
+    print(f"{'every':>5} {'pnl mean':>10} {'pnl std':>10} {'pnl p05':>10} {'error std':>10} "
+          f"{'costs':>8} {'unhedged std':>12}")
+    for every in args.rebalance_every:
+        simulator = DeltaHedgeSimulator(rebalance_every=every, commission=args.commission,
+                                        spread=args.spread, dollar_neutral=not args.point_ratio)
+        result = simulator.run(paths.times, paths.qqq, paths.tqqq, args.tqqq_strike, args.tqqq_quantity, args.tqqq_type,
+                               args.qqq_strike, args.qqq_type, qqq_expiry, args.risk_free_rate,
+                               LEVERAGE_RATIO * args.volatility, args.volatility).summary()
+        pnl, error = result["hedge_pnl"], result["hedging_error"]
+        print(f"{every:>5} {pnl['mean']:>10.2f} {pnl['std']:>10.2f} {pnl['p05']:>10.2f} {error['std']:>10.2f} "
+              f"{result['transaction_costs']['mean']:>8.2f} {result['unhedged_pnl']['std']:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
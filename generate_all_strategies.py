@@ -3,20 +3,107 @@
 Generate all 84 strategy plots and compile them into one comprehensive markdown file
 """
 
+import argparse
+import contextlib
+import io
+import multiprocessing.util
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 import time
 
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is not reported
+    resource = None
+
+# Headless rendering: must be selected before pyplot is imported
+import matplotlib
+matplotlib.use("Agg")
+
 # Add the src directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from option_analyzer.factory import StrategyFactory
-from option_analyzer.visualization import VisualizationEngine
+from option_analyzer.visualization import FigureTemplate, OUTPUT_PROFILES, PlotCache, VisualizationEngine
+
+
+def _peak_rss_mb(children=False):
+    """Peak resident set size in MB (ru_maxrss is KB on Linux, bytes on macOS); None without resource"""
+    if resource is None:
+        return None
+    scale = 2**20 if sys.platform == "darwin" else 2**10
+    return resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def _format_mb(mb):
+    return "   n/a" if mb is None else f"{mb:6.0f} MB"
+
+
+# One reusable figure per process, laid out on first use and closed on exit
+_template = None
+
+
+def _figure_template():
+    global _template
+    if _template is None:
+        _template = FigureTemplate()
+        # Runs at exit of pool workers too, which skip atexit handlers when forked
+        multiprocessing.util.Finalize(None, _close_figure_template, exitpriority=10)
+    return _template
+
+
+def _close_figure_template():
+    global _template
+    if _template is not None:
+        _template.close()
+        _template = None
+
+
+def render_strategy(code, output_dir="strategy_plot", base_price=100.0, dpi=None, use_cache=True,
+                    profile="full"):
+    """Render one strategy plot, returning (code, error, seconds, peak_mb, cached, save_seconds)
+    
+    Runs in pool workers, so it never raises: the error message is returned
+    instead (None on success). peak_mb is the peak RSS of the rendering
+    process so far, so a leak shows up as steady growth across strategies.
+    cached is True when an up-to-date plot was reused instead of rendered;
+    save_seconds is the part of seconds spent writing the file.
+    """
+    start = time.perf_counter()
+    cached = False
+    save_seconds = 0.0
+    try:
+        strategy = StrategyFactory().create_strategy(code, base_price)
+        if not strategy:
+            return (code, "Failed to create strategy", time.perf_counter() - start, _peak_rss_mb(),
+                    cached, save_seconds)
+        viz = VisualizationEngine(strategy, output_dir, cache=PlotCache(output_dir) if use_cache else None)
+        if use_cache:
+            filename = OUTPUT_PROFILES[profile].filename(code)
+            cached = viz.cache.lookup(filename, viz.render_key(dpi=dpi, profile=profile)) is not None
+        # Keep the per-strategy analysis printout out of the progress report
+        with contextlib.redirect_stdout(io.StringIO()):
+            viz.generate_full_analysis(show=False, dpi=dpi, template=_figure_template(), profile=profile)
+        if viz.render_timings:
+            save_seconds = viz.render_timings[-1].save_seconds
+        error = None
+    except Exception as e:
+        error = str(e)
+    return code, error, time.perf_counter() - start, _peak_rss_mb(), cached, save_seconds
 
 
-def generate_all_plots(output_dir="strategy_plot", base_price=100.0):
-    """Generate plots for all 84 strategies"""
+def generate_all_plots(output_dir="strategy_plot", base_price=100.0, workers=None, dpi=None,
+                       use_cache=True, profile="full"):
+    """Generate plots for all 84 strategies across a process pool
+    
+    workers defaults to the CPU count; workers=1 renders in this process.
+    With use_cache, plots whose inputs are unchanged since the last run
+    (per the plot index in output_dir) are not re-rendered. profile names
+    an output profile (full, preview, thumbnail, svg, pdf); dpi overrides
+    its resolution.
+    """
     print("🚀 Generating all 84 Options Strategy plots...")
     print("=" * 60)
     
@@ -25,41 +112,61 @@ def generate_all_plots(output_dir="strategy_plot", base_price=100.0):
     
     factory = StrategyFactory()
     strategies = factory.list_strategies()
+    workers = workers or os.cpu_count() or 1
     
-    print(f"📊 Total strategies to generate: {len(strategies)}")
+    print(f"📊 Total strategies to generate: {len(strategies)} ({workers} workers, {profile} profile)")
     print()
     
     successful_plots = []
     failed_plots = []
+    timings = {}
+    reused = []
+    start = time.perf_counter()
     
-    for i, code in enumerate(strategies, 1):
-        try:
-            print(f"[{i:2d}/{len(strategies)}] Generating {code}...", end=" ")
-            
-            # Create strategy
-            strategy = factory.create_strategy(code, base_price)
-            if not strategy:
-                print("❌ Failed to create strategy")
-                failed_plots.append(code)
-                continue
-            
-            # Generate visualization
-            viz = VisualizationEngine(strategy, output_dir)
-            viz.generate_full_analysis()
-            
+    def record(i, result):
+        code, error, seconds, peak_mb, cached, save_seconds = result
+        if error is None and cached:
             successful_plots.append(code)
-            print("✅ Done")
-            
-            # Small delay to prevent overwhelming the system
-            time.sleep(0.1)
-            
-        except Exception as e:
-            print(f"❌ Error: {str(e)}")
+            reused.append(code)
+            print(f"[{i:2d}/{len(strategies)}] {code:>4} ♻️  up to date")
+        elif error is None:
+            successful_plots.append(code)
+            timings[code] = (seconds, save_seconds)
+            print(f"[{i:2d}/{len(strategies)}] {code:>4} ✅ {seconds:6.2f}s "
+                  f"(save {save_seconds:5.2f}s)  RSS {_format_mb(peak_mb)}")
+        else:
             failed_plots.append(code)
+            print(f"[{i:2d}/{len(strategies)}] {code:>4} ❌ Error: {error}")
+    
+    if workers == 1:
+        for i, code in enumerate(strategies, 1):
+            record(i, render_strategy(code, output_dir, base_price, dpi, use_cache, profile))
+        _close_figure_template()
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(render_strategy, code, output_dir, base_price, dpi, use_cache, profile)
+                       for code in strategies]
+            for i, future in enumerate(as_completed(futures), 1):
+                record(i, future.result())
+    
+    # Report in catalogue order regardless of completion order
+    successful_plots.sort(key=strategies.index)
+    failed_plots.sort(key=strategies.index)
+    elapsed = time.perf_counter() - start
     
     print()
     print("=" * 60)
-    print(f"✅ Successfully generated: {len(successful_plots)} plots")
+    print(f"✅ Successfully generated: {len(successful_plots)} plots in {elapsed:.1f}s "
+          f"({len(reused)} reused unchanged)")
+    if timings:
+        slowest = max(timings, key=lambda code: timings[code][0])
+        total_render = sum(seconds for seconds, _ in timings.values())
+        total_save = sum(save for _, save in timings.values())
+        print(f"⏱️  Render time ({profile}): {total_render:.1f}s total, {total_render / len(timings):.2f}s mean "
+              f"({total_save / len(timings):.2f}s saving), slowest {slowest} ({timings[slowest][0]:.2f}s)")
+    if resource is not None:
+        print(f"🧠 Peak RSS: main {_peak_rss_mb():.0f} MB, "
+              f"largest worker {_peak_rss_mb(children=True):.0f} MB")
     if failed_plots:
         print(f"❌ Failed to generate: {len(failed_plots)} plots")
         print(f"Failed strategies: {', '.join(failed_plots)}")
@@ -68,7 +175,7 @@ def generate_all_plots(output_dir="strategy_plot", base_price=100.0):
     return successful_plots, failed_plots
 
 
-def create_comprehensive_markdown(successful_plots, output_dir="strategy_plot"):
+def create_comprehensive_markdown(successful_plots, output_dir="strategy_plot", profile="full", base_price=100.0):
     """Create a comprehensive markdown file with all strategy plots"""
     print("📝 Creating comprehensive markdown file...")
     
@@ -91,7 +198,7 @@ def create_comprehensive_markdown(successful_plots, output_dir="strategy_plot"):
         "",
         f"**Generated on:** {time.strftime('%Y-%m-%d %H:%M:%S')}",
         f"**Total Strategies:** {len(successful_plots)}",
-        f"**Base Stock Price:** $100.00",
+        f"**Base Stock Price:** ${base_price:,.2f}",
         "",
         "## Table of Contents",
         "",
@@ -131,7 +238,7 @@ def create_comprehensive_markdown(successful_plots, output_dir="strategy_plot"):
                 continue
                 
             strategy_info = factory.get_strategy_info(code)
-            plot_file = f"{code}_analysis.png"
+            plot_file = OUTPUT_PROFILES[profile].filename(code)
             plot_path = Path(output_dir) / plot_file
             
             markdown_content.extend([
@@ -208,7 +315,7 @@ def create_comprehensive_markdown(successful_plots, output_dir="strategy_plot"):
         "",
         f"**Generated with:** Options Strategy Analyzer v1.0",
         f"**Generation Date:** {time.strftime('%Y-%m-%d %H:%M:%S')}",
-        f"**Base Parameters:** Stock Price = $100.00, Risk-free rate = 5%, Volatility = 20%",
+        f"**Base Parameters:** Stock Price = ${base_price:,.2f}, Risk-free rate = 5%, Volatility = 20%",
     ])
     
     # Write the markdown file
@@ -224,23 +331,35 @@ def create_comprehensive_markdown(successful_plots, output_dir="strategy_plot"):
 
 def main():
     """Main function to generate all plots and markdown"""
+    parser = argparse.ArgumentParser(description='Generate all 84 strategy plots and the combined markdown')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes (default: CPU count, 1 renders in-process)')
+    parser.add_argument('--profile', choices=sorted(OUTPUT_PROFILES), default='full',
+                        help='Output profile: format, resolution and cropping (default: full)')
+    parser.add_argument('--dpi', type=int, default=None, help="Override the profile's resolution")
+    parser.add_argument('--price', type=float, default=100.0, help='Base stock price (default: 100)')
+    parser.add_argument('--output-dir', default='strategy_plot', help='Output directory for plots (default: strategy_plot)')
+    parser.add_argument('--force', action='store_true', help='Re-render plots even if their inputs are unchanged')
+    args = parser.parse_args()
+    
     print("🎯 Options Strategy Complete Analysis Generator")
     print("=" * 60)
     
     # Generate all plots
-    successful_plots, failed_plots = generate_all_plots()
+    successful_plots, failed_plots = generate_all_plots(args.output_dir, args.price, args.workers, args.dpi,
+                                                        use_cache=not args.force, profile=args.profile)
     
     if not successful_plots:
         print("❌ No plots were generated successfully. Exiting.")
         return
     
     # Create comprehensive markdown
-    markdown_file = create_comprehensive_markdown(successful_plots)
+    markdown_file = create_comprehensive_markdown(successful_plots, args.output_dir, args.profile, args.price)
     
     print()
     print("🎉 Analysis Complete!")
     print("=" * 60)
-    print(f"📊 Generated {len(successful_plots)} strategy plots in 'strategy_plot/' directory")
+    print(f"📊 Generated {len(successful_plots)} strategy plots in '{args.output_dir}/' directory")
     print(f"📝 Created comprehensive markdown: {markdown_file}")
     
     if failed_plots:
@@ -248,7 +367,7 @@ def main():
     
     print()
     print("Next steps:")
-    print(f"1. Review plots in the 'strategy_plot/' directory")
+    print(f"1. Review plots in the '{args.output_dir}/' directory")
     print(f"2. Open '{markdown_file}' to view the complete analysis")
     print("3. Use individual plots for presentations or reports")
 
@@ -6,9 +6,43 @@ Command-line interface for calculating optimal QQQ hedge quantities
 """
 
 import argparse
+import csv
+import json
+import math
 import sys
 from datetime import datetime, timedelta
-from delta_calculator import OptionCalculator
+from functools import lru_cache
+from itertools import islice
+
+import numpy as np
+
+from delta_calculator import LEVERAGE_RATIO, MIN_HEDGE_DELTA, OptionCalculator, dollar_leverage_ratio
+from leveraged_etf import LeveragedETFModel
+
+# Batch input columns: the single-position flags with underscores
+REQUIRED_FIELDS = ('tqqq_price', 'tqqq_strike', 'tqqq_quantity', 'tqqq_type',
+                   'qqq_price', 'qqq_strike', 'qqq_type', 'expiry')
+FLOAT_FIELDS = ('tqqq_price', 'tqqq_strike', 'tqqq_quantity', 'qqq_price', 'qqq_strike',
+                'risk_free_rate', 'volatility', 'tqqq_option_price', 'qqq_option_price', 'leverage_ratio')
+
+
+def horizon_leverage(days, volatility, risk_free_rate):
+    """TQQQ dollars per QQQ dollar over days trading days, per unit TQQQ/QQQ price ratio"""
+    return LeveragedETFModel().horizon_leverage(days, volatility, risk_free_rate)
+
+
+def point_ratio_warning(tqqq_price, qqq_price):
+    """Warning for a hedge sized with the legacy 3.0 point-for-point leverage ratio"""
+    dollar_ratio = float(dollar_leverage_ratio(tqqq_price, qqq_price))
+    return (f"⚠️  Warning: leverage ratio {LEVERAGE_RATIO} is the legacy point-for-point TQQQ/QQQ ratio; "
+            f"TQQQ moves about ${dollar_ratio:.3f} per QQQ dollar here, so the hedge is about "
+            f"{LEVERAGE_RATIO / dollar_ratio:.1f}x too large. Omit --leverage-ratio to hedge at "
+            f"{dollar_ratio:.3f}, or pass --horizon-days.")
+
+
+def hedge_action(quantity):
+    """BUY or SELL for a hedge quantity, HOLD when there is nothing to trade"""
+    return 'BUY' if quantity > 0 else 'SELL' if quantity < 0 else 'HOLD'
 
 
 def calculate_time_to_expiry(expiry_date_str):
@@ -22,6 +56,161 @@ def calculate_time_to_expiry(expiry_date_str):
         raise ValueError(f"Invalid date format. Use YYYY-MM-DD, got: {expiry_date_str}")
 
 
+def read_positions(stream, input_format):
+    """Yield (row_number, fields) for every position of a CSV or JSON-lines stream"""
+    if input_format == 'csv':
+        for number, row in enumerate(csv.DictReader(stream), start=1):
+            yield number, {key.strip(): value.strip() for key, value in row.items()
+                           if key and value is not None and value.strip() != ''}
+        return
+    for number, line in enumerate((line for line in stream if line.strip()), start=1):
+        try:
+            yield number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield number, ValueError(f"Invalid JSON: {e}")
+
+
+def parse_position(fields, defaults, time_to_expiry=calculate_time_to_expiry):
+    """Validate one batch row into typed fields, filling rate and volatility defaults
+
+    A row without a leverage_ratio (TQQQ dollars per QQQ dollar) takes the
+    default one, else defaults['horizon_leverage'] * tqqq_price / qqq_price,
+    else the instantaneous dollar ratio LEVERAGE_RATIO * tqqq_price / qqq_price.
+    """
+    if isinstance(fields, Exception):
+        raise fields
+    if not isinstance(fields, dict):
+        raise ValueError(f"Expected an object of position fields, got {type(fields).__name__}")
+    missing = [name for name in REQUIRED_FIELDS if fields.get(name) in (None, '')]
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(missing)}")
+    position = {**defaults, **{key: value for key, value in fields.items() if value is not None}}
+    for name in FLOAT_FIELDS:
+        if name in position:
+            position[name] = float(position[name])
+            if not math.isfinite(position[name]):
+                raise ValueError(f"{name} must be finite, got {position[name]}")
+    # Caught per row here, before one bad row can fail the whole chunk's vectorized call
+    if position['tqqq_price'] < 0:
+        raise ValueError(f"tqqq_price must be non-negative, got {position['tqqq_price']:g}")
+    if position['qqq_price'] <= 0:
+        raise ValueError(f"qqq_price must be positive, got {position['qqq_price']:g}")
+    for name in ('tqqq_strike', 'qqq_strike'):
+        if position[name] <= 0:
+            raise ValueError(f"{name} must be positive, got {position[name]:g}")
+    for name in ('tqqq_type', 'qqq_type'):
+        position[name] = str(position[name]).lower()
+        if position[name] not in ('call', 'put'):
+            raise ValueError(f"{name} must be 'call' or 'put', got {position[name]!r}")
+    if 'leverage_ratio' not in position:
+        position['leverage_ratio'] = float(dollar_leverage_ratio(
+            position['tqqq_price'], position['qqq_price'], position.get('horizon_leverage', LEVERAGE_RATIO)))
+    position['time_to_expiry'] = time_to_expiry(str(position['expiry']))
+    return position
+
+
+def implied_volatilities(calculator, positions, prefix):
+    """Per-position volatility of one side, solving implied volatilities where a price is quoted"""
+    volatilities = np.array([p['volatility'] for p in positions])
+    quoted = [i for i, p in enumerate(positions) if f'{prefix}_option_price' in p]
+    if quoted:
+        rows = [positions[i] for i in quoted]
+        volatilities[quoted] = calculator.iv_calculator.calculate_implied_volatility(
+            [p[f'{prefix}_option_price'] for p in rows], [p[f'{prefix}_price'] for p in rows],
+            [p[f'{prefix}_strike'] for p in rows], [p['time_to_expiry'] for p in rows],
+            [p['risk_free_rate'] for p in rows], [p[f'{prefix}_type'] == 'call' for p in rows]
+        )
+    return volatilities
+
+
+def hedge_chunk(calculator, chunk, defaults, time_to_expiry=calculate_time_to_expiry):
+    """Result records of one chunk of (row_number, fields), hedged in vectorized calls"""
+    records, positions = {}, []
+    for number, fields in chunk:
+        try:
+            positions.append((number, parse_position(fields, defaults, time_to_expiry)))
+        except (ValueError, TypeError) as e:
+            records[number] = {'row': number, 'error': str(e)}
+    if positions:
+        numbers, rows = zip(*positions)
+        tqqq_vols = implied_volatilities(calculator, rows, 'tqqq')
+        qqq_vols = implied_volatilities(calculator, rows, 'qqq')
+
+        def column(name):
+            return np.array([row[name] for row in rows])
+
+        hedges = calculator.calculate_hedge_quantities(
+            column('tqqq_price'), column('tqqq_strike'), column('tqqq_quantity'),
+            column('tqqq_type') == 'call', column('qqq_price'), column('qqq_strike'),
+            column('qqq_type') == 'call', column('time_to_expiry'), column('risk_free_rate'),
+            column('volatility'), tqqq_vols, qqq_vols, leverage_ratio=column('leverage_ratio')
+        )
+        for i, (number, row) in enumerate(positions):
+            if math.isnan(tqqq_vols[i]) or math.isnan(qqq_vols[i]):
+                side = 'TQQQ' if math.isnan(tqqq_vols[i]) else 'QQQ'
+                records[number] = {'row': number, 'error': f"No implied volatility for the {side} option price"}
+                continue
+            if abs(hedges.qqq_deltas[i]) < MIN_HEDGE_DELTA:
+                records[number] = {'row': number, 'error': "QQQ option delta is ~0; cannot hedge"}
+                continue
+            quantity = float(hedges.quantities[i])
+            records[number] = {
+                'row': number,
+                **{name: row[name] for name in REQUIRED_FIELDS},
+                'time_to_expiry': row['time_to_expiry'],
+                'tqqq_volatility': float(tqqq_vols[i]),
+                'qqq_volatility': float(qqq_vols[i]),
+                'leverage_ratio': row['leverage_ratio'],
+                'tqqq_delta': float(hedges.tqqq_deltas[i]),
+                'qqq_delta': float(hedges.qqq_deltas[i]),
+                'hedge_quantity': quantity,
+                'action': hedge_action(quantity),
+                'contracts': abs(round(quantity)),
+            }
+    return [records[number] for number, _ in chunk]
+
+
+def run_batch(args):
+    """Stream positions from args.batch and write one JSON line per position to args.output
+
+    Rows are read, hedged and written chunk_size at a time, so memory does
+    not grow with the input. Returns the number of rows that failed.
+    """
+    input_format = args.input_format or ('jsonl' if args.batch.endswith(('.jsonl', '.json')) else 'csv')
+    defaults = {'risk_free_rate': args.risk_free_rate, 'volatility': args.volatility}
+    if args.leverage_ratio is not None:
+        defaults['leverage_ratio'] = args.leverage_ratio
+    if args.horizon_days is not None:
+        defaults['horizon_leverage'] = horizon_leverage(args.horizon_days, args.volatility, args.risk_free_rate)
+    calculator = OptionCalculator()
+    # A book has few distinct expiries; parse each date once
+    time_to_expiry = lru_cache(maxsize=1024)(calculate_time_to_expiry)
+    source = sys.stdin if args.batch == '-' else open(args.batch, newline='')
+    sink = sys.stdout if args.output == '-' else open(args.output, 'w')
+    failures = point_ratio_rows = 0
+    try:
+        rows = read_positions(source, input_format)
+        while True:
+            chunk = list(islice(rows, args.chunk_size))
+            if not chunk:
+                break
+            records = hedge_chunk(calculator, chunk, defaults, time_to_expiry)
+            failures += sum('error' in record for record in records)
+            point_ratio_rows += sum(record.get('leverage_ratio') == LEVERAGE_RATIO for record in records)
+            sink.write(''.join(json.dumps(record) + '\n' for record in records))
+            sink.flush()
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    if point_ratio_rows:
+        print(f"⚠️  Warning: {point_ratio_rows} position(s) hedged with the legacy point-for-point "
+              f"leverage ratio {LEVERAGE_RATIO}, which overhedges by about QQQ/TQQQ price; omit "
+              f"leverage_ratio to hedge in TQQQ dollars per QQQ dollar", file=sys.stderr)
+    return failures
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Calculate QQQ hedge quantities for TQQQ options positions",
@@ -37,35 +226,85 @@ Examples:
   python3 hedge_calculator_cli.py --tqqq-price 45.0 --tqqq-strike 44.0 --tqqq-quantity -5 
                                   --tqqq-type put --expiry 2024-03-15 --qqq-price 370.0 
                                   --qqq-strike 360.0 --qqq-type put
+
+  # A whole book from CSV (columns named like the flags: tqqq_price, tqqq_strike, ...),
+  # one JSON line per position on stdout
+  python3 hedge_calculator_cli.py --batch book.csv > hedges.jsonl
+  cat book.jsonl | python3 hedge_calculator_cli.py --batch - --input-format jsonl
+
+The leverage ratio is in TQQQ dollars per QQQ dollar: by default the
+instantaneous 3 * TQQQ price / QQQ price, or with --horizon-days 21 the ratio
+over a month of daily-reset compounding. --leverage-ratio 3 reproduces the
+legacy point-for-point ratio, which overhedges by about QQQ/TQQQ price and
+prints a warning.
         """)
     
     # TQQQ position parameters
-    parser.add_argument('--tqqq-price', type=float, required=True,
+    parser.add_argument('--tqqq-price', type=float,
                        help='Current TQQQ market price')
-    parser.add_argument('--tqqq-strike', type=float, required=True,
+    parser.add_argument('--tqqq-strike', type=float,
                        help='TQQQ option strike price')
-    parser.add_argument('--tqqq-quantity', type=int, required=True,
+    parser.add_argument('--tqqq-quantity', type=int,
                        help='TQQQ option quantity (negative for short positions)')
-    parser.add_argument('--tqqq-type', choices=['call', 'put'], required=True,
+    parser.add_argument('--tqqq-type', choices=['call', 'put'],
                        help='TQQQ option type')
     
     # QQQ hedge parameters
-    parser.add_argument('--qqq-price', type=float, required=True,
+    parser.add_argument('--qqq-price', type=float,
                        help='Current QQQ market price')
-    parser.add_argument('--qqq-strike', type=float, required=True,
+    parser.add_argument('--qqq-strike', type=float,
                        help='QQQ hedge option strike price')
-    parser.add_argument('--qqq-type', choices=['call', 'put'], required=True,
+    parser.add_argument('--qqq-type', choices=['call', 'put'],
                        help='QQQ hedge option type')
     
     # Common parameters
-    parser.add_argument('--expiry', required=True,
+    parser.add_argument('--expiry',
                        help='Option expiration date (YYYY-MM-DD)')
+    leverage = parser.add_mutually_exclusive_group()
+    leverage.add_argument('--leverage-ratio', type=float,
+                          help='TQQQ dollars per QQQ dollar (default: 3 * TQQQ price / QQQ price)')
+    leverage.add_argument('--horizon-days', type=int, metavar='DAYS',
+                          help='Leverage ratio from simulated daily-reset TQQQ/QQQ paths over DAYS '
+                               'trading days at --volatility and --risk-free-rate')
     parser.add_argument('--risk-free-rate', type=float, default=0.05,
                        help='Risk-free interest rate (default: 0.05)')
     parser.add_argument('--volatility', type=float, default=0.25,
                        help='Implied volatility (default: 0.25)')
+    parser.add_argument('--tqqq-option-price', type=float,
+                       help='Market price of the TQQQ option; solves its implied volatility')
+    parser.add_argument('--qqq-option-price', type=float,
+                       help='Market price of the QQQ hedge option; solves its implied volatility')
+    
+    # Batch mode
+    parser.add_argument('--batch', metavar='PATH',
+                       help='Hedge every position of a CSV or JSON-lines file (- for stdin); '
+                            'rate and volatility flags are defaults for missing columns')
+    parser.add_argument('--input-format', choices=['csv', 'jsonl'],
+                       help='Batch input format (default: from the file extension, csv for stdin)')
+    parser.add_argument('--output', default='-', metavar='PATH',
+                       help='Batch output JSON-lines file (default: stdout)')
+    parser.add_argument('--chunk-size', type=int, default=4096,
+                       help='Positions hedged per vectorized call in batch mode (default: 4096)')
     
     args = parser.parse_args()
+    if args.horizon_days is not None and args.horizon_days < 1:
+        parser.error(f"--horizon-days must be at least 1, got {args.horizon_days}")
+    
+    if args.batch is not None:
+        try:
+            failures = run_batch(args)
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        if failures:
+            print(f"{failures} position(s) failed; see the error field of their records", file=sys.stderr)
+            sys.exit(1)
+        return
+    
+    missing = [f"--{name.replace('_', '-')}" for name in REQUIRED_FIELDS
+               if getattr(args, name) is None]
+    if missing:
+        parser.error(f"the following arguments are required: {', '.join(missing)}")
     
     try:
         # Calculate time to expiry
@@ -74,6 +313,28 @@ Examples:
         # Create calculator and compute hedge
         calculator = OptionCalculator()
         
+        # Implied volatilities from market prices override --volatility per leg
+        tqqq_volatility = args.volatility
+        if args.tqqq_option_price is not None:
+            tqqq_volatility = calculator.calculate_implied_volatility(
+                args.tqqq_option_price, args.tqqq_price, args.tqqq_strike,
+                time_to_expiry, args.risk_free_rate, args.tqqq_type
+            )
+        qqq_volatility = args.volatility
+        if args.qqq_option_price is not None:
+            qqq_volatility = calculator.calculate_implied_volatility(
+                args.qqq_option_price, args.qqq_price, args.qqq_strike,
+                time_to_expiry, args.risk_free_rate, args.qqq_type
+            )
+        
+        if args.qqq_price <= 0:
+            raise ValueError(f"--qqq-price must be positive, got {args.qqq_price:g}")
+        leverage_ratio = args.leverage_ratio
+        if leverage_ratio is None:
+            multiplier = (LEVERAGE_RATIO if args.horizon_days is None
+                          else horizon_leverage(args.horizon_days, args.volatility, args.risk_free_rate))
+            leverage_ratio = float(dollar_leverage_ratio(args.tqqq_price, args.qqq_price, multiplier))
+        
         hedge_quantity = calculator.calculate_hedge_quantity(
             tqqq_price=args.tqqq_price,
             tqqq_strike=args.tqqq_strike,
@@ -84,7 +345,10 @@ Examples:
             qqq_option_type=args.qqq_type,
             time_to_expiry=time_to_expiry,
             risk_free_rate=args.risk_free_rate,
-            volatility=args.volatility
+            volatility=args.volatility,
+            tqqq_volatility=tqqq_volatility,
+            qqq_volatility=qqq_volatility,
+            leverage_ratio=leverage_ratio
         )
         
         # Display results
@@ -97,11 +361,15 @@ Examples:
         print(f"  Strike: ${args.tqqq_strike:.2f}")
         print(f"  Quantity: {args.tqqq_quantity:,}")
         print(f"  Current Price: ${args.tqqq_price:.2f}")
+        print(f"  Volatility: {tqqq_volatility*100:.2f}%"
+              f"{' (implied)' if args.tqqq_option_price is not None else ''}")
         
         print(f"\nQQQ Hedge Option:")
         print(f"  Type: {args.qqq_type.upper()}")
         print(f"  Strike: ${args.qqq_strike:.2f}")
         print(f"  Current Price: ${args.qqq_price:.2f}")
+        print(f"  Volatility: {qqq_volatility*100:.2f}%"
+              f"{' (implied)' if args.qqq_option_price is not None else ''}")
         
         print(f"\nExpiration: {args.expiry}")
         print(f"Time to Expiry: {time_to_expiry:.4f} years ({time_to_expiry*365:.1f} days)")
@@ -110,19 +378,18 @@ Examples:
         print("HEDGE RECOMMENDATION:")
         print("-"*60)
         
-        if hedge_quantity > 0:
-            action = "BUY"
-        else:
-            action = "SELL"
-            
+        action = hedge_action(hedge_quantity)
         print(f"\n{action} {abs(hedge_quantity):.0f} QQQ ${args.qqq_strike:.2f} {args.qqq_type}s")
         print(f"  (Exact quantity: {hedge_quantity:.2f})")
         
         if abs(hedge_quantity) < 0.1:
             print("\n⚠️  Warning: Very small hedge quantity - position may already be nearly delta neutral")
-        
-        print(f"\nThis hedge should approximately neutralize the delta risk from your")
-        print(f"TQQQ {args.tqqq_type} position, accounting for the 3:1 leverage difference.")
+        if leverage_ratio == LEVERAGE_RATIO:
+            print("\n" + point_ratio_warning(args.tqqq_price, args.qqq_price))
+        else:
+            horizon = f" over {args.horizon_days} trading days" if args.horizon_days is not None else ""
+            print(f"\nThis hedge should approximately neutralize the delta risk from your")
+            print(f"TQQQ {args.tqqq_type} position, at {leverage_ratio:.4g} TQQQ dollars per QQQ dollar{horizon}.")
         print("\n" + "="*60)
         
     except Exception as e:
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Fee-minimizing hedge optimizer over QQQ shares and QQQ options
+Neutralizes several Greeks of a TQQQ option book at once, in integer lots
+"""
+
+import argparse
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+from delta_calculator import LEVERAGE_RATIO, OptionCalculator, dollar_leverage_ratio
+
+HEDGE_GREEKS = ("delta", "gamma", "vega")
+
+
+@dataclass
+class HedgeSolution:
+    """Optimized hedge: quantities per candidate and what is left unhedged
+
+    Greek arrays follow the optimizer's greeks order, in QQQ terms and
+    currency per unit move (option Greeks include the contract multiplier).
+    """
+    quantities: np.ndarray   # (n_candidates,) units traded, whole lots when integer
+    continuous: np.ndarray   # (n_candidates,) fee-minimal hedge with fractional lots
+    exposure: np.ndarray     # (n_greeks,) book Greeks before hedging
+    residual: np.ndarray     # (n_greeks,) book + hedge Greeks minus the target
+    tolerances: np.ndarray   # (n_greeks,) allowed |residual|
+    cost: float              # sum of |quantity| * cost per unit
+
+    def as_dict(self, greeks: Sequence[str] = HEDGE_GREEKS) -> Dict[str, float]:
+        """Residual exposure by Greek name"""
+        return dict(zip(greeks, self.residual.tolist()))
+
+
+class HedgeOptimizer:
+    """Choose the cheapest hedge across many instruments as a mixed-integer LP
+
+    Minimizes sum(cost_i |x_i|) subject to |(A x + g - target)_k| <= tol_k
+    for every Greek k, where column i of A holds the Greeks of one unit of
+    candidate i, g the book's Greeks and x_i a whole number of lots. |x_i|
+    is linearized with one bound variable per candidate, and the problem
+    goes to scipy.optimize.milp (HiGHS) in one call. Linear fees make the
+    optimum sparse: the LP relaxation trades at most as many candidates
+    as there are Greeks, and the integer hedge adds only what whole lots
+    require.
+    Tolerances default to a fraction of each Greek's book exposure.
+
+    Candidates are QQQ options ('call'/'put') or QQQ shares ('stock'); all
+    of their Greeks come from one GreeksCalculator.calculate_greeks call.
+    """
+
+    def __init__(self, greeks: Sequence[str] = HEDGE_GREEKS, risk_free_rate: float = 0.05,
+                 tolerance: float = 0.01, contract_multiplier: float = 100.0):
+        self.greeks = tuple(greeks)
+        self.risk_free_rate = risk_free_rate
+        self.tolerance = tolerance
+        self.contract_multiplier = contract_multiplier
+        self.calculator = OptionCalculator()
+
+    def candidate_greeks(self, qqq_price: float, strikes, expiries, instrument_types,
+                         volatilities) -> Dict[str, np.ndarray]:
+        """Greeks and price of one unit of every candidate, each of shape (n_candidates,)
+
+        Options are per contract; a 'stock' candidate is one share with
+        delta 1 (its strike, expiry and volatility are ignored).
+        """
+        instrument_types = np.char.lower(np.atleast_1d(np.asarray(instrument_types)).astype(str))
+        if np.any(~np.isin(instrument_types, ('call', 'put', 'stock'))):
+            raise ValueError("Instrument types must be 'call', 'put' or 'stock'")
+        stock = instrument_types == 'stock'
+        strikes = np.where(stock, qqq_price, np.asarray(strikes, dtype=float))
+        values = self.calculator.greeks_calculator.calculate_greeks(
+            qqq_price, strikes, expiries, self.risk_free_rate, volatilities, instrument_types == 'call'
+        )
+        multiplier = np.where(stock, 1.0, self.contract_multiplier)
+        values = {name: np.where(stock, 0.0, values[name]) * multiplier for name in values}
+        values["delta"][stock] = 1.0
+        values["price"][stock] = qqq_price
+        return values
+
+    def book_exposure(self, tqqq_price: float, qqq_price: float, strikes, quantities, option_types,
+                      expiries, volatilities, leverage_ratio: Optional[float] = None,
+                      volatility_leverage: float = LEVERAGE_RATIO) -> np.ndarray:
+        """Greeks of a TQQQ option book in QQQ terms, shape (n_greeks,)
+
+        Delta scales by leverage_ratio, the TQQQ dollars per QQQ dollar
+        (default LEVERAGE_RATIO * tqqq_price / qqq_price, the instantaneous
+        ratio of a daily-reset fund; a horizon hedge ratio from
+        leveraged_etf fits too), gamma by its square, and vega by
+        volatility_leverage, the TQQQ volatility per point of QQQ volatility.
+        """
+        if leverage_ratio is None:
+            leverage_ratio = float(dollar_leverage_ratio(tqqq_price, qqq_price))
+        option_types = np.char.lower(np.atleast_1d(np.asarray(option_types)).astype(str))
+        values = self.calculator.greeks_calculator.calculate_greeks(
+            tqqq_price, np.asarray(strikes, dtype=float), expiries, self.risk_free_rate, volatilities,
+            option_types == 'call'
+        )
+        scale = {"delta": leverage_ratio, "gamma": leverage_ratio**2, "vega": volatility_leverage}
+        quantities = np.asarray(quantities, dtype=float) * self.contract_multiplier
+        return np.array([np.sum(quantities * values[name]) * scale.get(name, 1.0) for name in self.greeks])
+
+    def optimize(self, exposure, candidates: Dict[str, np.ndarray], costs=None, lot_sizes=1.0,
+                 target=None, tolerances=None, integer: bool = True) -> HedgeSolution:
+        """Fee-minimal hedge quantities for book Greeks exposure given candidate_greeks output
+
+        costs are per unit traded (fees, half spreads or premiums; default
+        one per lot, i.e. fewest lots) and lot_sizes the tradable increments
+        per candidate. tolerances bound each Greek's |residual| (default
+        tolerance * |exposure - target|); zero asks for an exact hedge,
+        which whole lots can rarely meet. Raises ValueError if no hedge
+        lies within the tolerances.
+        """
+        A = np.array([candidates[name] for name in self.greeks])               # (n_greeks, n)
+        exposure = np.asarray(exposure, dtype=float)
+        gap = exposure - (0.0 if target is None else np.asarray(target, dtype=float))
+        n = A.shape[1]
+        lot_sizes = np.broadcast_to(np.asarray(lot_sizes, dtype=float), (n,))
+        costs = lot_sizes**-1 if costs is None else costs
+        costs = np.broadcast_to(np.asarray(costs, dtype=float), (n,))
+        if tolerances is None:
+            tolerances = self.tolerance * np.abs(gap)
+        tolerances = np.broadcast_to(np.asarray(tolerances, dtype=float), gap.shape)
+
+        continuous = self._solve(A, gap, costs, lot_sizes, tolerances, integer=False)
+        quantities = self._solve(A, gap, costs, lot_sizes, tolerances, integer=True) if integer else continuous
+        return HedgeSolution(quantities, continuous, exposure, A @ quantities + gap, tolerances,
+                             float(np.abs(quantities) @ costs))
+
+    @staticmethod
+    def _solve(A, gap, costs, lot_sizes, tolerances, integer) -> np.ndarray:
+        """Quantities minimizing fees within the Greek tolerances, in lots of lot_sizes
+
+        Variables are [lots (n), |quantity| (n)]; the fee bound rows
+        |quantity| >= +-lot_size * lots make the second block the absolute
+        quantities at the optimum.
+        """
+        n = A.shape[1]
+        eye = np.eye(n)
+        scaled = lot_sizes * eye
+        constraints = [
+            LinearConstraint(np.hstack([A * lot_sizes, np.zeros_like(A)]), -tolerances - gap, tolerances - gap),
+            LinearConstraint(np.block([[-scaled, eye], [scaled, eye]]), 0, np.inf),
+        ]
+        result = milp(np.concatenate([np.zeros(n), costs]), constraints=constraints,
+                      integrality=np.repeat([1 if integer else 0, 0], n),
+                      bounds=Bounds(np.concatenate([np.full(n, -np.inf), np.zeros(n)]), np.inf))
+        if result.x is None:
+            kind = "whole-lot " if integer else ""
+            raise ValueError(f"No {kind}hedge within the Greek tolerances {tolerances.tolist()}: {result.message}")
+        lots = result.x[:n]
+        return (np.round(lots) if integer else lots) * lot_sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hedge a TQQQ option line's delta, gamma and vega with QQQ instruments")
+    parser.add_argument('--tqqq-price', type=float, default=45.0)
+    parser.add_argument('--tqqq-strike', type=float, default=46.0)
+    parser.add_argument('--tqqq-quantity', type=float, default=-100, help='Contracts, negative short (default: -100)')
+    parser.add_argument('--tqqq-type', choices=['call', 'put'], default='call')
+    parser.add_argument('--tqqq-days', type=int, default=30, help='Calendar days to the TQQQ expiry (default: 30)')
+    parser.add_argument('--qqq-price', type=float, default=370.0)
+    parser.add_argument('--qqq-strikes', type=float, nargs='+', default=[350.0, 360.0, 370.0, 380.0, 390.0])
+    parser.add_argument('--qqq-days', type=int, nargs='+', default=[30, 60],
+                        help='Calendar days to the candidate QQQ expiries (default: 30 60)')
+    parser.add_argument('--volatility', type=float, default=0.25, help='QQQ volatility (default: 0.25)')
+    parser.add_argument('--leverage-ratio', type=float,
+                        help='TQQQ dollars per QQQ dollar (default: 3 * TQQQ price / QQQ price); '
+                             'e.g. a horizon hedge ratio from leveraged_etf.py')
+    parser.add_argument('--fee', type=float, default=0.65, help='Fee per option contract (default: 0.65)')
+    parser.add_argument('--tolerance', type=float, default=0.01,
+                        help='Allowed residual per Greek as a fraction of the book exposure (default: 0.01)')
+    args = parser.parse_args()
+
+    optimizer = HedgeOptimizer(tolerance=args.tolerance)
+    strikes, days, types = np.meshgrid(args.qqq_strikes, args.qqq_days, ['call', 'put'], indexing='ij')
+    strikes, days, types = (np.append(x.ravel(), fill) for x, fill in
+                            zip((strikes, days, types), (args.qqq_price, 0, 'stock')))
+    candidates = optimizer.candidate_greeks(args.qqq_price, strikes, days / 365, types, args.volatility)
+    exposure = optimizer.book_exposure(args.tqqq_price, args.qqq_price, [args.tqqq_strike], [args.tqqq_quantity],
+                                       [args.tqqq_type], args.tqqq_days / 365, 3 * args.volatility,
+                                       args.leverage_ratio)
+    costs = np.where(types == 'stock', 0.005, args.fee)
+    solution = optimizer.optimize(exposure, candidates, costs)
+
+    print(f"{'greek':>6} {'book':>14} {'residual':>14}")
+    for name, before, after in zip(optimizer.greeks, solution.exposure, solution.residual):
+        print(f"{name:>6} {before:>14.2f} {after:>14.2f}")
+    print(f"\n{'instrument':<22} {'quantity':>10}")
+    for i in np.flatnonzero(solution.quantities):
+        label = "QQQ shares" if types[i] == 'stock' else f"QQQ {strikes[i]:.0f} {types[i]} {days[i]}d"
+        print(f"{label:<22} {solution.quantities[i]:>10.0f}")
+    print(f"\nFees: ${solution.cost:,.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Daily-reset leveraged ETF model for TQQQ vs QQQ hedging
+Simulates QQQ/TQQQ paths and derives horizon hedge ratios and TQQQ option values
+"""
+
+import argparse
+import os
+import sys
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Add the src directory to Python path so the shared pricing engine is importable
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from option_analyzer.pricing import ImpliedVolatilityCalculator
+
+TRADING_DAYS = 252
+
+
+@dataclass
+class LeveragedPaths:
+    """Simulated daily closes of QQQ and TQQQ, one row per path"""
+    times: np.ndarray   # (n_days + 1,) years since entry
+    qqq: np.ndarray     # (n_paths, n_days + 1)
+    tqqq: np.ndarray    # (n_paths, n_days + 1)
+
+    @property
+    def n_paths(self) -> int:
+        return len(self.qqq)
+
+    @property
+    def n_days(self) -> int:
+        return len(self.times) - 1
+
+
+class LeveragedETFModel:
+    """Daily-reset leveraged fund on the index QQQ tracks
+
+    Each day the index moves by a lognormal return; QQQ earns it less its
+    expense ratio, and TQQQ earns leverage times it, less financing of the
+    borrowed (leverage - 1) exposure at the risk-free rate plus
+    financing_spread, less its expense ratio, plus independent tracking
+    noise. Compounding the daily resets produces volatility decay, so the
+    TQQQ/QQQ dollar ratio depends on the horizon and drifts from the
+    instantaneous leverage * TQQQ / QQQ. All paths and days are generated
+    in one array pass.
+    """
+
+    def __init__(self, leverage: float = 3.0, expense_ratio: float = 0.0084,
+                 underlying_expense_ratio: float = 0.002, financing_spread: float = 0.0,
+                 tracking_error: float = 0.01):
+        self.leverage = leverage
+        self.expense_ratio = expense_ratio
+        self.underlying_expense_ratio = underlying_expense_ratio
+        self.financing_spread = financing_spread
+        self.tracking_error = tracking_error
+
+    def simulate(self, qqq_price: float, tqqq_price: float, days: int, volatility: float = 0.25,
+                 risk_free_rate: float = 0.05, drift: Optional[float] = None, n_paths: int = 100_000,
+                 seed: int = 0) -> LeveragedPaths:
+        """Daily QQQ/TQQQ paths over days trading days
+
+        The index has the given annual volatility and drift (default: the
+        risk-free rate, i.e. risk neutral for QQQ before fees).
+        """
+        drift = risk_free_rate if drift is None else drift
+        dt = 1.0 / TRADING_DAYS
+        rng = np.random.default_rng(seed)
+        index = np.expm1((drift - 0.5 * volatility**2) * dt
+                         + volatility * np.sqrt(dt) * rng.standard_normal((n_paths, days)))
+        noise = self.tracking_error * np.sqrt(dt) * rng.standard_normal((n_paths, days))
+        carry = ((self.leverage - 1) * (risk_free_rate + self.financing_spread) + self.expense_ratio) * dt
+
+        qqq_growth = 1 + index - self.underlying_expense_ratio * dt
+        tqqq_growth = np.maximum(1 + self.leverage * index - carry + noise, 0)  # a fund cannot go below zero
+        ones = np.ones((n_paths, 1))
+        return LeveragedPaths(np.arange(days + 1) * dt,
+                              qqq_price * np.hstack([ones, np.cumprod(qqq_growth, axis=1)]),
+                              tqqq_price * np.hstack([ones, np.cumprod(tqqq_growth, axis=1)]))
+
+    @staticmethod
+    def horizon_hedge_ratio(paths: LeveragedPaths) -> np.ndarray:
+        """TQQQ dollars per QQQ dollar over every horizon, shape (n_days,)
+
+        Entry d is the regression slope of TQQQ price changes on QQQ price
+        changes over d + 1 days across paths, Cov(dTQQQ, dQQQ) / Var(dQQQ).
+        Passed as leverage_ratio to OptionCalculator.calculate_hedge_quantity,
+        it makes the hedge neutral to QQQ moves over that horizon.
+        """
+        tqqq = paths.tqqq[:, 1:] - paths.tqqq[:, :1]
+        qqq = paths.qqq[:, 1:] - paths.qqq[:, :1]
+        qqq_centered = qqq - qqq.mean(axis=0)
+        return (np.sum((tqqq - tqqq.mean(axis=0)) * qqq_centered, axis=0)
+                / np.sum(qqq_centered**2, axis=0))
+
+    def horizon_leverage(self, days: int, volatility: float = 0.25, risk_free_rate: float = 0.05,
+                         n_paths: int = 20_000, seed: int = 0) -> float:
+        """Horizon hedge ratio over days trading days per unit TQQQ/QQQ price ratio
+
+        Paths scale with their starting prices, so horizon_leverage(d) *
+        tqqq_price / qqq_price is horizon_hedge_ratio at those prices: the
+        horizon counterpart of leverage * tqqq_price / qqq_price.
+        """
+        paths = self.simulate(1.0, 1.0, days, volatility, risk_free_rate, n_paths=n_paths, seed=seed)
+        return float(self.horizon_hedge_ratio(paths)[days - 1])
+
+    @staticmethod
+    def option_values(paths: LeveragedPaths, strikes, expiry_days, is_call=True,
+                      risk_free_rate: float = 0.05) -> Tuple[np.ndarray, np.ndarray]:
+        """Discounted mean TQQQ option payoffs and standard errors, shape (n_expiries, n_strikes)
+
+        Paths should be risk neutral (drift = risk-free rate). Each expiry is
+        in trading days and uses the TQQQ close of that day.
+        """
+        strikes = np.atleast_1d(np.asarray(strikes, dtype=float))
+        expiry_days = np.atleast_1d(np.asarray(expiry_days, dtype=int))
+        if np.any(expiry_days < 1) or np.any(expiry_days > paths.n_days):
+            raise ValueError(f"Expiries must be between 1 and {paths.n_days} days")
+        sign = np.where(np.broadcast_to(is_call, strikes.shape), 1.0, -1.0)
+        discount = np.exp(-risk_free_rate * paths.times[expiry_days])[:, None]
+        values, errors = [], []
+        for day in expiry_days:
+            payoffs = np.maximum(sign * (paths.tqqq[:, day, None] - strikes), 0)
+            values.append(payoffs.mean(axis=0))
+            errors.append(payoffs.std(axis=0) / np.sqrt(paths.n_paths))
+        return discount * np.array(values), discount * np.array(errors)
+
+    @staticmethod
+    def implied_volatilities(paths: LeveragedPaths, strikes, expiry_days, is_call=True,
+                             risk_free_rate: float = 0.05) -> np.ndarray:
+        """Black-Scholes implied volatilities of option_values, shape (n_expiries, n_strikes)"""
+        values, _ = LeveragedETFModel.option_values(paths, strikes, expiry_days, is_call, risk_free_rate)
+        expiries = paths.times[np.atleast_1d(expiry_days)][:, None]
+        return ImpliedVolatilityCalculator().calculate_implied_volatility(
+            values, paths.tqqq[0, 0], np.atleast_1d(strikes), expiries, risk_free_rate, is_call
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Horizon hedge ratios and option values of a daily-reset TQQQ")
+    parser.add_argument('--qqq-price', type=float, default=370.0)
+    parser.add_argument('--tqqq-price', type=float, default=45.0)
+    parser.add_argument('--days', type=int, default=21, help='Longest horizon in trading days (default: 21)')
+    parser.add_argument('--volatility', type=float, default=0.25, help='Index volatility (default: 0.25)')
+    parser.add_argument('--risk-free-rate', type=float, default=0.05)
+    parser.add_argument('--paths', type=int, default=100_000)
+    parser.add_argument('--strikes', type=float, nargs='+', default=[40.0, 45.0, 50.0])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    model = LeveragedETFModel()
+    paths = model.simulate(args.qqq_price, args.tqqq_price, args.days, args.volatility,
+                           args.risk_free_rate, n_paths=args.paths, seed=args.seed)
+    ratios = model.horizon_hedge_ratio(paths)
+    instantaneous = model.leverage * args.tqqq_price / args.qqq_price
+    horizons = sorted({1, 5, args.days // 2, args.days} & set(range(1, args.days + 1)))
+
+    print(f"Instantaneous ratio leverage * TQQQ/QQQ: {instantaneous:.4f}")
+    print(f"{'days':>5} {'hedge ratio':>12} {'vs instant':>10}")
+    for day in horizons:
+        print(f"{day:>5} {ratios[day - 1]:>12.4f} {ratios[day - 1] / instantaneous - 1:>9.2%}")
+
+    values, errors = model.option_values(paths, args.strikes, horizons, True, args.risk_free_rate)
+    vols = model.implied_volatilities(paths, args.strikes, horizons, True, args.risk_free_rate)
+    print(f"\nTQQQ call values (implied volatility) by strike")
+    print(f"{'days':>5} " + " ".join(f"{strike:>20.2f}" for strike in args.strikes))
+    for i, day in enumerate(horizons):
+        print(f"{day:>5} " + " ".join(f"{v:>8.3f}±{e:.3f} ({iv:6.1%})" for v, e, iv
+                                      in zip(values[i], errors[i], vols[i])))
+
+
+if __name__ == "__main__":
+    main()
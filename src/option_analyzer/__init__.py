@@ -1,24 +1,44 @@
 """
 Option Strategy Analyzer - Modular Implementation
 Comprehensive analysis of all 84 option strategies
+
+The visualization layer (matplotlib) and the CLI are imported on first
+attribute access, so pricing, strategy and factory users never load them.
 """
 
-from .models import StrategyConfig
-from .pricing import BlackScholesCalculator
+import importlib
+
+from .models import StrategyConfig, StrategyTensor
+from .pricing import (
+    BlackScholesCalculator, GreeksCalculator, ImpliedVolatilityCalculator, LatticeCalculator,
+    LatticeGreeksCalculator
+)
 from .strategies import (
-    OptionStrategy, LongCallStrategy, LongPutStrategy,
+    OptionStrategy, LegTable, LongCallStrategy, LongPutStrategy,
     ShortCallStrategy, ShortPutStrategy, SpreadStrategy, IronCondorStrategy
 )
 from .factory import StrategyFactory
-from .visualization import VisualizationEngine
-from .cli import main
+from .analytics import (PayoffSummary, PayoffAnalyzer, PnLSurface, MomentAnalyzer, PnLMoments,
+                        ProbabilityAnalyzer, ProfitProbabilities)
+
+# Heavy attributes resolved lazily by __getattr__: name -> submodule
+_LAZY_IMPORTS = {
+    'VisualizationEngine': '.visualization',
+    'main': '.cli',
+}
 
 __version__ = "2.0.0"
 
 __all__ = [
     'StrategyConfig',
+    'StrategyTensor',
     'BlackScholesCalculator',
+    'GreeksCalculator',
+    'ImpliedVolatilityCalculator',
+    'LatticeCalculator',
+    'LatticeGreeksCalculator',
     'OptionStrategy',
+    'LegTable',
     'LongCallStrategy',
     'LongPutStrategy', 
     'ShortCallStrategy',
@@ -26,6 +46,25 @@ __all__ = [
     'SpreadStrategy',
     'IronCondorStrategy',
     'StrategyFactory',
+    'PayoffSummary',
+    'PayoffAnalyzer',
+    'PnLSurface',
+    'MomentAnalyzer',
+    'PnLMoments',
+    'ProbabilityAnalyzer',
+    'ProfitProbabilities',
     'VisualizationEngine',
     'main'
 ]
+
+
+def __getattr__(name):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
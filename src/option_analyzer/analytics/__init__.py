@@ -0,0 +1,11 @@
+"""
+Analytics package for option strategy analyzer
+"""
+
+from .payoff_summary import PayoffSummary, PayoffAnalyzer
+from .pnl_surface import PnLSurface, SurfaceInfo
+from .moments import MomentAnalyzer, PnLMoments
+from .probability import ProbabilityAnalyzer, ProfitProbabilities
+
+__all__ = ['PayoffSummary', 'PayoffAnalyzer', 'PnLSurface', 'SurfaceInfo',
+           'MomentAnalyzer', 'PnLMoments', 'ProbabilityAnalyzer', 'ProfitProbabilities']
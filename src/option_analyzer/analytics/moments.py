@@ -0,0 +1,250 @@
+"""
+Closed-form moments of expiry P&L
+"""
+
+import math
+import numpy as np
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..models import StrategyConfig
+from ..pricing import BlackScholesCalculator, norm_cdf
+from ..strategies import LegTable, OptionStrategy
+
+
+MOMENT_NAMES = ("mean", "variance", "skewness", "kurtosis")
+
+
+@dataclass
+class PnLMoments:
+    """First four moments of expiry P&L over a base price x volatility grid
+
+    Every moment array has shape (n_strategies, n_prices, n_vols). kurtosis
+    is the standardized fourth moment (3 for a normal distribution). exact
+    marks positions whose moments are analytic; calendars are integrated
+    numerically.
+    """
+    codes: List[str]
+    base_prices: np.ndarray
+    volatilities: np.ndarray
+    mean: np.ndarray
+    variance: np.ndarray
+    skewness: np.ndarray
+    kurtosis: np.ndarray
+    exact: np.ndarray
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.variance)
+
+    @property
+    def excess_kurtosis(self) -> np.ndarray:
+        return self.kurtosis - 3.0
+
+    def sel(self, code: str) -> Dict[str, np.ndarray]:
+        """Moments of one strategy, each of shape (n_prices, n_vols)"""
+        try:
+            i = self.codes.index(code)
+        except ValueError:
+            raise KeyError(f"Strategy {code} is not in this batch") from None
+        return {name: getattr(self, name)[i] for name in MOMENT_NAMES}
+
+    def rank(self, by: str = "kurtosis", price_index: int = 0, vol_index: int = 0,
+             descending: bool = True) -> List[str]:
+        """Strategy codes ordered by one moment at one grid point (NaNs last)"""
+        values = getattr(self, by)[:, price_index, vol_index]
+        order = np.argsort(-values if descending else values, kind="stable")
+        order = np.concatenate([order[~np.isnan(values[order])], order[np.isnan(values[order])]])
+        return [self.codes[i] for i in order]
+
+
+def _standardize(mean: np.ndarray, raw: Sequence[np.ndarray]) -> Tuple[np.ndarray, ...]:
+    """(mean, variance, skewness, kurtosis) from raw moments about a shift
+
+    raw holds E[(X - c)^n] for n = 1..4 and mean is E[X].
+    """
+    m1, m2, m3, m4 = raw
+    variance = np.maximum(m2 - m1**2, 0)
+    third = m3 - 3*m1*m2 + 2*m1**3
+    fourth = m4 - 4*m1*m3 + 6*m1**2*m2 - 3*m1**4
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Below this variance the distribution is a point mass (e.g. a box spread)
+        degenerate = variance <= 1e-12 * np.maximum(1.0, mean**2)
+        skewness = np.where(degenerate, np.nan, third / variance**1.5)
+        kurtosis = np.where(degenerate, np.nan, fourth / variance**2)
+    return mean, variance, skewness, kurtosis
+
+
+class MomentAnalyzer:
+    """Mean, variance, skewness and kurtosis of expiry P&L without simulation
+
+    Under a lognormal terminal price the expiry payoff of legs that expire
+    together is piecewise linear, so its moments are sums of lognormal
+    partial moments E[S^m; a < S < b] over the segments between strikes:
+    exact, and vectorized over positions and volatilities. Calendars
+    (legs alive past the front expiry) are integrated with Gauss-Legendre
+    rules on the segments between the front strikes in standard normal
+    space, where the integrand is smooth. A user-supplied terminal
+    distribution is given as (relative prices S_T/S_0, probabilities).
+
+    The entry premium of every grid point is priced at that point's base
+    price and volatility; the terminal distribution drifts at drift
+    (default: the risk-free rate, i.e. risk neutral).
+    """
+
+    def __init__(self, risk_free_rate: float = 0.05, drift: Optional[float] = None,
+                 pricer: Optional[BlackScholesCalculator] = None, quadrature_nodes: int = 24,
+                 tail_width: float = 10.0):
+        self.risk_free_rate = risk_free_rate
+        self.drift = drift
+        self.pricer = pricer or BlackScholesCalculator()
+        self.quadrature_nodes = quadrature_nodes
+        self.tail_width = tail_width
+
+    def moments(self, strategy: OptionStrategy,
+                terminal_distribution: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Dict[str, float]:
+        """Moments of one strategy at its own base price, volatility, rate and pricer"""
+        analyzer = MomentAnalyzer(strategy.risk_free_rate, self.drift, strategy.calculator,
+                                  self.quadrature_nodes, self.tail_width)
+        results = analyzer.moments_book(strategy.legs, strategy.base_price, [strategy.volatility],
+                                        terminal_distribution)
+        return {name: float(values[0, 0]) for name, values in zip(MOMENT_NAMES, results)}
+
+    def moments_catalogue(self, factory, codes: Optional[Sequence[str]] = None,
+                          base_prices: Sequence[float] = (100.0,),
+                          volatilities: Sequence[float] = (0.25,),
+                          where: Optional[Callable[[StrategyConfig], bool]] = None,
+                          terminal_distribution: Optional[Tuple[np.ndarray, np.ndarray]] = None
+                          ) -> PnLMoments:
+        """Moments of StrategyFactory strategies over base prices x volatilities"""
+        base_prices = np.atleast_1d(np.asarray(base_prices, dtype=float))
+        volatilities = np.atleast_1d(np.asarray(volatilities, dtype=float))
+        per_price = []
+        for base_price in base_prices:
+            selected, book, _ = factory.create_book(codes, base_price, self.risk_free_rate, where,
+                                                    self.pricer)
+            per_price.append(self.moments_book(book, base_price, volatilities, terminal_distribution))
+        stacked = [np.stack([moments[k] for moments in per_price], axis=1) for k in range(4)]
+        exact = self._linear(book) if terminal_distribution is None \
+            else np.zeros(book.n_positions, dtype=bool)
+        return PnLMoments(selected, base_prices, volatilities, *stacked, exact=exact)
+
+    def moments_book(self, legs: LegTable, base_price: float, volatilities: Sequence[float],
+                     terminal_distribution: Optional[Tuple[np.ndarray, np.ndarray]] = None
+                     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(mean, variance, skewness, kurtosis), each of shape (n_positions, n_vols)"""
+        vols = np.atleast_1d(np.asarray(volatilities, dtype=float))
+        premiums = self.pricer.calculate_option_prices(base_price, legs.strike, legs.expiry,
+                                                       self.risk_free_rate, vols[:, None], legs.is_call)
+        net_debits = legs.net_debit(premiums).T
+
+        results = [np.empty((legs.n_positions, len(vols))) for _ in MOMENT_NAMES]
+        if terminal_distribution is not None:
+            groups = [(np.arange(legs.n_positions), self._distribution_moments)]
+        else:
+            linear = self._linear(legs)
+            groups = [(np.flatnonzero(linear), self._lognormal_moments),
+                      (np.flatnonzero(~linear), self._quadrature_moments)]
+        for positions, compute in groups:
+            if len(positions):
+                book = legs.select(positions)
+                args = (book, base_price, vols) if terminal_distribution is None \
+                    else (book, base_price, vols, terminal_distribution)
+                for result, values in zip(results, compute(*args)):
+                    result[positions] = values
+        results[0] -= net_debits
+        return tuple(results)
+
+    @property
+    def _mu(self) -> float:
+        """Drift of the terminal distribution"""
+        return self.risk_free_rate if self.drift is None else self.drift
+
+    @staticmethod
+    def _linear(legs: LegTable) -> np.ndarray:
+        """Positions whose legs all expire at the front expiry"""
+        linear = np.ones(legs.n_positions, dtype=bool)
+        linear[legs.position[legs.expiry > legs.front_expiry()[legs.position] + 1e-12]] = False
+        return linear
+
+    def _lognormal_moments(self, legs: LegTable, base_price: float, vols: np.ndarray):
+        """Exact payoff moments from lognormal partial moments over the strike segments"""
+        knots = np.unique(np.concatenate([[0.0], legs.strike]))
+        values = legs.intrinsic_value(knots)                                  # (n_knots, P)
+        slopes = np.vstack([np.diff(values, axis=0) / np.diff(knots)[:, None], legs.tail_slope()[None]])
+        intercepts = values - slopes * knots[:, None]
+
+        # Shift by the payoff at the forward to limit cancellation in the raw moments
+        T = legs.front_expiry()
+        forward = base_price * np.exp(self._mu * T)
+        segment = np.searchsorted(knots, forward, side="right") - 1
+        columns = np.arange(legs.n_positions)
+        shift = intercepts[segment, columns] + slopes[segment, columns] * forward
+        a, b = (intercepts - shift).T, slopes.T                              # (P, n_knots)
+
+        # E[S^m; S < edge] for m = 0..4, shape (V, P, n_edges, 5)
+        m = np.arange(5)
+        s = vols[:, None] * np.sqrt(T)                                        # (V, P)
+        mu = (self._mu - 0.5 * vols[:, None]**2) * T
+        with np.errstate(divide='ignore'):
+            log_edges = np.log(np.append(knots, np.inf) / base_price)
+        z = ((log_edges[None, None, :, None] - mu[..., None, None] - m * (s**2)[..., None, None])
+             / s[..., None, None])
+        full = base_price**m * np.exp(m * mu[..., None] + 0.5 * m**2 * (s**2)[..., None])
+        segments = np.diff(full[:, :, None, :] * norm_cdf(z), axis=2)         # (V, P, n_knots, 5)
+
+        raw = []
+        for n in range(1, 5):
+            total = 0
+            for k in range(n + 1):
+                total = total + math.comb(n, k) * np.einsum("pk,vpk->pv", a**(n - k) * b**k, segments[..., k])
+            raw.append(total)
+        return _standardize(shift[:, None] + raw[0], raw)
+
+    def _quadrature_moments(self, legs: LegTable, base_price: float, vols: np.ndarray):
+        """Payoff moments of calendars by piecewise Gauss-Legendre in standard normal space"""
+        nodes, weights = np.polynomial.legendre.leggauss(self.quadrature_nodes)
+        results = [np.empty((legs.n_positions, len(vols))) for _ in MOMENT_NAMES]
+        for p in range(legs.n_positions):
+            book = legs.select([p])
+            front = float(book.expiry.min())
+            shifted = LegTable(book.option_type, book.strike, book.quantity, book.expiry - front,
+                               book.side, book.position)
+            s = vols * np.sqrt(front)
+            mu = (self._mu - 0.5 * vols**2) * front
+
+            # Segment ends: +-tail_width and every front strike mapped to z, per volatility
+            kinks = (np.log(book.strike[book.expiry <= front + 1e-12] / base_price)[None, :]
+                     - mu[:, None]) / s[:, None]
+            width = self.tail_width + 4 * s[:, None]
+            ends = np.sort(np.hstack([-width, np.clip(kinks, -width, width), width]), axis=1)
+            low, high = ends[:, :-1, None], ends[:, 1:, None]
+            z = (0.5 * (high - low) * (nodes + 1) + low).reshape(len(vols), -1)          # (V, Q)
+            w = (0.5 * (high - low) * weights).reshape(len(vols), -1) \
+                * np.exp(-0.5 * z**2) / np.sqrt(2 * np.pi)
+            S = base_price * np.exp(mu[:, None] + s[:, None] * z)
+            payoff = shifted.value(S, 0.0, self.risk_free_rate, vols[:, None], self.pricer)[..., 0]
+            for result, values in zip(results, self._weighted_moments(payoff, w)):
+                result[p] = values
+        return results
+
+    def _distribution_moments(self, legs: LegTable, base_price: float, vols: np.ndarray,
+                              terminal_distribution: Tuple[np.ndarray, np.ndarray]):
+        """Payoff moments under a discrete terminal distribution of S_T / S_0"""
+        relative, probabilities = (np.asarray(x, dtype=float) for x in terminal_distribution)
+        front = legs.front_expiry()
+        shifted = LegTable(legs.option_type, legs.strike, legs.quantity,
+                           legs.expiry - front[legs.position], legs.side, legs.position)
+        payoff = shifted.value(base_price * relative[None, :], 0.0, self.risk_free_rate,
+                               vols[:, None], self.pricer)                       # (V, Q, P)
+        weights = np.broadcast_to(probabilities, payoff.shape[:2])
+        return self._weighted_moments(np.moveaxis(payoff, -1, 0), weights)
+
+    @staticmethod
+    def _weighted_moments(payoff: np.ndarray, weights: np.ndarray):
+        """Moments of payoff samples (..., V, Q) with quadrature weights (V, Q)"""
+        weights = weights / weights.sum(axis=-1, keepdims=True)
+        mean = (payoff * weights).sum(axis=-1)
+        deviation = payoff - mean[..., None]
+        raw = [np.zeros_like(mean)] + [(deviation**n * weights).sum(axis=-1) for n in range(2, 5)]
+        return _standardize(mean, raw)
@@ -0,0 +1,158 @@
+"""
+Closed-form expiry payoff summaries
+"""
+
+import numpy as np
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+from ..models import StrategyConfig
+from ..pricing import BlackScholesCalculator
+from ..strategies import LegTable, OptionStrategy
+
+
+@dataclass
+class PayoffSummary:
+    """Breakevens and extreme P&L of a position at its front expiry
+
+    max_loss is a positive loss magnitude; unbounded extremes are np.inf.
+    exact is False for positions with legs that outlive the front expiry
+    (calendars), whose expiry payoff is not piecewise linear.
+    """
+    breakevens: np.ndarray
+    max_profit: float
+    max_loss: float
+    exact: bool = True
+
+    @property
+    def profit_bounded(self) -> bool:
+        return bool(np.isfinite(self.max_profit))
+
+    @property
+    def loss_bounded(self) -> bool:
+        return bool(np.isfinite(self.max_loss))
+
+    @property
+    def reward_risk(self) -> float:
+        """max_profit / max_loss (inf for riskless profit, nan when both unbounded)"""
+        if self.max_loss == 0:
+            return np.inf if self.max_profit > 0 else np.nan
+        with np.errstate(invalid='ignore'):
+            return float(np.float64(self.max_profit) / self.max_loss)
+
+
+class PayoffAnalyzer:
+    """Exact breakevens and max profit/loss from the kinks of expiry payoffs
+
+    Expiry P&L of legs that all expire together is piecewise linear with kinks
+    only at the strikes, so it is fully described by its values at S = 0, at
+    every strike and by its slope beyond the last strike. A whole book is
+    summarized at once by evaluating every position on the union of strikes.
+    """
+
+    def __init__(self, risk_free_rate: float = 0.05, volatility: float = 0.25,
+                 pricer: Optional[BlackScholesCalculator] = None,
+                 grid_size: int = 4001, tolerance: float = 1e-10):
+        # Market inputs only value legs that are still alive at the front expiry
+        self.risk_free_rate = risk_free_rate
+        self.volatility = volatility
+        self.pricer = pricer or BlackScholesCalculator()
+        self.grid_size = grid_size
+        self.tolerance = tolerance
+
+    def summarize(self, strategy: OptionStrategy) -> PayoffSummary:
+        """Summarize one strategy using its own rate, volatility and pricer"""
+        analyzer = PayoffAnalyzer(strategy.risk_free_rate, strategy.volatility, strategy.calculator,
+                                  self.grid_size, self.tolerance)
+        return analyzer.summarize_book(strategy.legs, [strategy.get_net_debit()])[0]
+
+    def summarize_catalogue(self, factory, codes: Optional[Sequence[str]] = None,
+                            base_price: float = 100.0,
+                            where: Optional[Callable[[StrategyConfig], bool]] = None
+                            ) -> Dict[str, PayoffSummary]:
+        """Summarize strategies from a StrategyFactory in one batch"""
+        selected, book, net_debits = factory.create_book(codes, base_price, self.risk_free_rate, where)
+        return dict(zip(selected, self.summarize_book(book, net_debits)))
+
+    def summarize_book(self, legs: LegTable, net_debits: Sequence[float]) -> List[PayoffSummary]:
+        """Summarize every position of a book; net_debits are signed entry premiums"""
+        net_debits = np.asarray(net_debits, dtype=float)
+        front = legs.front_expiry()
+        linear = np.ones(legs.n_positions, dtype=bool)
+        linear[legs.position[legs.expiry > front[legs.position] + 1e-12]] = False
+
+        summaries: List[Optional[PayoffSummary]] = [None] * legs.n_positions
+        for kind, summarize in ((True, self._summarize_linear), (False, self._summarize_sampled)):
+            positions = np.flatnonzero(linear == kind)
+            if len(positions):
+                book = legs.select(positions)
+                for position, summary in zip(positions, summarize(book, net_debits[positions])):
+                    summaries[position] = summary
+        return summaries
+
+    def _extremes(self, pnl: np.ndarray, tail_slope: np.ndarray):
+        """Max profit / loss magnitude from P&L samples and the right-tail slope"""
+        max_profit = np.where(tail_slope > self.tolerance, np.inf, pnl.max(axis=0))
+        max_loss = np.where(tail_slope < -self.tolerance, np.inf, -pnl.min(axis=0))
+        return max_profit, max_loss
+
+    def _crossings(self, knots: np.ndarray, pnl: np.ndarray, tail_slope: np.ndarray):
+        """Breakeven candidates (n_candidates, n_positions) and their validity mask"""
+        v0, v1 = pnl[:-1], pnl[1:]
+        k0, k1 = knots[:-1, None], knots[1:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            segment_roots = k0 - v0 * (k1 - k0) / (v1 - v0)
+            tail_root = knots[-1] - pnl[-1] / tail_slope
+        on_knot = np.abs(pnl) <= self.tolerance
+        segment_cross = (v0 * v1 < 0) & ~on_knot[:-1] & ~on_knot[1:]
+        tail_cross = (pnl[-1] * tail_slope < 0) & ~on_knot[-1]
+
+        candidates = np.vstack([segment_roots, np.broadcast_to(knots[:, None], pnl.shape), tail_root[None]])
+        valid = np.vstack([segment_cross, on_knot, tail_cross[None]])
+        return candidates, valid
+
+    def _collect(self, candidates, valid, max_profit, max_loss, exact) -> List[PayoffSummary]:
+        return [PayoffSummary(np.unique(candidates[valid[:, j], j]), float(max_profit[j]),
+                              float(max_loss[j]), exact)
+                for j in range(candidates.shape[1])]
+
+    def _summarize_linear(self, legs: LegTable, net_debits: np.ndarray) -> List[PayoffSummary]:
+        """Exact summary for positions whose legs all expire together"""
+        knots = np.unique(np.concatenate([[0.0], legs.strike]))
+        pnl = legs.intrinsic_value(knots) - net_debits
+        tail_slope = legs.tail_slope()
+
+        max_profit, max_loss = self._extremes(pnl, tail_slope)
+        candidates, valid = self._crossings(knots, pnl, tail_slope)
+        return self._collect(candidates, valid, max_profit, max_loss, True)
+
+    def _summarize_sampled(self, legs: LegTable, net_debits: np.ndarray) -> List[PayoffSummary]:
+        """Grid-refined summary for positions with legs alive past the front expiry"""
+        # Shift every leg so the front expiry of its position is "now"
+        shifted = LegTable(legs.option_type, legs.strike, legs.quantity,
+                           legs.expiry - legs.front_expiry()[legs.position], legs.side, legs.position)
+
+        def pnl_at(stock_prices):
+            return shifted.value(stock_prices, 0.0, self.risk_free_rate, self.volatility,
+                                 self.pricer) - net_debits
+
+        knots = np.unique(np.concatenate([np.linspace(0, 4 * legs.strike.max(), self.grid_size),
+                                          legs.strike]))
+        pnl = pnl_at(knots)
+        # Beyond the grid every later-dated call is worth S - K e^{-rT}: same slope as at expiry
+        tail_slope = legs.tail_slope()
+        max_profit, max_loss = self._extremes(pnl, tail_slope)
+        candidates, valid = self._crossings(knots, pnl, tail_slope)
+
+        # Refine each grid crossing by bisection, all brackets at once
+        segments, positions = np.nonzero(valid[:len(knots) - 1])
+        if len(segments):
+            low, high = knots[segments], knots[segments + 1]
+            low_sign = np.sign(pnl[segments, positions])
+            for _ in range(60):
+                mid = 0.5 * (low + high)
+                mid_sign = np.sign(pnl_at(mid)[np.arange(len(mid)), positions])
+                same = mid_sign == low_sign
+                low, high = np.where(same, mid, low), np.where(same, high, mid)
+            candidates[segments, positions] = 0.5 * (low + high)
+        return self._collect(candidates, valid, max_profit, max_loss, False)
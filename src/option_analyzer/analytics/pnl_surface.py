@@ -0,0 +1,256 @@
+"""
+Lazily built P&L surface over spot, time to expiry and volatility
+"""
+
+import numpy as np
+from collections import namedtuple
+from typing import Dict, Optional, Tuple
+
+from ..pricing import BlackScholesCalculator
+from ..strategies import OptionStrategy
+
+
+SurfaceInfo = namedtuple("SurfaceInfo", ["hits", "misses", "evictions", "currsize", "nbytes"])
+
+
+def _interpolation_error(values: np.ndarray) -> np.ndarray:
+    """Estimated linear interpolation error along each axis of a node grid
+
+    Half the largest second difference: this bounds the error next to a kink
+    (expiry payoffs) and overestimates the h^2 |f''| / 8 of smooth regions.
+    """
+    errors = np.zeros(values.ndim)
+    for axis in range(values.ndim):
+        if values.shape[axis] > 2:
+            errors[axis] = np.max(np.abs(np.diff(values, n=2, axis=axis))) / 2
+    return errors
+
+
+def _nbytes(values: Optional[np.ndarray]) -> int:
+    return 0 if values is None else values.nbytes
+
+
+class PnLSurface:
+    """P&L cube of one strategy, computed block by block and interpolated
+
+    The (spot, time to expiry, volatility) domain is split into blocks. A
+    block is priced the first time a query lands in it, on a uniform grid;
+    while the estimated interpolation error exceeds the tolerance, the cells
+    of the worst axis are halved. Blocks still above tolerance after
+    max_refinement halvings (strikes close to expiry) are priced exactly on
+    every query instead. The time axis is gridded in sqrt(time to expiry),
+    in which option values are smooth.
+    Blocks are kept in an LRU cache bounded by memory_budget bytes between
+    queries. Queries outside the domain are priced exactly.
+
+    Cached blocks are packed into one flat node array with per-block
+    offsets, node counts and strides, so a query interpolates every point
+    of every block with eight gathers and no per-block loop.
+
+    Interpolating costs about the same whatever the strategy, while exact
+    pricing grows with the legs and the pricer. A strategy with fewer than
+    min_legs legs on the closed-form BlackScholesCalculator is cheaper to
+    price exactly (a single leg measured 0.6x with benchmark_surface.py), so
+    its surface is exact_only: every query is priced exactly and nothing is
+    cached. Lattice and Fourier pricers always get a surface.
+
+    The surface snapshots the strategy's legs, entry premium, rate and
+    pricer at construction; build a new surface after changing them.
+    """
+
+    def __init__(self, strategy: OptionStrategy,
+                 spot_range: Optional[Tuple[float, float]] = None,
+                 time_range: Optional[Tuple[float, float]] = None,
+                 vol_range: Tuple[float, float] = (0.05, 1.0),
+                 blocks: Tuple[int, int, int] = (8, 4, 4),
+                 block_cells: Tuple[int, int, int] = (8, 4, 4),
+                 tolerance: float = 0.01,
+                 max_refinement: int = 6,
+                 memory_budget: int = 64 * 2**20,
+                 min_legs: int = 2):
+        self.legs = strategy.legs
+        self.net_debit = strategy.get_net_debit()
+        self.risk_free_rate = strategy.risk_free_rate
+        self.calculator = strategy.calculator
+        self.time_to_expiration = strategy.time_to_expiration
+        self.volatility = strategy.volatility
+        self.exact_only = (self.legs.n_legs < min_legs
+                           and type(self.calculator) is BlackScholesCalculator)
+
+        if spot_range is None:
+            spot_range = (0.5 * strategy.base_price, 1.5 * strategy.base_price)
+        if time_range is None:
+            time_range = (0.0, strategy.time_to_expiration)
+        if min(spot_range[0], time_range[0], vol_range[0]) < 0:
+            raise ValueError("Surface ranges must be non-negative")
+        self.bounds = np.array([spot_range, np.sqrt(time_range), vol_range], dtype=float)
+        if np.any(self.bounds[:, 1] <= self.bounds[:, 0]):
+            raise ValueError("Every surface range must have upper > lower")
+        self.blocks = np.asarray(blocks, dtype=np.intp)
+        self.block_cells = np.asarray(block_cells, dtype=np.intp)
+        self.tolerance = tolerance
+        self.max_refinement = max_refinement
+        self.memory_budget = memory_budget
+
+        self._block_width = (self.bounds[:, 1] - self.bounds[:, 0]) / self.blocks
+        self.clear()
+
+    def pnl(self, stock_prices, time_to_exp=None, volatility=None) -> np.ndarray:
+        """Interpolated P&L for broadcast inputs (same conventions as calculate_payoff)
+
+        time_to_exp None means at expiration; volatility None means the
+        strategy's volatility.
+        """
+        if time_to_exp is None:
+            time_to_exp = 0.0
+        if volatility is None:
+            volatility = self.volatility
+        S, tau, sigma = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (stock_prices, time_to_exp, volatility))
+        )
+        if self.exact_only:
+            return self._exact(S, np.maximum(tau, 0), sigma)
+        points = np.stack([S.ravel(), np.sqrt(np.maximum(tau, 0)).ravel(), sigma.ravel()])
+        result = np.empty(points.shape[1])
+
+        inside = np.all((points >= self.bounds[:, :1]) & (points <= self.bounds[:, 1:]), axis=0)
+        inside_idx = slice(None)
+        if not np.all(inside):
+            S_out, root_tau_out, sigma_out = points[:, ~inside]
+            result[~inside] = self._exact(S_out, root_tau_out**2, sigma_out)
+            inside_idx = np.flatnonzero(inside)
+            points = points[:, inside_idx]
+
+        local = (points - self.bounds[:, :1]) / self._block_width[:, None]
+        block_idx = np.minimum(local.astype(np.intp), self.blocks[:, None] - 1)
+        local -= block_idx
+        flat = np.ravel_multi_index(block_idx, self.blocks)
+        self._touch(flat)
+
+        exact = self._exact_blocks[flat]
+        if np.any(exact):
+            S_in, root_tau_in, sigma_in = points[:, exact]
+            values = np.empty(len(flat))
+            values[exact] = self._exact(S_in, root_tau_in**2, sigma_in)
+            values[~exact] = self._interpolate(flat[~exact], local[:, ~exact])
+        else:
+            values = self._interpolate(flat, local)
+        result[inside_idx] = values
+        self._evict()
+        return result.reshape(S.shape)
+
+    __call__ = pnl
+
+    def _exact(self, stock_prices, time_to_exp, volatility) -> np.ndarray:
+        elapsed = self.time_to_expiration - time_to_exp
+        values = self.legs.value(stock_prices, elapsed, self.risk_free_rate, volatility,
+                                 self.calculator)[..., 0]
+        return values - self.net_debit
+
+    def _price_block(self, key: Tuple[int, int, int], cells: np.ndarray) -> np.ndarray:
+        """Exact P&L on the node grid of a block with the given cells per axis"""
+        lower = self.bounds[:, 0] + np.asarray(key) * self._block_width
+        S, root_tau, sigma = (np.linspace(lo, lo + width, n + 1)
+                              for lo, width, n in zip(lower, self._block_width, cells))
+        return self._exact(S[:, None, None], root_tau[None, :, None]**2, sigma[None, None, :])
+
+    def _build_block(self, key: Tuple[int, int, int]) -> Optional[np.ndarray]:
+        """Price a block, halving the cells of its worst axis until within tolerance
+
+        Returns None for a block that cannot reach tolerance.
+        """
+        cells = self.block_cells.copy()
+        for _ in range(self.max_refinement + 1):
+            values = self._price_block(key, cells)
+            errors = _interpolation_error(values)
+            if errors.sum() <= self.tolerance:
+                return values
+            cells[np.argmax(errors)] *= 2
+        return None
+
+    def _touch(self, flat: np.ndarray):
+        """Mark the blocks of a query as used, building the ones not cached"""
+        touched = np.flatnonzero(np.bincount(flat, minlength=self._last_used.size))
+        missing = touched[~self._cached[touched]]
+        self._stats[0] += len(touched) - len(missing)
+        self._stats[1] += len(missing)
+        self._clock += 1
+        self._last_used[touched] = self._clock
+        for block in missing.tolist():
+            key = tuple(int(i) for i in np.unravel_index(block, self.blocks))
+            values = self._build_block(key)
+            self._blocks[block] = values
+            self._cached[block] = True
+            self._exact_blocks[block] = values is None
+            self._nbytes += _nbytes(values)
+        if len(missing):
+            self._packed = None
+
+    def _evict(self):
+        """Drop least recently used blocks until within budget, keeping at least one"""
+        while self._nbytes > self.memory_budget and len(self._blocks) > 1:
+            cached = np.flatnonzero(self._cached)
+            block = int(cached[np.argmin(self._last_used[cached])])
+            self._nbytes -= _nbytes(self._blocks.pop(block))
+            self._cached[block] = self._exact_blocks[block] = False
+            self._stats[2] += 1
+            self._packed = None
+
+    def _pack(self):
+        """(flat nodes, table) of every cached interpolated block
+
+        Column b of the (6, n_blocks) table holds block b's offset into the
+        flat nodes, its cells per axis and its spot and time strides.
+        """
+        if self._packed is None:
+            table = np.ones((6, self._last_used.size), dtype=np.intp)
+            arrays, size = [], 0
+            for block, values in self._blocks.items():
+                if values is not None:
+                    n_s, n_t, n_v = values.shape
+                    table[:, block] = (size, n_s - 1, n_t - 1, n_v - 1, n_t * n_v, n_v)
+                    arrays.append(values.ravel())
+                    size += values.size
+            self._packed = (np.concatenate(arrays) if arrays else np.zeros(0), table)
+        return self._packed
+
+    def _interpolate(self, flat: np.ndarray, local: np.ndarray) -> np.ndarray:
+        """Trilinear interpolation in cached blocks flat at local coordinates in [0, 1], shape (3, n)
+
+        One gather per cell corner across every block at once.
+        """
+        nodes, table = self._pack()
+        offset, *cells, stride_s, stride_t = table[:, flat]
+        cells = np.stack(cells)
+        scaled = local * cells
+        lower = np.minimum(scaled.astype(np.intp), cells - 1)
+        fs, ft, fv = scaled - lower
+        base = offset + stride_s * lower[0] + stride_t * lower[1] + lower[2]
+
+        # Collapse the volatility, then time, then spot axis
+        edges = []
+        for corner in (base, base + stride_t, base + stride_s, base + stride_s + stride_t):
+            low = nodes[corner]
+            edges.append(low + fv * (nodes[corner + 1] - low))
+        faces = [low + ft * (high - low) for low, high in (edges[:2], edges[2:])]
+        return faces[0] + fs * (faces[1] - faces[0])
+
+    def cache_info(self) -> SurfaceInfo:
+        """Report block hits, misses, evictions, cached blocks and their bytes
+
+        Blocks priced exactly count towards currsize with zero bytes.
+        """
+        hits, misses, evictions = self._stats
+        return SurfaceInfo(hits, misses, evictions, len(self._blocks), self._nbytes)
+
+    def clear(self):
+        """Drop every cached block and reset the statistics"""
+        n_blocks = int(np.prod(self.blocks))
+        self._blocks: Dict[int, Optional[np.ndarray]] = {}
+        self._cached = np.zeros(n_blocks, dtype=bool)
+        self._exact_blocks = np.zeros(n_blocks, dtype=bool)
+        self._last_used = np.zeros(n_blocks, dtype=np.int64)
+        self._clock = 0
+        self._packed = None
+        self._nbytes = 0
+        self._stats = [0, 0, 0]
@@ -0,0 +1,254 @@
+"""
+Closed-form probability of profit, touch probabilities and expected P&L
+"""
+
+import numpy as np
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..models import StrategyConfig
+from ..pricing import BlackScholesCalculator, norm_cdf
+from ..strategies import LegTable, OptionStrategy
+from .moments import MomentAnalyzer
+
+
+PROBABILITY_NAMES = ("probability_of_profit", "expected_pnl", "expected_shortfall")
+
+
+@dataclass
+class ProfitProbabilities:
+    """Expiry P&L probabilities over a base price x volatility grid
+
+    probability_of_profit, expected_pnl and expected_shortfall have shape
+    (n_strategies, n_prices, n_vols); expected_shortfall is the mean loss
+    (positive) in the worst shortfall_level fraction of outcomes. Touch
+    probabilities are per leg: touch_probability[i] is the chance that the
+    price reaches strikes[i] (shape (n_legs, n_prices)) before the front
+    expiry of position leg_position[i]. exact is False for calendars,
+    whose probabilities come from a fine grid.
+    """
+    codes: List[str]
+    base_prices: np.ndarray
+    volatilities: np.ndarray
+    shortfall_level: float
+    probability_of_profit: np.ndarray
+    expected_pnl: np.ndarray
+    expected_shortfall: np.ndarray
+    leg_position: np.ndarray
+    strikes: np.ndarray
+    touch_probability: np.ndarray
+    exact: np.ndarray
+
+    def sel(self, code: str) -> Dict[str, np.ndarray]:
+        """Results of one strategy; touch arrays keep their leg axis first"""
+        try:
+            i = self.codes.index(code)
+        except ValueError:
+            raise KeyError(f"Strategy {code} is not in this batch") from None
+        legs = self.leg_position == i
+        results = {name: getattr(self, name)[i] for name in PROBABILITY_NAMES}
+        results.update(strikes=self.strikes[legs], touch_probability=self.touch_probability[legs])
+        return results
+
+    def rank(self, by: str = "probability_of_profit", price_index: int = 0, vol_index: int = 0,
+             descending: bool = True) -> List[str]:
+        """Strategy codes ordered by one result at one grid point"""
+        values = getattr(self, by)[:, price_index, vol_index]
+        order = np.argsort(-values if descending else values, kind="stable")
+        return [self.codes[i] for i in order]
+
+
+class ProbabilityAnalyzer:
+    """Probability of profit, expected P&L and expected shortfall without simulation
+
+    Expiry P&L of legs that expire together is a + b*S - net_debit on each
+    segment between strikes, so {P&L <= x} is a union of price intervals
+    whose ends are the strikes and the level-x crossings (at x = 0, the
+    breakevens). Their lognormal probabilities and partial expectations
+    give P(P&L <= x) and E[P&L; P&L <= x] exactly for every position and
+    volatility at once; the shortfall quantile is found by vectorized
+    bisection on x. Calendars are evaluated on a fine grid in standard
+    normal space. Touch probabilities use the reflection principle for the
+    running maximum/minimum of geometric Brownian motion.
+
+    Entry premiums are priced at each grid point's base price and
+    volatility; the price drifts at drift (default: the risk-free rate,
+    i.e. risk neutral).
+    """
+
+    def __init__(self, risk_free_rate: float = 0.05, drift: Optional[float] = None,
+                 pricer: Optional[BlackScholesCalculator] = None, shortfall_level: float = 0.05,
+                 grid_size: int = 8001, tail_width: float = 8.0, bisection_steps: int = 64):
+        if not 0 < shortfall_level < 1:
+            raise ValueError(f"shortfall_level must be in (0, 1), got {shortfall_level}")
+        self.risk_free_rate = risk_free_rate
+        self.drift = drift
+        self.pricer = pricer or BlackScholesCalculator()
+        self.shortfall_level = shortfall_level
+        self.grid_size = grid_size
+        self.tail_width = tail_width
+        self.bisection_steps = bisection_steps
+
+    @property
+    def _mu(self) -> float:
+        """Drift of the price"""
+        return self.risk_free_rate if self.drift is None else self.drift
+
+    def analyze(self, strategy: OptionStrategy) -> Dict[str, object]:
+        """Results of one strategy at its own base price, volatility, rate and pricer"""
+        analyzer = ProbabilityAnalyzer(strategy.risk_free_rate, self.drift, strategy.calculator,
+                                       self.shortfall_level, self.grid_size, self.tail_width,
+                                       self.bisection_steps)
+        results = analyzer.analyze_book(strategy.legs, strategy.base_price, [strategy.volatility])
+        summary = {name: float(results[name][0, 0]) for name in PROBABILITY_NAMES}
+        summary["touch_probability"] = dict(zip(strategy.legs.strike.tolist(),
+                                                 results["touch_probability"][:, 0].tolist()))
+        return summary
+
+    def analyze_catalogue(self, factory, codes: Optional[Sequence[str]] = None,
+                          base_prices: Sequence[float] = (100.0,),
+                          volatilities: Sequence[float] = (0.25,),
+                          where: Optional[Callable[[StrategyConfig], bool]] = None
+                          ) -> ProfitProbabilities:
+        """Results for StrategyFactory strategies over base prices x volatilities"""
+        base_prices = np.atleast_1d(np.asarray(base_prices, dtype=float))
+        volatilities = np.atleast_1d(np.asarray(volatilities, dtype=float))
+        per_price, strikes = [], []
+        for base_price in base_prices:
+            selected, book, _ = factory.create_book(codes, base_price, self.risk_free_rate, where,
+                                                    self.pricer)
+            per_price.append(self.analyze_book(book, base_price, volatilities))
+            strikes.append(book.strike)
+        stacked = {name: np.stack([results[name] for results in per_price], axis=1)
+                   for name in PROBABILITY_NAMES + ("touch_probability",)}
+        return ProfitProbabilities(
+            selected, base_prices, volatilities, self.shortfall_level,
+            stacked["probability_of_profit"], stacked["expected_pnl"], stacked["expected_shortfall"],
+            book.position, np.stack(strikes, axis=1), stacked["touch_probability"],
+            MomentAnalyzer._linear(book)
+        )
+
+    def analyze_book(self, legs: LegTable, base_price: float,
+                     volatilities: Sequence[float]) -> Dict[str, np.ndarray]:
+        """Results of every position, each of shape (n_positions, n_vols)
+
+        touch_probability has shape (n_legs, n_vols).
+        """
+        vols = np.atleast_1d(np.asarray(volatilities, dtype=float))
+        premiums = self.pricer.calculate_option_prices(base_price, legs.strike, legs.expiry,
+                                                       self.risk_free_rate, vols[:, None], legs.is_call)
+        net_debits = legs.net_debit(premiums)                                  # (V, P)
+
+        results = {name: np.empty((legs.n_positions, len(vols))) for name in PROBABILITY_NAMES}
+        linear = MomentAnalyzer._linear(legs)
+        positions = np.flatnonzero(linear)
+        if len(positions):
+            book = legs.select(positions)
+            below, low, high = self._lognormal_tail(book, base_price, vols, net_debits[:, positions])
+            for name, values in zip(PROBABILITY_NAMES, self._summarize(below, low, high)):
+                results[name][positions] = values.T
+        for p in np.flatnonzero(~linear):
+            below, low, high = self._sampled_tail(legs.select([p]), base_price, vols, net_debits[:, [p]])
+            for name, values in zip(PROBABILITY_NAMES, self._summarize(below, low, high)):
+                results[name][p] = values[:, 0]
+
+        results["touch_probability"] = self.touch_probability(
+            base_price, legs.strike, legs.front_expiry()[legs.position], vols[:, None]
+        ).T
+        return results
+
+    def touch_probability(self, S, K, T, sigma) -> np.ndarray:
+        """Probability that the price path from S reaches K within T years (broadcast arrays)
+
+        Reflection principle for geometric Brownian motion with drift mu:
+        with nu = mu - sigma^2/2 and h = ln(K/S) above the spot,
+        P = N((-h + nu T)/s) + (K/S)^(2 nu/sigma^2) N((-h - nu T)/s), s = sigma sqrt(T),
+        and the mirror image below the spot.
+        """
+        S, K, T, sigma = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (S, K, T, sigma)))
+        h = np.log(K / S)
+        direction = np.where(h > 0, -1.0, 1.0)
+        nu = self._mu - 0.5 * sigma**2
+        s = sigma * np.sqrt(np.maximum(T, 0))
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            reflected = np.exp(2 * nu * h / sigma**2)
+            probability = (norm_cdf(direction * (h - nu * T) / s)
+                           + np.where(reflected > 0, reflected * norm_cdf(direction * (h + nu * T) / s), 0))
+        probability = np.where(s > 0, np.clip(probability, 0, 1), 0.0)
+        return np.where(h == 0, 1.0, probability)
+
+    def _summarize(self, below, low: np.ndarray, high: np.ndarray):
+        """(probability_of_profit, expected_pnl, expected_shortfall) from a tail function
+
+        below(x) returns (P(P&L <= x), E[P&L; P&L <= x]) for thresholds x;
+        low and high bracket the shortfall_level quantile of P&L.
+        """
+        alpha = self.shortfall_level
+        probability_of_profit = 1 - below(np.zeros_like(low))[0]
+        expected_pnl = below(np.full_like(low, np.inf))[1]
+        for _ in range(self.bisection_steps):
+            middle = 0.5 * (low + high)
+            reached = below(middle)[0] >= alpha
+            low, high = np.where(reached, low, middle), np.where(reached, middle, high)
+        probability, partial = below(high)
+        # Only the part of the atom at the quantile that falls inside the tail counts
+        expected_shortfall = -(partial - high * (probability - alpha)) / alpha
+        return np.clip(probability_of_profit, 0, 1), expected_pnl, expected_shortfall
+
+    def _lognormal_tail(self, legs: LegTable, base_price: float, vols: np.ndarray,
+                        net_debits: np.ndarray) -> Tuple[Callable, np.ndarray, np.ndarray]:
+        """Exact tail function of positions whose legs expire together, shapes (V, P)"""
+        knots = np.unique(np.concatenate([[0.0], legs.strike]))
+        values = legs.intrinsic_value(knots)                                  # (n_knots, P)
+        slopes = np.vstack([np.diff(values, axis=0) / np.diff(knots)[:, None], legs.tail_slope()[None]])
+        a, b = (values - slopes * knots[:, None]).T, slopes.T                  # (P, n_knots)
+        lower, upper = knots, np.append(knots[1:], np.inf)
+
+        T = legs.front_expiry()
+        s = vols[:, None] * np.sqrt(T)                                        # (V, P)
+        m = (self._mu - 0.5 * vols[:, None]**2) * T
+        forward = base_price * np.exp(self._mu * T)
+
+        def below(x):
+            level = (x + net_debits)[..., None] - a                           # payoff <= level
+            with np.errstate(divide='ignore', invalid='ignore'):
+                root = level / b
+                lo = np.where(b < 0, np.maximum(lower, root), lower)
+                hi = np.where(b > 0, np.minimum(upper, root), upper)
+            hi = np.where((b == 0) & (level < 0), lo, np.maximum(hi, lo))
+            with np.errstate(divide='ignore'):
+                z_lo = (np.log(lo / base_price) - m[..., None]) / s[..., None]
+                z_hi = (np.log(hi / base_price) - m[..., None]) / s[..., None]
+            probability = norm_cdf(z_hi) - norm_cdf(z_lo)
+            expected_price = forward[:, None] * (norm_cdf(z_hi - s[..., None]) - norm_cdf(z_lo - s[..., None]))
+            partial = (a - net_debits[..., None]) * probability + b * expected_price
+            return probability.sum(axis=-1), partial.sum(axis=-1)
+
+        # The P&L range over +-tail_width standard deviations brackets any quantile
+        extremes = base_price * np.exp(m + s * np.array([-self.tail_width, self.tail_width])[:, None, None])
+        segment = np.searchsorted(knots, extremes, side="right") - 1                 # (2, V, P)
+        columns = np.arange(legs.n_positions)
+        pnl_extremes = a[columns, segment] + b[columns, segment] * extremes - net_debits
+        pnl_knots = values.T[None] - net_debits[..., None]
+        low = np.minimum(pnl_knots.min(axis=-1), pnl_extremes.min(axis=0)) - 1.0
+        high = np.maximum(pnl_knots.max(axis=-1), pnl_extremes.max(axis=0))
+        return below, low, high
+
+    def _sampled_tail(self, legs: LegTable, base_price: float, vols: np.ndarray,
+                      net_debits: np.ndarray) -> Tuple[Callable, np.ndarray, np.ndarray]:
+        """Tail function of one calendar from its front-expiry P&L on a standard normal grid"""
+        front = float(legs.expiry.min())
+        shifted = LegTable(legs.option_type, legs.strike, legs.quantity, legs.expiry - front,
+                           legs.side, legs.position)
+        z = np.linspace(-self.tail_width, self.tail_width, self.grid_size)
+        edges = np.concatenate([[-np.inf], 0.5 * (z[1:] + z[:-1]), [np.inf]])
+        mass = np.diff(norm_cdf(edges))
+        s = vols[:, None] * np.sqrt(front)
+        S = base_price * np.exp((self._mu - 0.5 * vols[:, None]**2) * front + s * z)
+        pnl = shifted.value(S, 0.0, self.risk_free_rate, vols[:, None], self.pricer) - net_debits[:, None]
+
+        def below(x):
+            inside = pnl <= x[:, None]
+            return (mass[:, None] * inside).sum(axis=1), (mass[:, None] * pnl * inside).sum(axis=1)
+
+        return below, pnl.min(axis=1) - 1.0, pnl.max(axis=1)
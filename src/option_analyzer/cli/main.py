@@ -5,7 +5,7 @@ Command line interface for option strategy analyzer
 import argparse
 
 from ..factory import StrategyFactory
-from ..visualization import VisualizationEngine
+from ..visualization import OUTPUT_PROFILES, VisualizationEngine
 
 
 def main():
@@ -16,6 +16,8 @@ def main():
     parser.add_argument('--info', help='Get info about a specific strategy')
     parser.add_argument('--price', type=float, default=100.0, help='Base stock price (default: 100)')
     parser.add_argument('--output-dir', default='strategy_plot', help='Output directory for plots (default: strategy_plot)')
+    parser.add_argument('--profile', choices=sorted(OUTPUT_PROFILES), default='full',
+                        help='Output profile: full, preview, thumbnail, svg or pdf (default: full)')
     
     args = parser.parse_args()
     
@@ -57,4 +59,4 @@ def main():
     
     # Generate visualization
     viz = VisualizationEngine(strategy, args.output_dir)
-    viz.generate_full_analysis() 
\ No newline at end of file
+    viz.generate_full_analysis(profile=args.profile) 
\ No newline at end of file
@@ -2,13 +2,16 @@
 Strategy factory for creating option strategy instances
 """
 
-from typing import Dict, List, Optional
+import numpy as np
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
-from ..models import StrategyConfig
+from ..models import StrategyConfig, StrategyTensor
+from ..pricing import BlackScholesCalculator
 from ..strategies import (
-    OptionStrategy, LongCallStrategy, LongPutStrategy,
+    OptionStrategy, LegTable, LongCallStrategy, LongPutStrategy,
     ShortCallStrategy, ShortPutStrategy, SpreadStrategy, IronCondorStrategy
 )
+from ..strategies.spread import SPREAD_STRUCTURES
 
 
 class StrategyFactory:
@@ -94,32 +97,34 @@ class StrategyFactory:
                 strategy_type="spread",
                 moneyness="Mixed",
                 time_frame=time_frame,
-                description=f"{spread_names[i]} strategy, {time_frame} expiration"
+                description=f"{spread_names[i]} strategy, {time_frame} expiration",
+                structure=SPREAD_STRUCTURES[spread_names[i]]
             )
         
         return strategies
     
-    def create_strategy(self, code: str, base_price: float = 100.0) -> Optional[OptionStrategy]:
-        """Create strategy object from code"""
+    def create_strategy(self, code: str, base_price: float = 100.0,
+                        pricer: Optional[BlackScholesCalculator] = None) -> Optional[OptionStrategy]:
+        """Create strategy object from code, optionally with an alternative pricer"""
         if code not in self.strategies:
             return None
         
         config = self.strategies[code]
         
         if config.strategy_type == "call":
-            return LongCallStrategy(config, base_price)
+            return LongCallStrategy(config, base_price, pricer)
         elif config.strategy_type == "put":
-            return LongPutStrategy(config, base_price)
+            return LongPutStrategy(config, base_price, pricer)
         elif config.strategy_type == "short_call":
-            return ShortCallStrategy(config, base_price)
+            return ShortCallStrategy(config, base_price, pricer)
         elif config.strategy_type == "short_put":
-            return ShortPutStrategy(config, base_price)
+            return ShortPutStrategy(config, base_price, pricer)
         elif config.strategy_type == "spread":
-            # Check if it's an Iron Condor (S19, S20, S21)
-            if code in ["S19", "S20", "S21"]:
-                return IronCondorStrategy(config, base_price)
+            # Iron Condors (S19, S20, S21) keep their dedicated class
+            if config.structure == "iron_condor":
+                return IronCondorStrategy(config, base_price, pricer)
             else:
-                return SpreadStrategy(config, base_price)
+                return SpreadStrategy(config, base_price, pricer)
         
         return None
     
@@ -129,4 +134,74 @@ class StrategyFactory:
     
     def get_strategy_info(self, code: str) -> Optional[StrategyConfig]:
         """Get strategy configuration info"""
-        return self.strategies.get(code) 
\ No newline at end of file
+        return self.strategies.get(code)
+    
+    def select_strategies(self, codes: Optional[Sequence[str]] = None,
+                          where: Optional[Callable[[StrategyConfig], bool]] = None) -> List[str]:
+        """Filter strategy codes by an explicit list and/or a config predicate"""
+        selected = self.list_strategies() if codes is None else list(codes)
+        unknown = [code for code in selected if code not in self.strategies]
+        if unknown:
+            raise KeyError(f"Unknown strategy codes: {', '.join(unknown)}")
+        if where is not None:
+            selected = [code for code in selected if where(self.strategies[code])]
+        return selected
+    
+    def create_book(self, codes: Optional[Sequence[str]] = None, base_price: float = 100.0,
+                    risk_free_rate: float = 0.05,
+                    where: Optional[Callable[[StrategyConfig], bool]] = None,
+                    pricer: Optional[BlackScholesCalculator] = None
+                    ) -> Tuple[List[str], LegTable, np.ndarray]:
+        """Stack the selected strategies into one LegTable
+        
+        Returns (codes, legs, net_debits) where position i of legs is codes[i]
+        and net_debits[i] is its signed entry premium, priced at each
+        strategy's own volatility.
+        """
+        selected = self.select_strategies(codes, where)
+        if not selected:
+            raise ValueError("No strategies selected")
+        strategies = [self.create_strategy(code, base_price, pricer) for code in selected]
+        
+        book = LegTable.concatenate([strategy.legs for strategy in strategies])
+        entry_vols = np.array([strategy.volatility for strategy in strategies])[book.position]
+        premiums = strategies[0].calculator.calculate_option_prices(
+            base_price, book.strike, book.expiry, risk_free_rate, entry_vols, book.is_call
+        )
+        return selected, book, book.net_debit(premiums)
+    
+    def evaluate_batch(self, codes: Optional[Sequence[str]] = None, base_price: float = 100.0,
+                       stock_prices: Optional[np.ndarray] = None,
+                       times: Optional[np.ndarray] = None,
+                       volatilities: Optional[np.ndarray] = None,
+                       risk_free_rate: float = 0.05,
+                       where: Optional[Callable[[StrategyConfig], bool]] = None,
+                       max_chunk_elements: int = 20_000_000,
+                       pricer: Optional[BlackScholesCalculator] = None) -> StrategyTensor:
+        """Evaluate many strategies over one shared price x time x volatility grid
+        
+        All legs of all selected strategies are stacked into one LegTable and
+        valued together. times are years elapsed since entry (legs past their
+        expiry are worth intrinsic value). Entry premiums are fixed at each
+        strategy's own volatility; the volatility axis reprices the open
+        position. The price axis is processed in chunks of at most
+        max_chunk_elements leg values to bound memory. pricer replaces
+        Black-Scholes for both the entry premiums and the grid.
+        """
+        selected, book, net_debits = self.create_book(codes, base_price, risk_free_rate, where, pricer)
+        if stock_prices is None:
+            stock_prices = np.linspace(0.8, 1.2, 41) * base_price
+        stock_prices = np.atleast_1d(np.asarray(stock_prices, dtype=float))
+        times = np.atleast_1d(np.asarray(0.0 if times is None else times, dtype=float))
+        volatilities = np.atleast_1d(np.asarray(0.25 if volatilities is None else volatilities, dtype=float))
+        
+        n_prices, n_times, n_vols = len(stock_prices), len(times), len(volatilities)
+        values = np.empty((len(selected), n_prices, n_times, n_vols))
+        chunk = max(1, max_chunk_elements // max(1, book.n_legs * n_times * n_vols))
+        for start in range(0, n_prices, chunk):
+            block = book.value(stock_prices[start:start + chunk, None, None], times[None, :, None],
+                               risk_free_rate, volatilities[None, None, :], pricer)
+            values[:, start:start + chunk] = np.moveaxis(block, -1, 0)
+        values -= net_debits[:, None, None, None]
+        
+        return StrategyTensor(values, selected, stock_prices, times, volatilities)
@@ -3,5 +3,6 @@ Models package for option strategy analyzer
 """
 
 from .strategy_config import StrategyConfig
+from .strategy_tensor import StrategyTensor
 
-__all__ = ['StrategyConfig']
+__all__ = ['StrategyConfig', 'StrategyTensor']
@@ -13,4 +13,5 @@ class StrategyConfig:
     strategy_type: str  # call, put, short_call, short_put, spread
     moneyness: str     # Deep OTM, Shallow OTM, ATM, Shallow ITM, Deep ITM
     time_frame: str    # Near, Medium, Long
-    description: str 
\ No newline at end of file
+    description: str
+    structure: str = ""  # spread leg template (bull_call, iron_condor, ...); empty for single legs
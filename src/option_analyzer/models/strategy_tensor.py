@@ -0,0 +1,33 @@
+"""
+Labelled batch evaluation result
+"""
+
+import numpy as np
+from dataclasses import dataclass
+from typing import List, Tuple
+
+
+@dataclass
+class StrategyTensor:
+    """P&L of many strategies over a shared price x time x volatility grid"""
+    values: np.ndarray          # (n_strategies, n_prices, n_times, n_vols)
+    codes: List[str]
+    stock_prices: np.ndarray
+    times: np.ndarray           # years elapsed since entry
+    volatilities: np.ndarray
+    dims: Tuple[str, ...] = ("strategy", "price", "time", "volatility")
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.values.shape
+
+    def sel(self, code: str) -> np.ndarray:
+        """P&L cube of one strategy, shape (n_prices, n_times, n_vols)"""
+        try:
+            return self.values[self.codes.index(code)]
+        except ValueError:
+            raise KeyError(f"Strategy {code} is not in this batch") from None
+
+    def axis(self, dim: str) -> int:
+        """Axis number of a named dimension"""
+        return self.dims.index(dim)
@@ -3,5 +3,16 @@ Pricing package for option strategy analyzer
 """
 
 from .black_scholes import BlackScholesCalculator
+from .greeks import GreeksCalculator
+from .fourier import (
+    FourierCalculator, GeometricBrownianModel, HestonModel, MertonModel, VarianceGammaModel
+)
+from .implied_volatility import ImpliedVolatilityCalculator
+from .lattice import LatticeCalculator, LatticeGreeksCalculator
+from .monte_carlo import MonteCarloEngine, MonteCarloEstimate, PathPnL
+from .normal import norm_cdf, norm_pdf
 
-__all__ = ['BlackScholesCalculator']
+__all__ = ['BlackScholesCalculator', 'GreeksCalculator', 'ImpliedVolatilityCalculator', 'LatticeCalculator',
+           'LatticeGreeksCalculator', 'MonteCarloEngine', 'MonteCarloEstimate', 'PathPnL', 'FourierCalculator',
+           'GeometricBrownianModel', 'HestonModel', 'MertonModel', 'VarianceGammaModel',
+           'norm_cdf', 'norm_pdf']
@@ -3,7 +3,10 @@ Black-Scholes option pricing calculator
 """
 
 import math
-from scipy.stats import norm
+import numpy as np
+from typing import Tuple
+
+from .normal import norm_cdf
 
 
 class BlackScholesCalculator:
@@ -17,7 +20,7 @@ class BlackScholesCalculator:
         d1 = (math.log(S/K) + (r + 0.5*sigma**2)*T) / (sigma*math.sqrt(T))
         d2 = d1 - sigma*math.sqrt(T)
         
-        call_price = S*norm.cdf(d1) - K*math.exp(-r*T)*norm.cdf(d2)
+        call_price = S*norm_cdf(d1) - K*math.exp(-r*T)*norm_cdf(d2)
         return max(call_price, 0)
     
     def calculate_put_price(self, S: float, K: float, T: float, r: float, sigma: float) -> float:
@@ -28,5 +31,64 @@ class BlackScholesCalculator:
         d1 = (math.log(S/K) + (r + 0.5*sigma**2)*T) / (sigma*math.sqrt(T))
         d2 = d1 - sigma*math.sqrt(T)
         
-        put_price = K*math.exp(-r*T)*norm.cdf(-d2) - S*norm.cdf(-d1)
-        return max(put_price, 0) 
\ No newline at end of file
+        put_price = K*math.exp(-r*T)*norm_cdf(-d2) - S*norm_cdf(-d1)
+        return max(put_price, 0)
+
+    def calculate_d1_d2(self, S, K, T, r, sigma) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Calculate broadcast d1/d2 arrays for array inputs
+
+        Returns (d1, d2, active) where ``active`` marks the elements with
+        T > 0, sigma > 0 and S > 0. d1/d2 are zero outside the active mask.
+        """
+        S, K, T, r, sigma = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (S, K, T, r, sigma))
+        )
+        if np.any(S < 0) or np.any(K <= 0):
+            raise ValueError("Stock prices must be non-negative and strikes positive")
+
+        active = (T > 0) & (sigma > 0) & (S > 0)
+        d1 = np.zeros(S.shape)
+        d2 = np.zeros(S.shape)
+        if np.any(active):
+            sqrt_t = np.sqrt(T[active])
+            vol_sqrt_t = sigma[active] * sqrt_t
+            d1[active] = (np.log(S[active] / K[active])
+                          + (r[active] + 0.5*sigma[active]**2)*T[active]) / vol_sqrt_t
+            d2[active] = d1[active] - vol_sqrt_t
+        return d1, d2, active
+
+    def calculate_option_prices(self, S, K, T, r, sigma, is_call) -> np.ndarray:
+        """Calculate Black-Scholes prices for broadcast array inputs
+
+        All arguments broadcast against each other; ``is_call`` selects the
+        call or put formula per element. Elements with T <= 0 are worth their
+        intrinsic value and elements with sigma <= 0 (or S == 0) are worth the
+        discounted forward intrinsic value, so no masked element hits log(0)
+        or a division by zero.
+        """
+        S, K, T, r, sigma, is_call = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (S, K, T, r, sigma)),
+            np.asarray(is_call, dtype=bool)
+        )
+        d1, d2, active = self.calculate_d1_d2(S, K, T, r, sigma)
+
+        # Deterministic limits: intrinsic at expiry, discounted forward intrinsic at zero vol
+        discounted_strike = K * np.exp(-r * np.maximum(T, 0))
+        forward_intrinsic = S - discounted_strike
+        prices = np.where(is_call, np.maximum(forward_intrinsic, 0), np.maximum(-forward_intrinsic, 0))
+
+        if np.any(active):
+            S_a, Kd_a, call_a = S[active], discounted_strike[active], is_call[active]
+            d1_a, d2_a = d1[active], d2[active]
+            call_prices = S_a*norm_cdf(d1_a) - Kd_a*norm_cdf(d2_a)
+            put_prices = Kd_a*norm_cdf(-d2_a) - S_a*norm_cdf(-d1_a)
+            prices[active] = np.maximum(np.where(call_a, call_prices, put_prices), 0)
+        return prices
+
+    def calculate_call_prices(self, S, K, T, r, sigma) -> np.ndarray:
+        """Calculate call prices for broadcast array inputs"""
+        return self.calculate_option_prices(S, K, T, r, sigma, True)
+
+    def calculate_put_prices(self, S, K, T, r, sigma) -> np.ndarray:
+        """Calculate put prices for broadcast array inputs"""
+        return self.calculate_option_prices(S, K, T, r, sigma, False)
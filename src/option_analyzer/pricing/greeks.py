@@ -0,0 +1,105 @@
+"""
+Analytic Black-Scholes Greeks calculator
+"""
+
+import math
+import numpy as np
+from typing import Dict, Optional
+
+from .black_scholes import BlackScholesCalculator
+from .normal import norm_cdf, norm_pdf
+
+
+GREEK_NAMES = ("delta", "gamma", "vega", "theta", "rho", "vanna", "volga")
+
+
+class GreeksCalculator:
+    """Vectorized Black-Scholes Greeks for calls and puts
+
+    Units: vega, vanna and volga are per 1.00 change in volatility, theta is
+    per year and rho is per 1.00 change in the risk-free rate.
+    """
+
+    def __init__(self, pricer: Optional[BlackScholesCalculator] = None):
+        self.pricer = pricer or BlackScholesCalculator()
+
+    def calculate_greeks(self, S, K, T, r, sigma, is_call) -> Dict[str, np.ndarray]:
+        """Calculate price and all Greeks for broadcast array inputs
+
+        d1/d2 are computed once and shared by the price and every Greek.
+        Elements with T <= 0 or sigma <= 0 follow the deterministic
+        (discounted forward intrinsic) limit: delta is a step, the second
+        order Greeks are zero.
+        """
+        S, K, T, r, sigma, is_call = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (S, K, T, r, sigma)),
+            np.asarray(is_call, dtype=bool)
+        )
+        d1, d2, active = self.pricer.calculate_d1_d2(S, K, T, r, sigma)
+
+        T_pos = np.maximum(T, 0)
+        discount = np.exp(-r * T_pos)
+        discounted_strike = K * discount
+        sign = np.where(is_call, 1.0, -1.0)
+
+        # Deterministic limit, used for expired and zero-vol elements
+        in_the_money = (sign * (S - discounted_strike) > 0).astype(float)
+        zeros = np.zeros(S.shape)
+        greeks = {
+            "price": in_the_money * sign * (S - discounted_strike),
+            "delta": in_the_money * sign,
+            "gamma": zeros,
+            "vega": zeros,
+            "theta": np.where(T > 0, -in_the_money * sign * r * discounted_strike, 0.0),
+            "rho": in_the_money * sign * K * T_pos * discount,
+            "vanna": zeros,
+            "volga": zeros,
+        }
+        greeks = {name: np.array(values, dtype=float) for name, values in greeks.items()}
+
+        if np.any(active):
+            S_a, K_a, T_a, r_a = S[active], K[active], T[active], r[active]
+            sigma_a, sign_a, Kd_a = sigma[active], sign[active], discounted_strike[active]
+            d1_a, d2_a = d1[active], d2[active]
+            sqrt_t = np.sqrt(T_a)
+            pdf_d1 = norm_pdf(d1_a)
+            cdf_d1 = norm_cdf(sign_a * d1_a)
+            cdf_d2 = norm_cdf(sign_a * d2_a)
+            vega = S_a * pdf_d1 * sqrt_t
+
+            greeks["price"][active] = np.maximum(sign_a * (S_a*cdf_d1 - Kd_a*cdf_d2), 0)
+            greeks["delta"][active] = sign_a * cdf_d1
+            greeks["gamma"][active] = pdf_d1 / (S_a * sigma_a * sqrt_t)
+            greeks["vega"][active] = vega
+            greeks["theta"][active] = (-S_a * pdf_d1 * sigma_a / (2 * sqrt_t)
+                                       - sign_a * r_a * Kd_a * cdf_d2)
+            greeks["rho"][active] = sign_a * K_a * T_a * np.exp(-r_a * T_a) * cdf_d2
+            greeks["vanna"][active] = -pdf_d1 * d2_a / sigma_a
+            greeks["volga"][active] = vega * d1_a * d2_a / sigma_a
+
+        return greeks
+
+    def calculate_delta(self, S, K, T, r, sigma, is_call) -> np.ndarray:
+        """Calculate delta only for broadcast array inputs"""
+        S, K, T, r, sigma, is_call = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (S, K, T, r, sigma)),
+            np.asarray(is_call, dtype=bool)
+        )
+        d1, _, active = self.pricer.calculate_d1_d2(S, K, T, r, sigma)
+        sign = np.where(is_call, 1.0, -1.0)
+        forward_intrinsic = S - K * np.exp(-r * np.maximum(T, 0))
+        delta = np.where(sign * forward_intrinsic > 0, sign, 0.0)
+        delta[active] = norm_cdf(d1[active]) - (~is_call[active])
+        return delta
+
+    def calculate_call_delta(self, S: float, K: float, T: float, r: float, sigma: float) -> float:
+        """Calculate the delta of one call from float inputs
+
+        Scalar fast path for per-quote callers such as the hedge CLI; it
+        matches calculate_delta, including the deterministic limits.
+        """
+        if T <= 0 or sigma <= 0 or S <= 0:
+            return 1.0 if S - K * math.exp(-r * max(T, 0)) > 0 else 0.0
+        vol_sqrt_t = sigma * math.sqrt(T)
+        d1 = (math.log(S / K) + (r + 0.5*sigma**2)*T) / vol_sqrt_t
+        return norm_cdf(d1)
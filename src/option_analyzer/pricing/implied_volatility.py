@@ -0,0 +1,118 @@
+"""
+Batched implied volatility solver
+"""
+
+import numpy as np
+from typing import Optional, Tuple
+
+from .black_scholes import BlackScholesCalculator
+from .normal import norm_cdf, norm_pdf
+
+
+class ImpliedVolatilityCalculator:
+    """Invert Black-Scholes prices to implied volatilities for whole option chains
+
+    Every quote is solved at once: a Corrado-Miller rational approximation
+    seeds a vectorized Newton iteration, and any Newton step that leaves the
+    current [low, high] bracket (or meets a vanishing vega) is replaced by a
+    bisection step. Elements drop out of the iteration as they converge:
+    once the price error is below tol * max(price, 1) and the Newton step
+    |error| / vega is below tol, so a quote worth a fraction of a cent still
+    has to pin its volatility down rather than any price below tol.
+    """
+
+    def __init__(self, pricer: Optional[BlackScholesCalculator] = None,
+                 min_volatility: float = 1e-6, max_volatility: float = 5.0):
+        self.pricer = pricer or BlackScholesCalculator()
+        self.min_volatility = min_volatility
+        self.max_volatility = max_volatility
+
+    def calculate_implied_volatility(self, option_prices, S, K, T, r, is_call,
+                                     tol: float = 1e-8, max_iter: int = 100) -> np.ndarray:
+        """Calculate implied volatilities for broadcast array inputs
+
+        Quotes outside the no-arbitrage bounds, expired contracts and quotes
+        that fail to converge come back as NaN.
+        """
+        vols, _ = self.solve(option_prices, S, K, T, r, is_call, tol, max_iter)
+        return vols
+
+    def solve(self, option_prices, S, K, T, r, is_call,
+              tol: float = 1e-8, max_iter: int = 100) -> Tuple[np.ndarray, np.ndarray]:
+        """Solve for implied volatilities, returning (vols, converged) arrays"""
+        prices, S, K, T, r, is_call = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (option_prices, S, K, T, r)),
+            np.asarray(is_call, dtype=bool)
+        )
+        discounted_strike = K * np.exp(-r * np.maximum(T, 0))
+
+        # Work in call space: put-call parity maps every put quote to a call quote
+        call_prices = np.where(is_call, prices, prices + S - discounted_strike)
+        lower_bound = np.maximum(S - discounted_strike, 0)
+        valid = (T > 0) & (S > 0) & (K > 0) & (call_prices > lower_bound) & (call_prices < S)
+
+        vols = np.full(prices.shape, np.nan)
+        converged = np.zeros(prices.shape, dtype=bool)
+        if not np.any(valid):
+            return vols, converged
+
+        target = call_prices[valid]
+        S_v, K_v, T_v, r_v = S[valid], K[valid], T[valid], r[valid]
+        sqrt_t = np.sqrt(T_v)
+
+        low = np.full(target.shape, self.min_volatility)
+        high = np.full(target.shape, self.max_volatility)
+        sigma = np.clip(self._initial_guess(target, S_v, discounted_strike[valid], T_v),
+                        low * 10, high / 2)
+        done = np.zeros(target.shape, dtype=bool)
+
+        for _ in range(max_iter):
+            idx = np.flatnonzero(~done)
+            if idx.size == 0:
+                break
+            s_i = sigma[idx]
+            d1, d2, _ = self.pricer.calculate_d1_d2(S_v[idx], K_v[idx], T_v[idx], r_v[idx], s_i)
+            model = S_v[idx]*norm_cdf(d1) - K_v[idx]*np.exp(-r_v[idx]*T_v[idx])*norm_cdf(d2)
+            vega = S_v[idx] * norm_pdf(d1) * sqrt_t[idx]
+            diff = model - target[idx]
+
+            with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+                step = diff / vega
+            finished = (np.abs(diff) < tol * np.maximum(target[idx], 1.0)) & (np.abs(step) < tol)
+            done[idx[finished]] = True
+
+            # Tighten the bracket: call prices increase monotonically in sigma
+            too_high = diff > 0
+            high[idx] = np.where(too_high, s_i, high[idx])
+            low[idx] = np.where(too_high, low[idx], s_i)
+
+            newton = s_i - step
+            bisection = 0.5 * (low[idx] + high[idx])
+            safe = (vega > 1e-12) & (newton > low[idx]) & (newton < high[idx])
+            sigma[idx] = np.where(finished, s_i, np.where(safe, newton, bisection))
+
+            # A collapsed bracket is as converged as the volatility grid allows,
+            # unless it collapsed onto a volatility limit the quote lies beyond
+            collapsed = ((high[idx] - low[idx]) < tol * 1e-2) \
+                & (low[idx] > self.min_volatility) & (high[idx] < self.max_volatility)
+            done[idx[collapsed]] = True
+
+        solved = np.where(done, sigma, np.nan)
+        vols[valid] = solved
+        converged[valid] = done
+        return vols, converged
+
+    @staticmethod
+    def _initial_guess(call_prices, S, discounted_strike, T) -> np.ndarray:
+        """Corrado-Miller rational approximation of sigma
+
+        Falls back to the Brenner-Subrahmanyam ATM approximation where the
+        square-root argument turns negative (far from the money).
+        """
+        forward_gap = S - discounted_strike
+        centered = call_prices - forward_gap / 2
+        radicand = centered**2 - forward_gap**2 / np.pi
+        corrado_miller = (np.sqrt(2*np.pi) / (S + discounted_strike)
+                          * (centered + np.sqrt(np.maximum(radicand, 0))) / np.sqrt(T))
+        brenner_subrahmanyam = np.sqrt(2*np.pi / T) * call_prices / S
+        return np.where(radicand > 0, corrado_miller, brenner_subrahmanyam)
@@ -0,0 +1,236 @@
+"""
+Chunked, multi-process Monte Carlo pricer and strategy P&L simulator
+"""
+
+import warnings
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+MonteCarloEstimate = namedtuple("MonteCarloEstimate", ["price", "std_error", "n_paths"])
+
+
+@dataclass
+class PathPnL:
+    """P&L of one strategy along simulated price paths
+
+    Per-path statistics are kept instead of the paths themselves, so memory
+    grows with n_paths, not n_paths * n_steps.
+    """
+    times: np.ndarray      # (n_steps + 1,) years since entry
+    mean: np.ndarray       # (n_steps + 1,) mean P&L at each time
+    final: np.ndarray      # (n_paths,) P&L at the front expiry
+    minimum: np.ndarray    # (n_paths,) worst P&L reached along the path
+    maximum: np.ndarray    # (n_paths,) best P&L reached along the path
+
+    @property
+    def n_paths(self) -> int:
+        return len(self.final)
+
+    @property
+    def probability_of_profit(self) -> float:
+        return float(np.mean(self.final > 0))
+
+    def quantiles(self, q) -> np.ndarray:
+        """Quantiles of the final P&L"""
+        return np.quantile(self.final, q)
+
+
+def _normals(seed, sobol_seed: Optional[int], start: int, n_base: int, dims: int,
+             antithetic: bool) -> np.ndarray:
+    """Standard normal draws of one chunk, shape (n_base * (1 + antithetic), dims)
+
+    Pseudo-random chunks draw from their own spawned seed stream; Sobol
+    chunks take points [start, start + n_base) of one scrambled sequence.
+    Antithetic chunks stack the draws and their negations.
+    """
+    if sobol_seed is None:
+        z = np.random.default_rng(seed).standard_normal((n_base, dims))
+    else:
+        from scipy.special import ndtri
+        from scipy.stats import qmc
+        sampler = qmc.Sobol(dims, scramble=True, seed=sobol_seed)
+        if start:
+            sampler.fast_forward(start)
+        with warnings.catch_warnings():
+            # Sobol balance warning for a final chunk that is not a power of two
+            warnings.simplefilter("ignore", UserWarning)
+            z = ndtri(sampler.random(n_base))
+    return np.concatenate([z, -z]) if antithetic else z
+
+
+def _price_chunk(task) -> Tuple[int, np.ndarray, int]:
+    """Control-variate sums of one chunk: rows y, x, xy, xx, yy per contract"""
+    index, (S, K, T, r, sigma, sign), seed, sobol_seed, start, n_base, antithetic = task
+    z = _normals(seed, sobol_seed, start, n_base, 1, antithetic)
+    discount = np.exp(-r * T)
+    terminal = S * np.exp((r - 0.5 * sigma**2) * T + sigma * np.sqrt(T) * z)
+    y = discount * np.maximum(sign * (terminal - K), 0)
+    x = discount * terminal  # control variate with known mean S
+    if antithetic:
+        # Each antithetic pair is one independent sample
+        y = 0.5 * (y[:n_base] + y[n_base:])
+        x = 0.5 * (x[:n_base] + x[n_base:])
+    sums = np.stack([y.sum(0), x.sum(0), (x * y).sum(0), (x * x).sum(0), (y * y).sum(0)])
+    return index, sums, len(y)
+
+
+def _simulate_paths(S0: float, times: np.ndarray, drift: float, sigma: float,
+                    z: np.ndarray) -> np.ndarray:
+    """Geometric Brownian motion paths on a time grid from (n, n_steps) normals"""
+    dt = np.diff(times)
+    log_steps = (drift - 0.5 * sigma**2) * dt + sigma * np.sqrt(dt) * z
+    log_paths = np.concatenate([np.zeros((len(z), 1)), np.cumsum(log_steps, axis=1)], axis=1)
+    return S0 * np.exp(log_paths)
+
+
+def _pnl_chunk(task):
+    """Per-path final/min/max P&L and the summed P&L path of one chunk"""
+    index, strategy, times, drift, seed, sobol_seed, start, n_base, antithetic = task
+    z = _normals(seed, sobol_seed, start, n_base, len(times) - 1, antithetic)
+    paths = _simulate_paths(strategy.base_price, times, drift, strategy.volatility, z)
+    pnl = strategy.legs.value(paths, times, strategy.risk_free_rate, strategy.volatility,
+                              strategy.calculator)[..., 0] - strategy.get_net_debit()
+    return index, (pnl[:, -1], pnl.min(axis=1), pnl.max(axis=1), pnl.sum(axis=0))
+
+
+class MonteCarloEngine:
+    """Monte Carlo European option pricer and path P&L simulator
+
+    Paths are generated in chunks of at most max_chunk_elements values, so
+    memory stays bounded at any n_paths. Every chunk has its own seed
+    stream spawned from seed (or its own slice of one scrambled Sobol
+    sequence), so results are reproducible and do not depend on workers;
+    with workers > 1 chunks run in a process pool. Antithetic variates
+    pair every draw with its negation, and the control variate regresses
+    discounted payoffs on the discounted terminal price, whose mean is
+    known. Sobol standard errors assume independent samples and overstate
+    the error of the quasi-random estimate.
+    """
+
+    def __init__(self, n_paths: int = 200_000, antithetic: bool = True, sobol: bool = False,
+                 control_variate: bool = True, seed: int = 0, workers: int = 1,
+                 max_chunk_elements: int = 4_000_000):
+        if n_paths < 2:
+            raise ValueError(f"n_paths must be at least 2, got {n_paths}")
+        self.n_paths = n_paths
+        self.antithetic = antithetic
+        self.sobol = sobol
+        self.control_variate = control_variate
+        self.seed = seed
+        self.workers = workers
+        self.max_chunk_elements = max_chunk_elements
+
+    def _plan(self, elements_per_path: int) -> List[tuple]:
+        """Chunk layout as (seed, sobol_seed, start, n_base) tuples covering n_paths"""
+        paths_per_draw = 2 if self.antithetic else 1
+        n_base_total = -(-self.n_paths // paths_per_draw)
+        chunk = max(1, self.max_chunk_elements // (elements_per_path * paths_per_draw))
+        if self.sobol:
+            chunk = 1 << (chunk.bit_length() - 1)  # keep Sobol chunks balanced
+        starts = range(0, n_base_total, chunk)
+
+        root = np.random.SeedSequence(self.seed)
+        sobol_seed = int(root.generate_state(1)[0]) if self.sobol else None
+        return [(child, sobol_seed, start, min(chunk, n_base_total - start))
+                for child, start in zip(root.spawn(len(starts)), starts)]
+
+    def _run(self, worker, tasks) -> Iterator:
+        """Run tasks in-process or across the pool, yielding results as they finish"""
+        if self.workers == 1 or len(tasks) == 1:
+            for task in tasks:
+                yield worker(task)
+            return
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(worker, task) for task in tasks]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def iter_estimates(self, S, K, T, r, sigma, is_call) -> Iterator[MonteCarloEstimate]:
+        """Running price estimates for broadcast array inputs, one per finished chunk
+
+        The last estimate covers all n_paths and is summed in chunk order,
+        so it is identical for any number of workers.
+        """
+        S, K, T, r, sigma, is_call = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (S, K, T, r, sigma)),
+            np.asarray(is_call, dtype=bool)
+        )
+        shape = S.shape
+        contracts = tuple(x.ravel() for x in (S, K, np.maximum(T, 0), r, sigma,
+                                              np.where(is_call, 1.0, -1.0)))
+        plan = self._plan(len(contracts[0]))
+        tasks = [(i, contracts, seed, sobol_seed, start, n_base, self.antithetic)
+                 for i, (seed, sobol_seed, start, n_base) in enumerate(plan)]
+
+        sums = np.zeros((len(tasks), 5, len(contracts[0])))
+        counts = np.zeros(len(tasks), dtype=np.int64)
+        for index, chunk_sums, n in self._run(_price_chunk, tasks):
+            sums[index], counts[index] = chunk_sums, n
+            # Unfinished chunks are zero rows, so this sum is always in chunk order
+            price, std_error = self._estimate(sums.sum(axis=0), counts.sum(), contracts[0])
+            n_paths = int(counts.sum()) * (2 if self.antithetic else 1)
+            yield MonteCarloEstimate(price.reshape(shape), std_error.reshape(shape), n_paths)
+
+    def _estimate(self, sums: np.ndarray, n: int, S: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Price and standard error from accumulated sums"""
+        mean_y, mean_x = sums[0] / n, sums[1] / n
+        var_y = np.maximum(sums[4] / n - mean_y**2, 0) * n / max(n - 1, 1)
+        if not self.control_variate:
+            return mean_y, np.sqrt(var_y / n)
+        var_x = np.maximum(sums[3] / n - mean_x**2, 0) * n / max(n - 1, 1)
+        cov_xy = (sums[2] / n - mean_x * mean_y) * n / max(n - 1, 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            beta = np.where(var_x > 0, cov_xy / var_x, 0.0)
+        residual_var = np.maximum(var_y - beta * cov_xy, 0)
+        return mean_y - beta * (mean_x - S), np.sqrt(residual_var / n)
+
+    def estimate(self, S, K, T, r, sigma, is_call) -> MonteCarloEstimate:
+        """Price estimates and standard errors for broadcast array inputs"""
+        for estimate in self.iter_estimates(S, K, T, r, sigma, is_call):
+            pass
+        return estimate
+
+    def calculate_option_prices(self, S, K, T, r, sigma, is_call) -> np.ndarray:
+        """European prices for broadcast array inputs (BlackScholesCalculator signature)"""
+        return self.estimate(S, K, T, r, sigma, is_call).price
+
+    def simulate_paths(self, S0: float, T: float, r: float, sigma: float,
+                       n_steps: int = 1) -> Iterator[np.ndarray]:
+        """Stream chunks of price paths, each of shape (chunk_paths, n_steps + 1)
+
+        n_steps=1 gives terminal prices in column 1. Chunks are generated
+        in-process, in order.
+        """
+        times = np.linspace(0.0, T, n_steps + 1)
+        for seed, sobol_seed, start, n_base in self._plan(n_steps + 1):
+            z = _normals(seed, sobol_seed, start, n_base, n_steps, self.antithetic)
+            yield _simulate_paths(S0, times, r, sigma, z)
+
+    def strategy_pnl(self, strategy, n_steps: int = 30, drift: Optional[float] = None) -> PathPnL:
+        """Simulate a strategy's P&L along paths up to its front expiry
+
+        Paths start at base_price with the strategy's volatility and drift
+        (default: its risk-free rate). At every step the legs are valued
+        with the strategy's pricer, and legs past their expiry are worth
+        intrinsic value, exactly as in calculate_payoff.
+        """
+        horizon = float(strategy.legs.expiry.min())
+        times = np.linspace(0.0, horizon, n_steps + 1)
+        drift = strategy.risk_free_rate if drift is None else drift
+        strategy.get_net_debit()  # price the entry once, before the strategy is shipped to workers
+        plan = self._plan((n_steps + 1) * strategy.legs.n_legs)
+        tasks = [(i, strategy, times, drift, seed, sobol_seed, start, n_base, self.antithetic)
+                 for i, (seed, sobol_seed, start, n_base) in enumerate(plan)]
+
+        parts = [None] * len(tasks)
+        for index, part in self._run(_pnl_chunk, tasks):
+            parts[index] = part
+        final, minimum, maximum, path_sums = zip(*parts)
+        n_paths = sum(len(values) for values in final)
+        return PathPnL(times, np.sum(path_sums, axis=0) / n_paths, np.concatenate(final),
+                       np.concatenate(minimum), np.concatenate(maximum))
@@ -3,6 +3,7 @@ Strategies package for option strategy analyzer
 """
 
 from .base import OptionStrategy
+from .legs import LegTable, CALL, PUT, LONG, SHORT
 from .long_call import LongCallStrategy
 from .long_put import LongPutStrategy
 from .short_call import ShortCallStrategy
@@ -12,6 +13,11 @@ from .iron_condor import IronCondorStrategy
 
 __all__ = [
     'OptionStrategy',
+    'LegTable',
+    'CALL',
+    'PUT',
+    'LONG',
+    'SHORT',
     'LongCallStrategy',
     'LongPutStrategy', 
     'ShortCallStrategy',
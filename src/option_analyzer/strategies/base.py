@@ -2,30 +2,69 @@
 Base option strategy class
 """
 
+import functools
 import numpy as np
 from abc import ABC, abstractmethod
-from typing import Dict
+from collections import namedtuple
+from typing import Callable, Dict, Optional, Tuple, Union
 
 from ..models import StrategyConfig
-from ..pricing import BlackScholesCalculator
+from ..pricing import (BlackScholesCalculator, GreeksCalculator, ImpliedVolatilityCalculator,
+                       LatticeCalculator, LatticeGreeksCalculator)
+from .legs import LegTable
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "currsize"])
+
+
+def cached_pricing(method: Callable) -> Callable:
+    """Memoize a no-argument pricing method on the strategy's market state
+    
+    The cached value is reused only while base_price, volatility,
+    risk_free_rate, time_to_expiration, the legs and the pricer are unchanged,
+    so scenario code can mutate those attributes freely.
+    """
+    @functools.wraps(method)
+    def wrapper(self):
+        return self._get_cached(method.__name__, lambda: method(self))
+    return wrapper
 
 
 class OptionStrategy(ABC):
     """Abstract base class for options strategies"""
     
-    def __init__(self, config: StrategyConfig, base_price: float = 100.0):
+    def __init__(self, config: StrategyConfig, base_price: float = 100.0,
+                 pricer: Optional[BlackScholesCalculator] = None):
         self.config = config
         self.base_price = base_price
-        self.calculator = BlackScholesCalculator()
+        # Prices premiums and payoffs, e.g. a LatticeCalculator for American exercise
+        self.calculator = pricer or BlackScholesCalculator()
+        # Greeks follow the pricing model, so calculate_greeks' value matches calculate_payoff
+        if isinstance(self.calculator, LatticeCalculator):
+            self.greeks_calculator = LatticeGreeksCalculator(self.calculator)
+        else:
+            self.greeks_calculator = GreeksCalculator(self.calculator)
         self.risk_free_rate = 0.05
         self.volatility = 0.25
         
         # Set time to expiration based on time frame
         self.time_to_expiration = self._get_time_to_expiration()
         
-        # Set strike price based on moneyness
-        self.strike_price = self._get_strike_price()
-        
+        # Compile the position into its leg table
+        self.legs = self._build_legs()
+    
+    @property
+    def strike_price(self):
+        """Strike of a single-leg strategy, or all strikes as "K1/K2/..." for multi-leg ones"""
+        if self.legs.n_legs == 1:
+            return float(self.legs.strike[0])
+        return "/".join(f"{strike:.0f}" for strike in self.legs.strike)
+    
+    @property
+    def is_credit(self) -> bool:
+        """Whether opening the position collects a net premium"""
+        return self.get_net_debit() < 0
+    
     def _get_time_to_expiration(self) -> float:
         """Get time to expiration based on time frame"""
         time_map = {
@@ -47,21 +86,119 @@ class OptionStrategy(ABC):
         multiplier = moneyness_map.get(self.config.moneyness, 1.00)
         return self.base_price * multiplier
     
+    def _pricing_state(self) -> tuple:
+        """Everything a cached entry premium depends on"""
+        legs = self.legs
+        return (self.base_price, self.volatility, self.risk_free_rate, self.time_to_expiration,
+                id(self.calculator), legs.option_type.tobytes(), legs.strike.tobytes(),
+                legs.quantity.tobytes(), legs.expiry.tobytes(), legs.side.tobytes())
+    
+    def _get_cached(self, name: str, compute: Callable):
+        """Return the cached value for name, recomputing it if the state changed"""
+        if "_pricing_cache" not in self.__dict__:
+            self._pricing_cache = {}
+            self._pricing_cache_stats = [0, 0]
+        
+        state = self._pricing_state()
+        entry = self._pricing_cache.get(name)
+        if entry is not None and entry[0] == state:
+            self._pricing_cache_stats[0] += 1
+            return entry[1]
+        
+        self._pricing_cache_stats[1] += 1
+        value = compute()
+        self._pricing_cache[name] = (state, value)
+        return value
+    
+    def pricing_cache_info(self) -> CacheInfo:
+        """Report pricing cache hits, misses and current size"""
+        hits, misses = self.__dict__.get("_pricing_cache_stats", (0, 0))
+        return CacheInfo(hits, misses, len(self.__dict__.get("_pricing_cache", {})))
+    
+    def clear_pricing_cache(self):
+        """Drop all cached premiums and reset the statistics"""
+        self.__dict__.pop("_pricing_cache", None)
+        self.__dict__.pop("_pricing_cache_stats", None)
+    
+    @cached_pricing
+    def get_leg_premiums(self) -> np.ndarray:
+        """Get the entry premium of every leg, in leg table order"""
+        premiums = self.calculator.calculate_option_prices(
+            self.base_price, self.legs.strike, self.legs.expiry,
+            self.risk_free_rate, self.volatility, self.legs.is_call
+        )
+        premiums.setflags(write=False)
+        return premiums
+    
+    @cached_pricing
+    def get_net_debit(self) -> float:
+        """Get the signed entry premium: positive when paid, negative when received"""
+        return float(self.legs.net_debit(self.get_leg_premiums())[0])
+    
     @abstractmethod
-    def calculate_payoff(self, stock_prices: np.ndarray, time_to_exp: float = None) -> np.ndarray:
-        """Calculate strategy payoff for given stock prices"""
+    def _build_legs(self) -> LegTable:
+        """Compile the strategy into its leg table"""
         pass
     
-    @abstractmethod
+    def _get_legs(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Get the option legs as (strikes, is_call, signed quantities) arrays"""
+        return self.legs.strike, self.legs.is_call, self.legs.signed_quantity
+    
+    def calculate_payoff(self, stock_prices: np.ndarray, time_to_exp: float = None) -> np.ndarray:
+        """Calculate strategy P&L for given stock prices
+        
+        time_to_exp is the time left on the front expiry; None or <= 0 means
+        at expiration. Legs with a later expiry keep their remaining time value.
+        """
+        if time_to_exp is None or time_to_exp <= 0:
+            time_to_exp = 0.0
+        elapsed = self.time_to_expiration - time_to_exp
+        values = self.legs.value(stock_prices, elapsed, self.risk_free_rate,
+                                 self.volatility, self.calculator)[..., 0]
+        return values - self.get_net_debit()
+    
     def get_initial_cost(self) -> float:
-        """Get initial cost/credit of the strategy"""
-        pass
+        """Get initial cost/credit of the strategy (positive either way, see is_credit)"""
+        return abs(self.get_net_debit())
     
-    def calculate_greeks(self) -> Dict[str, float]:
-        """Calculate Greeks for the strategy"""
-        return {
-            "delta": 0.0,
-            "theta": 0.0, 
-            "vega": 0.0,
-            "gamma": 0.0
-        } 
\ No newline at end of file
+    def calculate_greeks(self, stock_prices: np.ndarray = None,
+                         time_to_exp: float = None) -> Dict[str, Union[float, np.ndarray]]:
+        """Calculate position Greeks summed over all legs of the strategy
+        
+        With no stock_prices the Greeks are evaluated at base_price and returned
+        as floats; otherwise each Greek is an array over the price grid. All legs
+        and grid points are priced in a single vectorized pass, and the position
+        value is returned alongside the Greeks under "value".
+        """
+        if time_to_exp is None:
+            time_to_exp = self.time_to_expiration
+        prices = self.base_price if stock_prices is None else stock_prices
+        
+        position = self.legs.greeks(prices, self.time_to_expiration - time_to_exp,
+                                    self.risk_free_rate, self.volatility, self.greeks_calculator)
+        position = {name: values[..., 0] for name, values in position.items()}
+        position["value"] = position.pop("price")
+        if stock_prices is None:
+            return {name: float(value) for name, value in position.items()}
+        return position
+    
+    def calibrate_volatility(self, market_premium: float) -> float:
+        """Set volatility to the implied volatility of a market premium
+        
+        Only single-leg strategies have a unique implied volatility; the
+        premium is quoted like get_initial_cost (a positive amount).
+        """
+        if self.legs.n_legs != 1:
+            raise ValueError(f"Volatility calibration needs a single-leg strategy, "
+                             f"{self.config.code} has {self.legs.n_legs} legs")
+        
+        solver = ImpliedVolatilityCalculator(self.calculator)
+        volatility = float(solver.calculate_implied_volatility(
+            market_premium, self.base_price, self.legs.strike[0], self.legs.expiry[0],
+            self.risk_free_rate, self.legs.is_call[0]
+        ))
+        if np.isnan(volatility):
+            raise ValueError(f"No implied volatility for premium {market_premium} "
+                             f"on {self.config.code}")
+        self.volatility = volatility
+        return volatility
@@ -0,0 +1,162 @@
+"""
+Columnar multi-leg position model
+"""
+
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from ..pricing import BlackScholesCalculator, GreeksCalculator
+
+
+# Option type column: the sign of the intrinsic payoff direction
+CALL = 1
+PUT = -1
+
+# Side column
+LONG = 1
+SHORT = -1
+
+
+@dataclass
+class LegTable:
+    """Option legs stored as parallel numpy columns
+
+    Each row is one leg: option_type (CALL/PUT), strike, quantity (number of
+    contracts, positive), expiry (years from entry) and side (LONG/SHORT).
+    The position column groups legs into positions, so a whole book of
+    multi-leg positions can be valued by a single kernel call.
+    """
+    option_type: np.ndarray
+    strike: np.ndarray
+    quantity: np.ndarray
+    expiry: np.ndarray
+    side: np.ndarray
+    position: Optional[np.ndarray] = None
+
+    def __post_init__(self):
+        self.option_type = np.asarray(self.option_type, dtype=np.int8)
+        self.strike = np.asarray(self.strike, dtype=float)
+        self.quantity = np.asarray(self.quantity, dtype=float)
+        self.expiry = np.asarray(self.expiry, dtype=float)
+        self.side = np.asarray(self.side, dtype=np.int8)
+        if self.position is None:
+            self.position = np.zeros(len(self.strike), dtype=np.intp)
+        self.position = np.asarray(self.position, dtype=np.intp)
+
+        columns = (self.option_type, self.strike, self.quantity, self.expiry, self.side, self.position)
+        if len({len(column) for column in columns}) != 1:
+            raise ValueError("All leg columns must have the same length")
+        if np.any(~np.isin(self.option_type, (CALL, PUT))) or np.any(~np.isin(self.side, (LONG, SHORT))):
+            raise ValueError("option_type must be CALL/PUT and side LONG/SHORT")
+
+    @classmethod
+    def from_legs(cls, legs: Sequence[Tuple[int, float, float, float, int]]) -> "LegTable":
+        """Build a single-position table from (option_type, strike, quantity, expiry, side) rows"""
+        if not legs:
+            raise ValueError("A position needs at least one leg")
+        option_type, strike, quantity, expiry, side = zip(*legs)
+        return cls(option_type, strike, quantity, expiry, side)
+
+    @classmethod
+    def concatenate(cls, tables: Iterable["LegTable"]) -> "LegTable":
+        """Stack tables into one book, renumbering positions consecutively"""
+        tables = list(tables)
+        offsets = np.cumsum([0] + [table.n_positions for table in tables[:-1]])
+        return cls(
+            np.concatenate([t.option_type for t in tables]),
+            np.concatenate([t.strike for t in tables]),
+            np.concatenate([t.quantity for t in tables]),
+            np.concatenate([t.expiry for t in tables]),
+            np.concatenate([t.side for t in tables]),
+            np.concatenate([t.position + offset for t, offset in zip(tables, offsets)]),
+        )
+
+    @property
+    def n_legs(self) -> int:
+        return len(self.strike)
+
+    @property
+    def n_positions(self) -> int:
+        return int(self.position.max()) + 1 if self.n_legs else 0
+
+    @property
+    def is_call(self) -> np.ndarray:
+        return self.option_type == CALL
+
+    @property
+    def signed_quantity(self) -> np.ndarray:
+        """Quantity with shorts negative"""
+        return self.side * self.quantity
+
+    def front_expiry(self) -> np.ndarray:
+        """Earliest leg expiry of every position"""
+        front = np.full(self.n_positions, np.inf)
+        np.minimum.at(front, self.position, self.expiry)
+        return front
+
+    def tail_slope(self) -> np.ndarray:
+        """dP&L/dS per position as S -> infinity once every leg has expired"""
+        return self._sum_by_position((self.is_call * self.signed_quantity)[None, :])[0]
+
+    def select(self, positions: Sequence[int]) -> "LegTable":
+        """Extract the given positions as a new table, renumbered in the given order"""
+        positions = np.asarray(positions, dtype=np.intp)
+        lookup = np.full(self.n_positions, -1, dtype=np.intp)
+        lookup[positions] = np.arange(len(positions))
+        rows = np.flatnonzero(lookup[self.position] >= 0)
+        return LegTable(self.option_type[rows], self.strike[rows], self.quantity[rows],
+                        self.expiry[rows], self.side[rows], lookup[self.position[rows]])
+
+    def _sum_by_position(self, leg_values: np.ndarray) -> np.ndarray:
+        """Sum a (..., n_legs) array into (..., n_positions)"""
+        if self.n_positions == 1:
+            return leg_values.sum(axis=-1, keepdims=True)
+        membership = np.zeros((self.n_legs, self.n_positions))
+        membership[np.arange(self.n_legs), self.position] = 1.0
+        return leg_values @ membership
+
+    def leg_values(self, stock_prices, elapsed=0.0, risk_free_rate=0.05, volatility=0.25,
+                   pricer: Optional[BlackScholesCalculator] = None) -> np.ndarray:
+        """Signed value of every leg, shape broadcast(inputs) + (n_legs,)
+
+        stock_prices, elapsed (years since entry), risk_free_rate and
+        volatility broadcast against each other; each leg has
+        expiry - elapsed years left and is worth intrinsic value once expired.
+        """
+        pricer = pricer or BlackScholesCalculator()
+        S, elapsed, r, sigma = (np.asarray(x, dtype=float)[..., None]
+                                for x in (stock_prices, elapsed, risk_free_rate, volatility))
+        values = pricer.calculate_option_prices(
+            S, self.strike, self.expiry - elapsed, r, sigma, self.is_call
+        )
+        return values * self.signed_quantity
+
+    def value(self, stock_prices, elapsed=0.0, risk_free_rate=0.05, volatility=0.25,
+              pricer: Optional[BlackScholesCalculator] = None) -> np.ndarray:
+        """Position values, shape broadcast(inputs) + (n_positions,)"""
+        return self._sum_by_position(
+            self.leg_values(stock_prices, elapsed, risk_free_rate, volatility, pricer)
+        )
+
+    def intrinsic_value(self, stock_prices) -> np.ndarray:
+        """Position values if every leg were exercised now, shape stock_prices.shape + (n_positions,)"""
+        S = np.asarray(stock_prices, dtype=float)[..., None]
+        payoffs = np.maximum(self.option_type * (S - self.strike), 0) * self.signed_quantity
+        return self._sum_by_position(payoffs)
+
+    def net_debit(self, premiums: np.ndarray) -> np.ndarray:
+        """Net premium paid per position (negative for a net credit)"""
+        return self._sum_by_position(np.asarray(premiums) * self.signed_quantity)
+
+    def greeks(self, stock_prices, elapsed=0.0, risk_free_rate=0.05, volatility=0.25,
+               greeks_calculator: Optional[GreeksCalculator] = None) -> Dict[str, np.ndarray]:
+        """Position value and Greeks, each of shape broadcast(inputs) + (n_positions,)"""
+        greeks_calculator = greeks_calculator or GreeksCalculator()
+        S, elapsed, r, sigma = (np.asarray(x, dtype=float)[..., None]
+                                for x in (stock_prices, elapsed, risk_free_rate, volatility))
+        leg_greeks = greeks_calculator.calculate_greeks(
+            S, self.strike, self.expiry - elapsed, r, sigma, self.is_call
+        )
+        return {name: self._sum_by_position(values * self.signed_quantity)
+                for name, values in leg_greeks.items()}
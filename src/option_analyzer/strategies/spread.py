@@ -2,119 +2,72 @@
 Spread option strategies
 """
 
-import numpy as np
-from typing import Tuple
+from typing import Dict, List, Tuple
 
-from ..models import StrategyConfig
-from ..pricing import BlackScholesCalculator
 from .base import OptionStrategy
+from .legs import LegTable, CALL, PUT, LONG, SHORT
+
+
+# Leg templates: (option_type, strike / base_price, quantity, expiry / time_to_expiration, side)
+SPREAD_TEMPLATES: Dict[str, List[Tuple[int, float, float, float, int]]] = {
+    # Buy lower strike, sell higher strike (net debit)
+    "bull_call": [(CALL, 0.98, 1, 1, LONG), (CALL, 1.02, 1, 1, SHORT)],
+    # Sell lower strike, buy higher strike (net credit)
+    "bear_call": [(CALL, 0.98, 1, 1, SHORT), (CALL, 1.02, 1, 1, LONG)],
+    # Buy lower strike, sell higher strike (net credit)
+    "bull_put": [(PUT, 0.98, 1, 1, LONG), (PUT, 1.02, 1, 1, SHORT)],
+    # Sell lower strike, buy higher strike (net debit)
+    "bear_put": [(PUT, 0.98, 1, 1, SHORT), (PUT, 1.02, 1, 1, LONG)],
+    # Sell the front month, buy the same strike with twice the time
+    "calendar": [(CALL, 1.00, 1, 1, SHORT), (CALL, 1.00, 1, 2, LONG)],
+    # Buy one ATM call, sell two OTM calls
+    "ratio": [(CALL, 1.00, 1, 1, LONG), (CALL, 1.05, 2, 1, SHORT)],
+    # Sell one ATM call, buy two OTM calls
+    "back_ratio": [(CALL, 1.00, 1, 1, SHORT), (CALL, 1.05, 2, 1, LONG)],
+    # Put spread and call spread 5% OTM with 5% wide wings (net credit)
+    "iron_condor": [(PUT, 0.90, 1, 1, LONG), (PUT, 0.95, 1, 1, SHORT),
+                    (CALL, 1.05, 1, 1, SHORT), (CALL, 1.10, 1, 1, LONG)],
+    # Long wings, two short ATM calls
+    "butterfly": [(CALL, 0.95, 1, 1, LONG), (CALL, 1.00, 2, 1, SHORT), (CALL, 1.05, 1, 1, LONG)],
+}
+
+# Structures of the catalogue spread names, for configs built without a structure
+SPREAD_STRUCTURES = {
+    "Bull Call Spread": "bull_call",
+    "Bear Call Spread": "bear_call",
+    "Bull Put Spread": "bull_put",
+    "Bear Put Spread": "bear_put",
+    "Calendar Spread": "calendar",
+    "Ratio Spread": "ratio",
+    "Back Ratio Spread": "back_ratio",
+    "Iron Condor": "iron_condor",
+    "Butterfly Spread": "butterfly",
+}
 
 
 class SpreadStrategy(OptionStrategy):
-    """Spread strategies (S1-S24, excluding Iron Condors)"""
-    
-    def __init__(self, config: StrategyConfig, base_price: float = 100.0):
-        self.config = config
-        self.base_price = base_price
-        self.calculator = BlackScholesCalculator()
-        self.risk_free_rate = 0.05
-        self.volatility = 0.25
-        
-        # Set time to expiration based on time frame
-        self.time_to_expiration = self._get_time_to_expiration()
-        
-        # Get spread strikes instead of single strike
-        self.long_strike, self.short_strike = self._get_spread_strikes()
-    
-    def _get_time_to_expiration(self) -> float:
-        """Get time to expiration based on time frame"""
-        time_map = {
-            "Near": 30 / 365,    # 30 days
-            "Medium": 60 / 365,  # 60 days  
-            "Long": 120 / 365    # 120 days
-        }
-        return time_map.get(self.config.time_frame, 30 / 365)
+    """Spread strategies (S1-S24), compiled from SPREAD_TEMPLATES"""
     
     @property
-    def strike_price(self) -> str:
-        """Return a string representation of the spread strikes"""
-        return f"{self.short_strike:.0f}/{self.long_strike:.0f}"
+    def structure(self) -> str:
+        """Leg template key of this spread"""
+        return self.config.structure or SPREAD_STRUCTURES.get(self.config.name.split(" - ")[0], "")
     
-    def _get_spread_strikes(self) -> Tuple[float, float]:
-        """Get strike prices for spread strategies"""
-        if "Bull Call" in self.config.name:
-            # Buy lower strike, sell higher strike
-            long_strike = self.base_price * 0.98
-            short_strike = self.base_price * 1.02
-        elif "Bear Call" in self.config.name:
-            # Sell lower strike, buy higher strike
-            long_strike = self.base_price * 1.02
-            short_strike = self.base_price * 0.98
-        elif "Bull Put" in self.config.name:
-            # Sell higher strike, buy lower strike
-            long_strike = self.base_price * 0.98
-            short_strike = self.base_price * 1.02
-        elif "Bear Put" in self.config.name:
-            # Buy higher strike, sell lower strike
-            long_strike = self.base_price * 1.02
-            short_strike = self.base_price * 0.98
-        else:
-            # Default spread
-            long_strike = self.base_price * 0.98
-            short_strike = self.base_price * 1.02
-        
-        return long_strike, short_strike
+    def _build_legs(self) -> LegTable:
+        template = SPREAD_TEMPLATES.get(self.structure)
+        if template is None:
+            raise ValueError(f"Unknown spread structure for {self.config.code}: {self.config.name!r}")
+        return LegTable.from_legs([
+            (option_type, self.base_price * strike, quantity, self.time_to_expiration * expiry, side)
+            for option_type, strike, quantity, expiry, side in template
+        ])
     
-    def calculate_payoff(self, stock_prices: np.ndarray, time_to_exp: float = None) -> np.ndarray:
-        """Calculate payoff for spread strategies"""
-        if "Call" in self.config.name:
-            if "Bull" in self.config.name:
-                # Bull call spread: Buy lower strike, sell higher strike (Net Debit)
-                long_payoffs = np.maximum(stock_prices - self.long_strike, 0)
-                short_payoffs = np.maximum(stock_prices - self.short_strike, 0)
-                return long_payoffs - short_payoffs - self.get_initial_cost()
-            else:
-                # Bear call spread: Sell lower strike, buy higher strike (Net Credit)  
-                long_payoffs = np.maximum(stock_prices - self.long_strike, 0)
-                short_payoffs = np.maximum(stock_prices - self.short_strike, 0)
-                return self.get_initial_cost() - (short_payoffs - long_payoffs)
-        else:
-            # Put spreads
-            if "Bull" in self.config.name:
-                # Bull put spread: Sell higher strike, buy lower strike (Net Credit)
-                # We collect credit upfront, lose money if puts go ITM
-                long_payoffs = np.maximum(self.long_strike - stock_prices, 0)   # Put we own (lower strike)
-                short_payoffs = np.maximum(self.short_strike - stock_prices, 0) # Put we sold (higher strike)
-                # P&L = Credit received - (what we owe on short put - what we get from long put)
-                return self.get_initial_cost() - (short_payoffs - long_payoffs)
-            else:
-                # Bear put spread: Buy higher strike, sell lower strike (Net Debit)
-                long_payoffs = np.maximum(self.long_strike - stock_prices, 0)
-                short_payoffs = np.maximum(self.short_strike - stock_prices, 0)  
-                return long_payoffs - short_payoffs - self.get_initial_cost()
+    @property
+    def long_strike(self) -> float:
+        """Strike of the first long leg"""
+        return float(self.legs.strike[self.legs.side == LONG][0])
     
-    def get_initial_cost(self) -> float:
-        # Simplified calculation
-        if "Call" in self.config.name:
-            long_premium = self.calculator.calculate_call_price(
-                self.base_price, self.long_strike, self.time_to_expiration,
-                self.risk_free_rate, self.volatility
-            )
-            short_premium = self.calculator.calculate_call_price(
-                self.base_price, self.short_strike, self.time_to_expiration,
-                self.risk_free_rate, self.volatility
-            )
-        else:
-            long_premium = self.calculator.calculate_put_price(
-                self.base_price, self.long_strike, self.time_to_expiration,
-                self.risk_free_rate, self.volatility
-            )
-            short_premium = self.calculator.calculate_put_price(
-                self.base_price, self.short_strike, self.time_to_expiration,
-                self.risk_free_rate, self.volatility
-            )
-        
-        if "Bull Call" in self.config.name or "Bear Put" in self.config.name:
-            return long_premium - short_premium  # Net debit (positive = money paid)
-        else:
-            return short_premium - long_premium  # Net credit (positive = money received) 
\ No newline at end of file
+    @property
+    def short_strike(self) -> float:
+        """Strike of the first short leg"""
+        return float(self.legs.strike[self.legs.side == SHORT][0])
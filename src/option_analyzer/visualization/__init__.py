@@ -1,7 +1,34 @@
 """
 Visualization package for option strategy analyzer
+
+The matplotlib-bound VisualizationEngine and FigureTemplate are imported on
+first attribute access, so curve data and export users never load matplotlib.
 """
 
-from .visualization_engine import VisualizationEngine
+import importlib
+
+from .output_profiles import OutputProfile, OUTPUT_PROFILES, RenderTiming
+from .plot_cache import PlotCache
+from .curves import TIME_DECAY_FRACTIONS, VOLATILITY_SCENARIOS, compute_curves
+from .curve_export import CurveSet, CurveExporter
+
+# Heavy attributes resolved lazily by __getattr__: name -> submodule
+_LAZY_IMPORTS = {
+    'VisualizationEngine': '.visualization_engine',
+    'FigureTemplate': '.figure_template',
+}
+
+__all__ = ['OutputProfile', 'OUTPUT_PROFILES', 'RenderTiming', 'PlotCache', 'VisualizationEngine', 'FigureTemplate',
+           'TIME_DECAY_FRACTIONS', 'VOLATILITY_SCENARIOS', 'compute_curves', 'CurveSet', 'CurveExporter']
+
+
+def __getattr__(name):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = ['VisualizationEngine']
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
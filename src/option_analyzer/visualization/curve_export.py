@@ -0,0 +1,179 @@
+"""
+Columnar export of the chart curves
+"""
+
+import csv
+import json
+import os
+import numpy as np
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..models import StrategyConfig
+from ..strategies import OptionStrategy
+from .curves import TIME_DECAY_FRACTIONS, VOLATILITY_SCENARIOS, compute_curves
+
+
+CURVE_FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+
+@dataclass
+class CurveSet:
+    """Chart curves of many strategies on a shared stock price grid
+
+    Arrays are plain or memory-mapped numpy arrays with a leading strategy
+    axis; time_left holds the years left for each time-decay curve.
+    """
+    codes: List[str]
+    stock_prices: np.ndarray    # (n_prices,)
+    expiration: np.ndarray      # (n_strategies, n_prices)
+    time_left: np.ndarray       # (n_strategies, n_times)
+    time_decay: np.ndarray      # (n_strategies, n_times, n_prices)
+    volatilities: np.ndarray    # (n_vols,)
+    volatility: np.ndarray      # (n_strategies, n_vols, n_prices)
+
+    COLUMNS = ("stock_prices", "expiration", "time_left", "time_decay", "volatilities", "volatility")
+
+    def sel(self, code: str) -> Dict[str, np.ndarray]:
+        """Curves of one strategy"""
+        try:
+            i = self.codes.index(code)
+        except ValueError:
+            raise KeyError(f"Strategy {code} is not in this export") from None
+        return {"stock_prices": self.stock_prices, "expiration": self.expiration[i],
+                "time_left": self.time_left[i], "time_decay": self.time_decay[i],
+                "volatilities": self.volatilities, "volatility": self.volatility[i]}
+
+
+class CurveExporter:
+    """Collect the VisualizationEngine curves and write them as data
+
+    A VisualizationEngine built with exporter=... hands over the curves of
+    every chart it renders through add(), and write() saves them, so the
+    export costs no re-pricing. compute() and export() price strategies
+    directly for data-only use; neither path imports matplotlib.
+
+    The "npy" format is a directory holding one .npy file per column plus a
+    JSON manifest, so load() can memory-map any column without reading the
+    rest. The "csv" format writes one long table
+    (code, curve, scenario, stock_price, pnl) for tools that want text.
+    """
+
+    def __init__(self, stock_range: Tuple[float, float] = (80, 120), n_prices: int = 100,
+                 dtype=np.float64):
+        self.stock_range = stock_range
+        self.n_prices = n_prices
+        self.dtype = np.dtype(dtype)
+        # Curves handed over by renders: code -> (time to expiration, curves)
+        self._collected: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._stock_prices: Optional[np.ndarray] = None
+
+    def add(self, strategy: OptionStrategy, stock_prices, curves: Dict[str, Any]):
+        """Collect one strategy's chart curves (see compute_curves); a later add replaces them
+
+        Every collected chart must share one stock price grid.
+        """
+        stock_prices = np.asarray(stock_prices, dtype=float)
+        if self._stock_prices is None:
+            self._stock_prices = stock_prices.copy()
+        elif not np.array_equal(stock_prices, self._stock_prices):
+            raise ValueError("Collected curves must share one stock price grid")
+        self._collected[strategy.config.code] = (strategy.time_to_expiration, curves)
+
+    def collected(self) -> CurveSet:
+        """The curves handed over so far, in the order first added"""
+        return self._curve_set(self._stock_prices,
+                               ((code, expiry, curves) for code, (expiry, curves) in self._collected.items()))
+
+    def write(self, path: str, format: str = "npy") -> str:
+        """Write the collected curves to path, returning path"""
+        return self._write(self.collected(), path, format)
+
+    def compute(self, strategies: Sequence[OptionStrategy]) -> CurveSet:
+        """Curves of every strategy, as drawn by VisualizationEngine"""
+        stock_prices = np.linspace(self.stock_range[0], self.stock_range[1], self.n_prices)
+        return self._curve_set(stock_prices, ((strategy.config.code, strategy.time_to_expiration,
+                                               compute_curves(strategy, stock_prices))
+                                              for strategy in strategies))
+
+    def _curve_set(self, stock_prices, entries: Iterable[Tuple[str, float, Dict[str, Any]]]) -> CurveSet:
+        """Stack (code, time to expiration, curves) entries into columns"""
+        entries = list(entries)
+        if not entries:
+            raise ValueError("No strategies to export")
+        cast = lambda values: np.asarray(values, dtype=self.dtype)
+        return CurveSet(
+            codes=[code for code, _, _ in entries],
+            stock_prices=cast(stock_prices),
+            expiration=cast([curves["expiration"] for _, _, curves in entries]),
+            time_left=cast([[expiry * f for f in TIME_DECAY_FRACTIONS] for _, expiry, _ in entries]),
+            time_decay=cast([[payoffs for _, payoffs in curves["time_decay"]] for _, _, curves in entries]),
+            volatilities=cast(VOLATILITY_SCENARIOS),
+            volatility=cast([[payoffs for _, payoffs in curves["volatility"]] for _, _, curves in entries]),
+        )
+
+    def export(self, strategies: Sequence[OptionStrategy], path: str, format: str = "npy") -> str:
+        """Compute and write the curves of strategies to path, returning path"""
+        return self._write(self.compute(strategies), path, format)
+
+    def _write(self, curves: CurveSet, path: str, format: str) -> str:
+        if format == "npy":
+            self._write_npy(curves, path)
+        elif format == "csv":
+            self._write_csv(curves, path)
+        else:
+            raise ValueError(f"Unknown curve export format {format!r}; use 'npy' or 'csv'")
+        return path
+
+    def export_catalogue(self, factory, path: str, base_price: float = 100.0,
+                         codes: Optional[Sequence[str]] = None,
+                         where: Optional[Callable[[StrategyConfig], bool]] = None,
+                         format: str = "npy") -> str:
+        """Export the selected strategies of a StrategyFactory into one file set"""
+        strategies = [factory.create_strategy(code, base_price)
+                      for code in factory.select_strategies(codes, where)]
+        return self.export(strategies, path, format)
+
+    @staticmethod
+    def _write_npy(curves: CurveSet, path: str):
+        os.makedirs(path, exist_ok=True)
+        columns = {}
+        for name in CurveSet.COLUMNS:
+            values = getattr(curves, name)
+            np.save(os.path.join(path, f"{name}.npy"), values)
+            columns[name] = {"file": f"{name}.npy", "dtype": values.dtype.str,
+                             "shape": list(values.shape)}
+        manifest = {"format": "option-curves", "version": CURVE_FORMAT_VERSION,
+                    "codes": curves.codes,
+                    "stock_range": [float(curves.stock_prices[0]), float(curves.stock_prices[-1])],
+                    "columns": columns}
+        with open(os.path.join(path, MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+    @staticmethod
+    def _write_csv(curves: CurveSet, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["code", "curve", "scenario", "stock_price", "pnl"])
+            for i, code in enumerate(curves.codes):
+                rows = [("expiration", 0.0, curves.expiration[i])]
+                rows += [("time_decay", t, pnl) for t, pnl in zip(curves.time_left[i], curves.time_decay[i])]
+                rows += [("volatility", v, pnl) for v, pnl in zip(curves.volatilities, curves.volatility[i])]
+                for curve, scenario, pnl in rows:
+                    writer.writerows((code, curve, repr(float(scenario)), repr(float(S)), repr(float(value)))
+                                     for S, value in zip(curves.stock_prices, pnl))
+
+    @staticmethod
+    def load(path: str, mmap: bool = True) -> CurveSet:
+        """Read an "npy" export; with mmap the columns are memory-mapped read-only"""
+        with open(os.path.join(path, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("format") != "option-curves" or manifest.get("version") != CURVE_FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {CURVE_FORMAT_VERSION} curve export")
+        columns = {name: np.load(os.path.join(path, spec["file"]), mmap_mode="r" if mmap else None)
+                   for name, spec in manifest["columns"].items()}
+        return CurveSet(codes=manifest["codes"], **columns)
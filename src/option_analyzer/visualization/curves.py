@@ -0,0 +1,68 @@
+"""
+Chart curve data, computed without matplotlib
+"""
+
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..analytics import PnLSurface
+from ..strategies import OptionStrategy
+
+
+# Scenario panels: fractions of the time to expiration left, and implied volatilities
+TIME_DECAY_FRACTIONS = (1.0, 0.75, 0.5, 0.25, 0.0)
+VOLATILITY_SCENARIOS = (0.15, 0.20, 0.25, 0.30, 0.40)
+
+
+def compute_curves(strategy: OptionStrategy, stock_prices: np.ndarray,
+                   surface: Optional[PnLSurface] = None) -> Dict[str, Any]:
+    """All chart data: expiration payoff and labelled scenario curves
+
+    The scenario curves are read from surface when one is given.
+    """
+    return {
+        "expiration": strategy.calculate_payoff(stock_prices, 0),
+        "time_decay": time_decay_curves(strategy, stock_prices, surface),
+        "volatility": volatility_curves(strategy, stock_prices, surface),
+    }
+
+
+def time_decay_curves(strategy: OptionStrategy, stock_prices,
+                      surface: Optional[PnLSurface] = None) -> List[Tuple[str, np.ndarray]]:
+    """(label, P&L) for each fraction of the time to expiration left"""
+    curves = []
+    for fraction in TIME_DECAY_FRACTIONS:
+        time_left = strategy.time_to_expiration * fraction
+        label = f'{int(time_left*365)} days' if time_left > 0 else 'Expiration'
+        curves.append((label, scenario_payoff(strategy, stock_prices, time_left, surface=surface)))
+    return curves
+
+
+def volatility_curves(strategy: OptionStrategy, stock_prices,
+                      surface: Optional[PnLSurface] = None) -> List[Tuple[str, np.ndarray]]:
+    """(label, P&L) for each implied volatility scenario"""
+    return [(f'IV = {vol*100:.0f}%',
+             scenario_payoff(strategy, stock_prices, strategy.time_to_expiration, vol, surface))
+            for vol in VOLATILITY_SCENARIOS]
+
+
+def scenario_payoff(strategy: OptionStrategy, stock_prices, time_left, volatility=None,
+                    surface: Optional[PnLSurface] = None):
+    """P&L of one scenario line, read from the surface when one is given
+
+    A volatility scenario re-prices the entry premium at that volatility too.
+    """
+    if volatility is None:
+        if surface is not None:
+            return surface.pnl(stock_prices, time_left)
+        return strategy.calculate_payoff(stock_prices, time_left)
+
+    original_vol = strategy.volatility
+    strategy.volatility = volatility
+    try:
+        if surface is not None:
+            return (surface.pnl(stock_prices, time_left, volatility)
+                    + surface.net_debit - strategy.get_net_debit())
+        return strategy.calculate_payoff(stock_prices, time_left)
+    finally:
+        strategy.volatility = original_vol
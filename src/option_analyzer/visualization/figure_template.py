@@ -0,0 +1,127 @@
+"""
+Reusable four-panel figure for batch rendering
+"""
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.patches import Patch
+from typing import Any, Dict
+
+from .curves import VOLATILITY_SCENARIOS
+from .visualization_engine import TIME_DECAY_COLORS
+
+
+class FigureTemplate:
+    """The 2x2 analysis figure, laid out once and refilled per strategy
+
+    Axes, scenario lines, reference lines, legends and the summary text box
+    are created once; each render only swaps line data, profit/loss fills,
+    titles, legend labels and summary text, rescales the axes and saves.
+    The layout and the saved crop box are kept from chart to chart, so
+    panels stay put and each save draws the figure only once. They are
+    recomputed whenever a chart's labels outgrow the ones they were laid out
+    for: wider y tick labels, a longer title or a larger summary.
+    """
+
+    def __init__(self, figsize=(15, 12)):
+        self.fig, axes = plt.subplots(2, 2, figsize=figsize)
+        (self.ax_expiration, self.ax_time), (self.ax_vol, self.ax_summary) = axes
+        self.title = self.fig.suptitle("", fontsize=16, fontweight='bold')
+        self._layout_extents = None
+        self._bbox_inches = None
+
+        ax = self.ax_expiration
+        self.expiration_line, = ax.plot([], [], 'b-', linewidth=2)
+        self.fills = []
+        ax.axhline(y=0, color='black', linestyle='-', alpha=0.3)
+        self.price_lines = [ax.axvline(x=0, color='gray', linestyle='--', alpha=0.5)]
+        ax.legend([self.expiration_line, self.price_lines[0],
+                   Patch(color='green', alpha=0.3), Patch(color='red', alpha=0.3)],
+                  ['Strategy Payoff', 'Current Price', 'Profit', 'Loss'])
+        self._decorate(ax, 'Stock Price at Expiration', 'Payoff at Expiration')
+
+        self.time_lines = [self.ax_time.plot([], [], color=color, linewidth=2)[0]
+                           for color in TIME_DECAY_COLORS]
+        self.vol_lines = [self.ax_vol.plot([], [], linewidth=2)[0] for _ in VOLATILITY_SCENARIOS]
+        for ax, lines, title in ((self.ax_time, self.time_lines, 'Time Decay Effect'),
+                                 (self.ax_vol, self.vol_lines, 'Volatility Effect')):
+            ax.axhline(y=0, color='black', linestyle='-', alpha=0.3)
+            self.price_lines.append(ax.axvline(x=0, color='gray', linestyle='--', alpha=0.5))
+            ax.legend(lines, [""] * len(lines))
+            self._decorate(ax, 'Stock Price', title)
+
+        self.ax_summary.axis('off')
+        self.summary = self.ax_summary.text(
+            0.05, 0.95, "", transform=self.ax_summary.transAxes, fontsize=10,
+            verticalalignment='top', fontfamily='monospace',
+            bbox=dict(boxstyle="round,pad=0.3", facecolor="lightgray", alpha=0.5))
+
+    @staticmethod
+    def _decorate(ax, xlabel: str, title: str):
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel('Profit/Loss')
+        ax.set_title(title)
+        ax.grid(True, alpha=0.3)
+
+    def draw(self, title: str, stock_prices, base_price: float, curves: Dict[str, Any],
+             summary: str):
+        """Refill every panel with one strategy's chart data (see compute_curves)"""
+        self.title.set_text(title)
+        for line in self.price_lines:
+            line.set_xdata([base_price, base_price])
+
+        payoffs = curves["expiration"]
+        self.expiration_line.set_data(stock_prices, payoffs)
+        for fill in self.fills:
+            fill.remove()
+        self.fills = [
+            self.ax_expiration.fill_between(stock_prices, payoffs, 0, where=payoffs > 0,
+                                            alpha=0.3, color='green'),
+            self.ax_expiration.fill_between(stock_prices, payoffs, 0, where=payoffs < 0,
+                                            alpha=0.3, color='red'),
+        ]
+
+        for ax, lines, scenarios in ((self.ax_time, self.time_lines, curves["time_decay"]),
+                                     (self.ax_vol, self.vol_lines, curves["volatility"])):
+            for line, text, (label, scenario_payoffs) in zip(lines, ax.get_legend().get_texts(),
+                                                              scenarios):
+                line.set_data(stock_prices, scenario_payoffs)
+                text.set_text(label)
+
+        for ax in (self.ax_expiration, self.ax_time, self.ax_vol):
+            ax.relim()
+            ax.autoscale_view()
+        self.summary.set_text(summary)
+
+        extents = self._label_extents()
+        if self._layout_extents is None or np.any(extents > self._layout_extents):
+            self.fig.tight_layout()
+            self._layout_extents = extents
+            self._bbox_inches = None
+
+    def _label_extents(self) -> np.ndarray:
+        """Character counts of the text the layout depends on
+
+        The widest y tick label per panel, the title, and the widest line
+        and line count of the summary, all without a renderer.
+        """
+        extents = []
+        for ax in (self.ax_expiration, self.ax_time, self.ax_vol):
+            axis = ax.yaxis
+            labels = axis.get_major_formatter().format_ticks(axis.get_major_locator()())
+            extents.append(max(map(len, labels), default=0))
+        summary_lines = self.summary.get_text().splitlines() or [""]
+        extents += [len(self.title.get_text()), max(map(len, summary_lines)), len(summary_lines)]
+        return np.array(extents)
+
+    def save(self, target, dpi: int = 300, format: str = "png", tight: bool = True):
+        """Save to a path or file object; tight crops like bbox_inches='tight'"""
+        if tight and self._bbox_inches is None:
+            # Same crop as bbox_inches='tight' with the default 0.1in padding
+            renderer = self.fig.canvas.get_renderer()
+            self._bbox_inches = self.fig.get_tightbbox(renderer).padded(0.1)
+        self.fig.savefig(target, dpi=dpi, format=format,
+                         bbox_inches=self._bbox_inches if tight else None)
+
+    def close(self):
+        plt.close(self.fig)
@@ -0,0 +1,50 @@
+"""
+Output profiles for rendered strategy charts
+"""
+
+from collections import namedtuple
+from dataclasses import dataclass
+from typing import Dict, Union
+
+
+@dataclass(frozen=True)
+class OutputProfile:
+    """How a chart is saved: file format, resolution and cropping
+
+    tight=True crops to the drawn content like bbox_inches='tight', which
+    costs an extra layout pass; raster formats pay for every dpi step.
+    """
+    name: str
+    format: str = "png"
+    dpi: int = 300
+    tight: bool = True
+    suffix: str = ""
+
+    def filename(self, code: str) -> str:
+        return f"{code}_analysis{self.suffix}.{self.format}"
+
+
+OUTPUT_PROFILES: Dict[str, OutputProfile] = {
+    # Publication quality, the historical default
+    "full": OutputProfile("full", "png", 300, True),
+    # Screen resolution for quick looks
+    "preview": OutputProfile("preview", "png", 72, True, "_preview"),
+    # Small uncropped PNG for web listings
+    "thumbnail": OutputProfile("thumbnail", "png", 24, False, "_thumb"),
+    # Vector output; dpi only affects embedded raster elements
+    "svg": OutputProfile("svg", "svg", 72, True),
+    "pdf": OutputProfile("pdf", "pdf", 72, True),
+}
+
+RenderTiming = namedtuple("RenderTiming", ["profile", "draw_seconds", "save_seconds", "nbytes"])
+
+
+def get_profile(profile: Union[str, OutputProfile]) -> OutputProfile:
+    """Resolve a profile name (or pass a custom OutputProfile through)"""
+    if isinstance(profile, OutputProfile):
+        return profile
+    try:
+        return OUTPUT_PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown output profile {profile!r}; "
+                         f"choose from {', '.join(OUTPUT_PROFILES)}") from None
@@ -0,0 +1,84 @@
+"""
+Content-addressed cache of rendered plots
+"""
+
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import asdict
+from typing import Any, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: index updates are not locked
+    fcntl = None
+
+
+class PlotCache:
+    """Index of rendered files keyed by a hash of everything that shapes them
+
+    The index (a JSON file in the output directory) maps each file name to the
+    key it was rendered from. A render whose key matches the index entry of
+    an existing file is up to date and can be skipped. Index updates are
+    locked, so pool workers can share one cache directory.
+    """
+
+    def __init__(self, output_dir: str, index_name: str = "plot_index.json"):
+        self.output_dir = output_dir
+        self.index_path = os.path.join(output_dir, index_name)
+        os.makedirs(output_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(**inputs: Any) -> str:
+        """SHA-256 of the inputs as canonical JSON (dataclasses and arrays allowed)"""
+        def encode(value):
+            if hasattr(value, "__dataclass_fields__"):
+                return asdict(value)
+            if hasattr(value, "tolist"):
+                return value.tolist()
+            raise TypeError(f"Cannot hash {type(value).__name__} into a plot key")
+
+        payload = json.dumps(inputs, sort_keys=True, default=encode)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def load_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def lookup(self, filename: str, key: str) -> Optional[str]:
+        """Path of filename if it exists and was rendered from key, else None"""
+        entry = self.load_index().get(filename)
+        path = os.path.join(self.output_dir, filename)
+        if entry is not None and entry.get("key") == key and os.path.exists(path):
+            return path
+        return None
+
+    def record(self, filename: str, key: str, **details: Any):
+        """Record that filename was rendered from key"""
+        path = os.path.join(self.output_dir, filename)
+        entry = {"key": key, "bytes": os.path.getsize(path),
+                 "rendered_at": time.strftime("%Y-%m-%dT%H:%M:%S"), **details}
+        with self._locked():
+            index = self.load_index()
+            index[filename] = entry
+            tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(index, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.index_path)
+
+    @contextmanager
+    def _locked(self):
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.index_path}.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
@@ -2,64 +2,182 @@
 Visualization engine for option strategies
 """
 
+import io
 import os
+import time
 import numpy as np
+import matplotlib
 import matplotlib.pyplot as plt
-from typing import Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
 
+from ..analytics import PnLSurface
 from ..strategies import OptionStrategy
+from .curves import compute_curves, scenario_payoff
+from .output_profiles import OutputProfile, RenderTiming, get_profile
+from .plot_cache import PlotCache
+
+if TYPE_CHECKING:
+    from .curve_export import CurveExporter
+    from .figure_template import FigureTemplate
+
+
+# Part of every plot cache key: bump whenever the rendered charts change
+ENGINE_VERSION = "1"
+
+# Line colors of the time decay panel, one per TIME_DECAY_FRACTIONS entry
+TIME_DECAY_COLORS = ('blue', 'green', 'orange', 'red', 'purple')
 
 
 class VisualizationEngine:
     """Generate visualizations for options strategies"""
     
-    def __init__(self, strategy: OptionStrategy, output_dir: str = 'strategy_plot'):
+    def __init__(self, strategy: OptionStrategy, output_dir: Optional[str] = 'strategy_plot',
+                 surface: Optional[PnLSurface] = None, cache: Optional[PlotCache] = None,
+                 exporter: Optional["CurveExporter"] = None):
         self.strategy = strategy
         self.output_dir = output_dir
-        # Create output directory if it doesn't exist
-        os.makedirs(output_dir, exist_ok=True)
+        # Optional shared P&L surface for the scenario panels (exact pricing otherwise)
+        self.surface = surface
+        # Optional plot cache: renders whose inputs are unchanged are skipped
+        if cache is not None and (output_dir is None or
+                                  os.path.abspath(cache.output_dir) != os.path.abspath(output_dir)):
+            raise ValueError(f"Plot cache directory {cache.output_dir} differs from {output_dir}")
+        self.cache = cache
+        # Optional curve exporter: every render hands it the curves it drew
+        self.exporter = exporter
+        # Draw and save time of every render, for comparing output profiles
+        self.render_timings: List[RenderTiming] = []
+        # Create output directory if it doesn't exist (None: data and in-memory output only)
+        if output_dir is not None:
+            os.makedirs(output_dir, exist_ok=True)
     
-    def generate_full_analysis(self, stock_range: Tuple[float, float] = (80, 120)):
-        """Generate complete 4-panel analysis"""
-        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 12))
-        fig.suptitle(f'{self.strategy.config.code}: {self.strategy.config.name}', 
-                    fontsize=16, fontweight='bold')
-        
-        stock_prices = np.linspace(stock_range[0], stock_range[1], 100)
-        
-        # 1. Payoff at Expiration
-        self._plot_expiration_payoff(ax1, stock_prices)
-        
-        # 2. Time Decay Effect
-        self._plot_time_decay(ax2, stock_prices)
-        
-        # 3. Volatility Effect
-        self._plot_volatility_effect(ax3, stock_prices)
+    def generate_full_analysis(self, stock_range: Tuple[float, float] = (80, 120),
+                               show: bool = True, dpi: Optional[int] = None,
+                               template: Optional["FigureTemplate"] = None,
+                               profile: Union[str, OutputProfile] = "full") -> str:
+        """Generate complete 4-panel analysis and return the saved file path
         
-        # 4. Strategy Summary
-        self._plot_strategy_summary(ax4)
-        
-        plt.tight_layout()
-        
-        # Save plot to file
-        filename = f"{self.strategy.config.code}_analysis.png"
+        The output profile picks format, dpi (unless overridden) and cropping.
+        The figure is always closed afterwards; pass show=False for batch
+        rendering, where nothing should block or accumulate. With a cache,
+        an existing file rendered from identical inputs is reused as is.
+        A FigureTemplate is refilled and saved instead of building a new
+        figure (never shown, left open for the next strategy).
+        """
+        if self.output_dir is None:
+            raise ValueError("This engine has no output directory; use render_bytes instead")
+        profile = get_profile(profile)
+        filename = profile.filename(self.strategy.config.code)
         filepath = os.path.join(self.output_dir, filename)
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        print(f"📊 Plot saved to: {filepath}")
+        key = self.render_key(stock_range, dpi, profile) if self.cache is not None else None
+        if key is not None and self.cache.lookup(filename, key):
+            print(f"♻️  Plot up to date: {filepath}")
+            if self.exporter is not None:
+                stock_prices = self._stock_prices(stock_range)
+                self.exporter.add(self.strategy, stock_prices, self.compute_curves(stock_prices))
+            self._print_analysis()
+            return filepath
         
-        # Also try to show if in interactive environment
-        try:
-            plt.show()
-        except:
-            print("💡 Plot saved to file (interactive display not available)")
+        self._render(filepath, stock_range, profile, dpi, template, show)
+        print(f"📊 Plot saved to: {filepath}")
+        if key is not None:
+            self.cache.record(filename, key, code=self.strategy.config.code, profile=profile.name)
         
         # Print analysis
         self._print_analysis()
+        return filepath
     
-    def _plot_expiration_payoff(self, ax, stock_prices):
-        """Plot payoff at expiration"""
-        payoffs = self.strategy.calculate_payoff(stock_prices, 0)
+    def render_bytes(self, stock_range: Tuple[float, float] = (80, 120),
+                     profile: Union[str, OutputProfile] = "thumbnail", dpi: Optional[int] = None,
+                     template: Optional["FigureTemplate"] = None) -> bytes:
+        """Render the 4-panel analysis into memory, without touching the filesystem"""
+        buffer = io.BytesIO()
+        self._render(buffer, stock_range, get_profile(profile), dpi, template)
+        return buffer.getvalue()
+    
+    def _render(self, target, stock_range, profile: OutputProfile, dpi: Optional[int] = None,
+                template: Optional["FigureTemplate"] = None, show: bool = False) -> RenderTiming:
+        """Draw the chart and save it to a path or file object, recording the timing"""
+        dpi = profile.dpi if dpi is None else dpi
+        stock_prices = self._stock_prices(stock_range)
+        title = f'{self.strategy.config.code}: {self.strategy.config.name}'
+        start = time.perf_counter()
+        curves = self.compute_curves(stock_prices)
+        if self.exporter is not None:
+            self.exporter.add(self.strategy, stock_prices, curves)
+        
+        if template is not None:
+            template.draw(title, stock_prices, self.strategy.base_price, curves, self._summary_text())
+            drawn = time.perf_counter()
+            template.save(target, dpi, profile.format, profile.tight)
+        else:
+            fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 12))
+            try:
+                fig.suptitle(title, fontsize=16, fontweight='bold')
+                
+                # 1. Payoff at Expiration
+                self._plot_expiration_payoff(ax1, stock_prices, curves["expiration"])
+                
+                # 2. Time Decay Effect
+                self._plot_time_decay(ax2, stock_prices, curves["time_decay"])
+                
+                # 3. Volatility Effect
+                self._plot_volatility_effect(ax3, stock_prices, curves["volatility"])
+                
+                # 4. Strategy Summary
+                self._plot_strategy_summary(ax4)
+                
+                fig.tight_layout()
+                drawn = time.perf_counter()
+                fig.savefig(target, dpi=dpi, format=profile.format,
+                            bbox_inches='tight' if profile.tight else None)
+                
+                # Also try to show if in interactive environment
+                if show:
+                    try:
+                        plt.show()
+                    except:
+                        print("💡 Plot saved to file (interactive display not available)")
+            finally:
+                plt.close(fig)
         
+        saved = time.perf_counter()
+        nbytes = target.tell() if hasattr(target, "tell") else os.path.getsize(target)
+        timing = RenderTiming(profile.name, drawn - start, saved - drawn, nbytes)
+        self.render_timings.append(timing)
+        return timing
+    
+    @staticmethod
+    def _stock_prices(stock_range: Tuple[float, float]) -> np.ndarray:
+        return np.linspace(stock_range[0], stock_range[1], 100)
+    
+    def render_key(self, stock_range: Tuple[float, float] = (80, 120), dpi: Optional[int] = None,
+                   profile: Union[str, OutputProfile] = "full") -> str:
+        """Hash of every input that shapes the 4-panel chart"""
+        profile = get_profile(profile)
+        strategy = self.strategy
+        legs = strategy.legs
+        surface = self.surface
+        return PlotCache.make_key(
+            engine_version=ENGINE_VERSION,
+            matplotlib_version=matplotlib.__version__,
+            config=strategy.config,
+            pricer=[type(strategy.calculator).__qualname__,
+                    {name: value for name, value in vars(strategy.calculator).items()
+                     if not name.startswith('_')}],
+            base_price=strategy.base_price,
+            risk_free_rate=strategy.risk_free_rate,
+            volatility=strategy.volatility,
+            time_to_expiration=strategy.time_to_expiration,
+            legs=[legs.option_type, legs.strike, legs.quantity, legs.expiry, legs.side],
+            stock_range=list(stock_range),
+            dpi=profile.dpi if dpi is None else dpi,
+            output=[profile.format, profile.tight],
+            surface=None if surface is None else [surface.tolerance, surface.bounds],
+        )
+    
+    def _plot_expiration_payoff(self, ax, stock_prices, payoffs):
+        """Plot payoff at expiration"""
         ax.plot(stock_prices, payoffs, 'b-', linewidth=2, label='Strategy Payoff')
         ax.axhline(y=0, color='black', linestyle='-', alpha=0.3)
         ax.axvline(x=self.strategy.base_price, color='gray', linestyle='--', alpha=0.5, label='Current Price')
@@ -74,21 +192,10 @@ class VisualizationEngine:
         ax.legend()
         ax.grid(True, alpha=0.3)
     
-    def _plot_time_decay(self, ax, stock_prices):
+    def _plot_time_decay(self, ax, stock_prices, curves):
         """Plot time decay effect"""
-        time_scenarios = [
-            self.strategy.time_to_expiration,
-            self.strategy.time_to_expiration * 0.75,
-            self.strategy.time_to_expiration * 0.5,
-            self.strategy.time_to_expiration * 0.25,
-            0
-        ]
-        colors = ['blue', 'green', 'orange', 'red', 'purple']
-        
-        for i, time_left in enumerate(time_scenarios):
-            payoffs = self.strategy.calculate_payoff(stock_prices, time_left)
-            label = f'{int(time_left*365)} days' if time_left > 0 else 'Expiration'
-            ax.plot(stock_prices, payoffs, color=colors[i], linewidth=2, label=label)
+        for color, (label, payoffs) in zip(TIME_DECAY_COLORS, curves):
+            ax.plot(stock_prices, payoffs, color=color, linewidth=2, label=label)
         
         ax.axhline(y=0, color='black', linestyle='-', alpha=0.3)
         ax.axvline(x=self.strategy.base_price, color='gray', linestyle='--', alpha=0.5)
@@ -98,18 +205,10 @@ class VisualizationEngine:
         ax.legend()
         ax.grid(True, alpha=0.3)
     
-    def _plot_volatility_effect(self, ax, stock_prices):
+    def _plot_volatility_effect(self, ax, stock_prices, curves):
         """Plot volatility effect"""
-        original_vol = self.strategy.volatility
-        vol_scenarios = [0.15, 0.20, 0.25, 0.30, 0.40]
-        
-        for vol in vol_scenarios:
-            self.strategy.volatility = vol
-            payoffs = self.strategy.calculate_payoff(stock_prices, self.strategy.time_to_expiration)
-            ax.plot(stock_prices, payoffs, linewidth=2, label=f'IV = {vol*100:.0f}%')
-        
-        # Restore original volatility
-        self.strategy.volatility = original_vol
+        for label, payoffs in curves:
+            ax.plot(stock_prices, payoffs, linewidth=2, label=label)
         
         ax.axhline(y=0, color='black', linestyle='-', alpha=0.3)
         ax.axvline(x=self.strategy.base_price, color='gray', linestyle='--', alpha=0.5)
@@ -119,18 +218,27 @@ class VisualizationEngine:
         ax.legend()
         ax.grid(True, alpha=0.3)
     
+    def compute_curves(self, stock_prices: np.ndarray) -> Dict[str, Any]:
+        """All chart data: expiration payoff and labelled scenario curves"""
+        return compute_curves(self.strategy, stock_prices, self.surface)
+    
+    def _scenario_payoff(self, stock_prices, time_left, volatility=None):
+        """P&L of one scenario line, read from the surface when one is attached"""
+        return scenario_payoff(self.strategy, stock_prices, time_left, volatility, self.surface)
+    
     def _is_credit_strategy(self) -> bool:
         """Determine if this is a credit strategy"""
-        if "short" in self.strategy.config.strategy_type:
-            return True
-        elif self.strategy.config.strategy_type == "spread":
-            return "Bull Put" in self.strategy.config.name or "Bear Call" in self.strategy.config.name
-        return False
+        return self.strategy.is_credit
     
     def _plot_strategy_summary(self, ax):
         """Plot strategy summary info"""
         ax.axis('off')
-        
+        ax.text(0.05, 0.95, self._summary_text(), transform=ax.transAxes, fontsize=10,
+                verticalalignment='top', fontfamily='monospace',
+                bbox=dict(boxstyle="round,pad=0.3", facecolor="lightgray", alpha=0.5))
+    
+    def _summary_text(self) -> str:
+        """Text of the strategy summary panel"""
         is_credit = self._is_credit_strategy()
         cost = self.strategy.get_initial_cost()
         
@@ -149,10 +257,7 @@ Volatility: {self.strategy.volatility*100:.0f}%
 Initial {"Credit" if is_credit else "Cost"}: ${abs(cost):.2f}
 {"(Credit Received)" if is_credit else "(Debit Paid)"}
         """
-        
-        ax.text(0.05, 0.95, info_text, transform=ax.transAxes, fontsize=10,
-                verticalalignment='top', fontfamily='monospace',
-                bbox=dict(boxstyle="round,pad=0.3", facecolor="lightgray", alpha=0.5))
+        return info_text
     
     def _print_analysis(self):
         """Print detailed analysis"""
@@ -1,5 +1,7 @@
 import pytest
+import io
 import math
+import numpy as np
 import sys
 import os
 
@@ -81,4 +83,186 @@ class TestDeltaCalculator:
         # Should return positive quantity to buy QQQ calls to hedge short TQQQ calls
         assert hedge_quantity > 0, f"Expected positive hedge quantity, got {hedge_quantity}"
         # Should be reasonable multiple of TQQQ position due to leverage difference
-        assert 5 < hedge_quantity < 50, f"Expected hedge quantity between 5-50, got {hedge_quantity}" 
\ No newline at end of file
+        assert 5 < hedge_quantity < 50, f"Expected hedge quantity between 5-50, got {hedge_quantity}"
+
+    def test_shouldRecoverImpliedVolatility_fromOptionPrice(self):
+        """Test implied volatility round-trips a Black-Scholes price"""
+        calculator = OptionCalculator()
+        price = calculator.greeks_calculator.pricer.calculate_put_price(45.0, 44.0, 0.1, 0.05, 0.65)
+        
+        volatility = calculator.calculate_implied_volatility(price, 45.0, 44.0, 0.1, 0.05, 'put')
+        
+        assert abs(volatility - 0.65) < 1e-6, f"Expected implied volatility 0.65, got {volatility}"
+
+    def test_shouldUsePerLegVolatility_whenOverridesGiven(self):
+        """Test per-leg volatilities override the shared volatility"""
+        calculator = OptionCalculator()
+        common = dict(tqqq_price=45.0, tqqq_strike=46.0, tqqq_quantity=-10, tqqq_option_type='call',
+                      qqq_price=370.0, qqq_strike=380.0, qqq_option_type='call',
+                      time_to_expiry=0.1, risk_free_rate=0.05)
+        
+        shared = calculator.calculate_hedge_quantity(volatility=0.25, **common)
+        same = calculator.calculate_hedge_quantity(volatility=0.9, tqqq_volatility=0.25,
+                                                   qqq_volatility=0.25, **common)
+        split = calculator.calculate_hedge_quantity(volatility=0.25, tqqq_volatility=0.6, **common)
+        
+        assert abs(shared - same) < 1e-12
+        assert split != shared
+
+    def test_shouldRejectPriceBelowIntrinsic_whenSolvingImpliedVolatility(self):
+        """Test a quote below intrinsic value has no implied volatility"""
+        calculator = OptionCalculator()
+        with pytest.raises(ValueError):
+            calculator.calculate_implied_volatility(1.0, 50.0, 44.0, 0.1, 0.05, 'call')
+
+    def test_shouldMatchScalarHedge_whenNettingBook(self):
+        """Test the batch hedge nets the book and sizes every candidate like the scalar path"""
+        calculator = OptionCalculator()
+        strikes = [40.0, 44.0, 46.0, 50.0]
+        quantities = [-10, 5, -20, 8]
+        types = ['call', 'put', 'call', 'PUT']
+        expiries = [0.02, 0.1, 0.25, 0.1]
+        candidates = dict(qqq_strikes=[360.0, 380.0, 400.0], qqq_option_types=['put', 'call', 'call'],
+                          qqq_expiries=[0.1, 0.1, 0.25])
+        
+        hedge = calculator.calculate_book_hedge(45.0, strikes, quantities, types, expiries, 370.0,
+                                                risk_free_rate=0.05, volatility=0.5, **candidates)
+        
+        for k, (qqq_strike, qqq_type, qqq_expiry) in enumerate(zip(*candidates.values())):
+            expected = 0.0
+            for strike, quantity, option_type, expiry in zip(strikes, quantities, types, expiries):
+                # Scalar hedges of one line against one option share expiry; recombine per leg
+                tqqq_delta = calculator.calculate_call_delta(45.0, strike, expiry, 0.05, 0.5)
+                tqqq_delta -= option_type.lower() == 'put'
+                qqq_delta = calculator.calculate_call_delta(370.0, qqq_strike, qqq_expiry, 0.05, 0.5)
+                qqq_delta -= qqq_type == 'put'
+                expected += -quantity * tqqq_delta * 3.0 * 45.0 / 370.0 / qqq_delta
+            assert abs(hedge.quantities[k] - expected) < 1e-9
+        assert np.all(np.abs(hedge.residual_delta) <= 0.5 * np.abs(hedge.hedge_deltas) + 1e-12)
+        assert abs(hedge.book_delta - hedge.line_deltas.sum()) < 1e-12
+
+    def test_shouldReturnZeroQuantity_whenCandidateHasNoDelta(self):
+        """Test a candidate with no delta is skipped instead of dividing by zero"""
+        calculator = OptionCalculator()
+        hedge = calculator.calculate_book_hedge(45.0, [46.0], [-10], ['call'], [0.1], 370.0,
+                                                [380.0, 900.0], ['call', 'call'], [0.1, 0.001],
+                                                0.05, 0.25)
+        assert hedge.quantities[1] == 0.0 and hedge.quantities[0] > 0
+        assert hedge.residual_delta[1] == hedge.book_delta
+
+    def test_shouldMatchScalarHedge_forEveryPositionInArrays(self):
+        """Test the per-position array hedge reproduces calculate_hedge_quantity"""
+        calculator = OptionCalculator()
+        positions = [(45.0, 46.0, -10, 'call', 370.0, 380.0, 'call', 0.02, 0.25),
+                     (44.0, 40.0, 5, 'put', 365.0, 350.0, 'put', 0.3, 0.6),
+                     (45.0, 44.0, -3, 'put', 370.0, 380.0, 'call', 0.1, 0.4)]
+        columns = [np.array(column) for column in zip(*positions)]
+        
+        hedges = calculator.calculate_hedge_quantities(*columns[:7], columns[7], 0.05, columns[8])
+        
+        for hedge, (tp, tk, tq, tt, qp, qk, qt, T, vol) in zip(hedges.quantities, positions):
+            expected = calculator.calculate_hedge_quantity(tp, tk, tq, tt, qp, qk, qt, T, 0.05, vol,
+                                                           leverage_ratio=3.0 * tp / qp)
+            assert abs(hedge - expected) < 1e-9
+
+    def test_shouldStreamBatchRows_whenReadingCsv(self):
+        """Test batch rows are hedged in chunks, with bad rows reported in place"""
+        from hedge_calculator_cli import hedge_chunk, read_positions
+        book = io.StringIO(
+            "tqqq_price,tqqq_strike,tqqq_quantity,tqqq_type,qqq_price,qqq_strike,qqq_type,expiry,volatility\n"
+            "45,46,-10,call,370,380,call,2099-03-15,\n"
+            "45,44,-5,put,370,360,put,2099-03-15,0.3\n"
+            "45,44,-5,put,370,,put,2099-03-15,\n"
+        )
+        calculator = OptionCalculator()
+        records = hedge_chunk(calculator, list(read_positions(book, 'csv')),
+                              {'risk_free_rate': 0.05, 'volatility': 0.25})
+        
+        assert [record['row'] for record in records] == [1, 2, 3]
+        assert records[0]['action'] == 'BUY' and records[0]['qqq_volatility'] == 0.25
+        assert records[1]['tqqq_volatility'] == 0.3
+        assert 'qqq_strike' in records[2]['error']
+        expected = calculator.calculate_hedge_quantity(45.0, 46.0, -10, 'call', 370.0, 380.0, 'call',
+                                                       records[0]['time_to_expiry'], 0.05, 0.25,
+                                                       leverage_ratio=3.0 * 45 / 370)
+        assert abs(records[0]['hedge_quantity'] - expected) < 1e-9
+
+    def test_shouldReportInvalidPricesPerRow_withoutFailingChunk(self):
+        """Test negative prices and zero strikes become error records beside good rows"""
+        from hedge_calculator_cli import hedge_chunk, read_positions
+        book = io.StringIO(
+            "tqqq_price,tqqq_strike,tqqq_quantity,tqqq_type,qqq_price,qqq_strike,qqq_type,expiry\n"
+            "-45,46,-10,call,370,380,call,2099-03-15\n"
+            "45,0,-10,call,370,380,call,2099-03-15\n"
+            "45,46,-10,call,370,380,call,2099-03-15\n"
+        )
+        records = hedge_chunk(OptionCalculator(), list(read_positions(book, 'csv')),
+                              {'risk_free_rate': 0.05, 'volatility': 0.25})
+        
+        assert 'tqqq_price' in records[0]['error']
+        assert 'tqqq_strike' in records[1]['error']
+        assert 'error' not in records[2] and records[2]['action'] == 'BUY'
+
+    def test_shouldReportNonObjectJsonLines_withoutFailingChunk(self):
+        """Test JSON lines that are not objects become error records"""
+        from hedge_calculator_cli import hedge_chunk, read_positions
+        good = ('{"tqqq_price": 45, "tqqq_strike": 46, "tqqq_quantity": -10, "tqqq_type": "call", '
+                '"qqq_price": 370, "qqq_strike": 380, "qqq_type": "call", "expiry": "2099-03-15"}')
+        book = io.StringIO("\n".join(["5", "null", "[1, 2]", good]) + "\n")
+        records = hedge_chunk(OptionCalculator(), list(read_positions(book, 'jsonl')),
+                              {'risk_free_rate': 0.05, 'volatility': 0.25})
+        
+        assert [record['row'] for record in records] == [1, 2, 3, 4]
+        assert all('object' in record['error'] for record in records[:3])
+        assert 'error' not in records[3]
+
+    def test_shouldScaleHorizonRatioByPrices_whenHorizonDaysGiven(self):
+        """Test a horizon hedge ratio is in TQQQ dollars per QQQ dollar, near 3 * TQQQ / QQQ"""
+        from hedge_calculator_cli import horizon_leverage, parse_position
+        fields = {'tqqq_price': 45, 'tqqq_strike': 46, 'tqqq_quantity': -10, 'tqqq_type': 'call',
+                  'qqq_price': 370, 'qqq_strike': 380, 'qqq_type': 'call', 'expiry': '2099-03-15'}
+        multiplier = horizon_leverage(21, 0.25, 0.05)
+        position = parse_position(fields, {'risk_free_rate': 0.05, 'volatility': 0.25,
+                                           'horizon_leverage': multiplier})
+        
+        assert abs(multiplier - 3.0) < 0.1
+        assert abs(position['leverage_ratio'] - multiplier * 45 / 370) < 1e-12
+        default = parse_position(fields, {'risk_free_rate': 0.05, 'volatility': 0.25})
+        assert abs(default['leverage_ratio'] - 3.0 * 45 / 370) < 1e-12
+
+    def test_shouldWarnAboutPointRatio_onlyWhenLeverageRatioIsThree(self, monkeypatch, capsys):
+        """Test the CLI hedges in dollars by default and warns only on an explicit 3.0 ratio"""
+        import hedge_calculator_cli
+        argv = ['hedge_calculator_cli.py', '--tqqq-price', '45', '--tqqq-strike', '46',
+                '--tqqq-quantity', '-10', '--tqqq-type', 'call', '--expiry', '2099-03-15',
+                '--qqq-price', '370', '--qqq-strike', '380', '--qqq-type', 'call']
+        monkeypatch.setattr(sys, 'argv', argv)
+        hedge_calculator_cli.main()
+        output = capsys.readouterr().out
+        assert 'point-for-point' not in output and 'at 0.3649 TQQQ dollars per QQQ dollar' in output
+        
+        monkeypatch.setattr(sys, 'argv', argv + ['--leverage-ratio', '3'])
+        hedge_calculator_cli.main()
+        output = capsys.readouterr().out
+        assert 'point-for-point' in output and 'neutralize' not in output
+        
+        monkeypatch.setattr(sys, 'argv', argv + ['--horizon-days', '21'])
+        hedge_calculator_cli.main()
+        output = capsys.readouterr().out
+        assert 'point-for-point' not in output and 'over 21 trading days' in output
+
+    def test_shouldReportUnhedgeableRows_whenQqqDeltaVanishes(self):
+        """Test a QQQ hedge option with no delta is an error record, not a zero SELL"""
+        from datetime import date, timedelta
+        from hedge_calculator_cli import hedge_chunk, read_positions
+        expiry = (date.today() + timedelta(days=30)).isoformat()
+        book = io.StringIO(
+            "tqqq_price,tqqq_strike,tqqq_quantity,tqqq_type,qqq_price,qqq_strike,qqq_type,expiry\n"
+            f"45,46,-10,call,370,2000,call,{expiry}\n"
+            "45,46,0,call,370,380,call,2099-03-15\n"
+        )
+        records = hedge_chunk(OptionCalculator(), list(read_positions(book, 'csv')),
+                              {'risk_free_rate': 0.05, 'volatility': 0.25})
+        
+        assert records[0] == {'row': 1, 'error': "QQQ option delta is ~0; cannot hedge"}
+        assert records[1]['action'] == 'HOLD' and records[1]['contracts'] == 0
@@ -0,0 +1,73 @@
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from delta_calculator import OptionCalculator
+from delta_hedge_simulator import DeltaHedgeSimulator
+from leveraged_etf import LeveragedETFModel
+
+
+POSITION = dict(tqqq_strike=46.0, tqqq_quantity=-10, tqqq_option_type='call', qqq_strike=380.0,
+                qqq_option_type='call', risk_free_rate=0.05, tqqq_volatility=0.75, qqq_volatility=0.25)
+
+
+class TestDeltaHedgeSimulator:
+
+    def setup_method(self):
+        paths = LeveragedETFModel().simulate(370.0, 45.0, 21, 0.25, 0.05, n_paths=4000, seed=3)
+        self.times, self.qqq, self.tqqq = paths.times, paths.qqq, paths.tqqq
+
+    def test_shouldReduceRisk_whenRebalancingMoreOften(self):
+        """Test daily rebalancing beats weekly, which beats not hedging"""
+        daily = DeltaHedgeSimulator(rebalance_every=1).run(self.times, self.qqq, self.tqqq, **POSITION)
+        weekly = DeltaHedgeSimulator(rebalance_every=5).run(self.times, self.qqq, self.tqqq, **POSITION)
+
+        assert daily.n_paths == 4000 and len(daily.rebalance_times) == 21 and len(weekly.rebalance_times) == 5
+        assert np.std(daily.hedge_pnl) < np.std(weekly.hedge_pnl) < 0.2 * np.std(daily.unhedged_pnl)
+        assert np.all(daily.transaction_costs == 0)
+        np.testing.assert_allclose(daily.hedge_pnl, daily.hedging_error)
+
+    def test_shouldHaveNoMeanHedgingError_withoutCosts(self):
+        """Test a frictionless daily hedge is unbiased when TQQQ pays for its leverage"""
+        model = LeveragedETFModel(expense_ratio=0.0, underlying_expense_ratio=0.0, tracking_error=0.0)
+        paths = model.simulate(370.0, 45.0, 21, 0.25, 0.05, drift=0.05, n_paths=40_000, seed=11)
+        result = DeltaHedgeSimulator().run(paths.times, paths.qqq, paths.tqqq, **POSITION)
+
+        standard_error = np.std(result.hedging_error) / np.sqrt(result.n_paths)
+        assert abs(np.mean(result.hedging_error)) < 4 * standard_error
+
+    def test_shouldChargeCommissionPerContractTraded(self):
+        """Test commission-only costs are the contracts traded, compounded to the horizon"""
+        result = DeltaHedgeSimulator(commission=0.65).run(self.times, self.qqq, self.tqqq, **POSITION)
+
+        compounding = np.exp(0.05 * self.times[-1])
+        assert np.all(result.transaction_costs >= 0.65 * result.contracts_traded - 1e-9)
+        assert np.all(result.transaction_costs <= 0.65 * result.contracts_traded * compounding + 1e-9)
+        np.testing.assert_allclose(result.hedge_pnl, result.hedging_error - result.transaction_costs)
+
+    def test_shouldReplayCalculatorHedge_whenPointRatioRequested(self):
+        """Test the opening hedge is calculate_hedge_quantity's quantity, on a single historical path"""
+        simulator = DeltaHedgeSimulator(rebalance_every=100, dollar_neutral=False)
+        result = simulator.run(self.times, self.qqq[0], self.tqqq[0], **POSITION)
+
+        expected = OptionCalculator().calculate_hedge_quantity(
+            45.0, 46.0, -10, 'call', 370.0, 380.0, 'call', self.times[-1], 0.05, 0.25,
+            tqqq_volatility=0.75, qqq_volatility=0.25)
+        assert result.n_paths == 1
+        assert abs(result.final_hedge[0] - expected) < 1e-9
+
+    def test_shouldMatchChunkedAndWholeRuns(self):
+        """Test splitting paths into chunks does not change the results"""
+        whole = DeltaHedgeSimulator().run(self.times, self.qqq, self.tqqq, **POSITION)
+        chunked = DeltaHedgeSimulator(max_chunk_elements=1000).run(self.times, self.qqq, self.tqqq, **POSITION)
+        np.testing.assert_allclose(whole.hedge_pnl, chunked.hedge_pnl)
+
+    def test_shouldRejectHedgeExpiringBeforeTheOption(self):
+        """Test a QQQ hedge must outlive the TQQQ option"""
+        with pytest.raises(ValueError):
+            DeltaHedgeSimulator().run(self.times, self.qqq, self.tqqq, qqq_expiry=0.01, **POSITION)
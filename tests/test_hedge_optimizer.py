@@ -0,0 +1,88 @@
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from delta_calculator import OptionCalculator
+from hedge_optimizer import HedgeOptimizer
+
+
+class TestHedgeOptimizer:
+
+    def setup_method(self):
+        self.optimizer = HedgeOptimizer()
+        self.candidates = self.optimizer.candidate_greeks(
+            370.0, [360.0, 380.0, 370.0, 0.0], [0.08, 0.08, 0.25, 0.0], ['put', 'call', 'call', 'stock'], 0.25)
+        self.exposure = self.optimizer.book_exposure(45.0, 370.0, [46.0, 40.0], [-50, 20], ['call', 'put'],
+                                                     [0.08, 0.08], 0.75, leverage_ratio=0.365)
+
+    def test_shouldReproduceScalarHedge_forDeltaWithOneOption(self):
+        """Test an exact delta-only hedge with one QQQ option is calculate_hedge_quantity"""
+        optimizer = HedgeOptimizer(greeks=("delta",))
+        candidates = optimizer.candidate_greeks(370.0, [380.0], [0.1], ['call'], 0.25)
+        exposure = optimizer.book_exposure(45.0, 370.0, [46.0], [-10], ['call'], 0.1, 0.25, leverage_ratio=0.365)
+
+        solution = optimizer.optimize(exposure, candidates, tolerances=0.0, integer=False)
+
+        expected = OptionCalculator().calculate_hedge_quantity(45.0, 46.0, -10, 'call', 370.0, 380.0, 'call',
+                                                               0.1, 0.05, 0.25, leverage_ratio=0.365)
+        assert abs(solution.quantities[0] - expected) < 1e-6
+        assert abs(solution.residual[0]) < 1e-6
+
+    def test_shouldMatchFiniteDifferences_whenRepricingTqqqFromQqqBumps(self):
+        """Test the default book delta and gamma are QQQ-dollar sensitivities of the book value"""
+        pricer = OptionCalculator().greeks_calculator.pricer
+        optimizer = HedgeOptimizer(greeks=("delta", "gamma"))
+        exposure = optimizer.book_exposure(45.0, 370.0, [46.0], [-100], ['call'], 30 / 365, 0.75)
+
+        def book_value(qqq):
+            tqqq = 45.0 * (1 + 3 * (qqq / 370.0 - 1))  # one daily-reset step
+            return -100 * 100 * pricer.calculate_option_prices(tqqq, 46.0, 30 / 365, 0.05, 0.75, True)
+
+        h = 0.5
+        delta = (book_value(370.0 + h) - book_value(370.0 - h)) / (2 * h)
+        gamma = (book_value(370.0 + h) - 2 * book_value(370.0) + book_value(370.0 - h)) / h**2
+        assert abs(exposure[0] - delta) < 1e-3 * abs(delta)
+        assert abs(exposure[1] - gamma) < 1e-3 * abs(gamma)
+
+    def test_shouldHedgeWithinTolerances_inWholeLots(self):
+        """Test every Greek lands inside its band and lots stay whole"""
+        solution = self.optimizer.optimize(self.exposure, self.candidates, lot_sizes=[1, 1, 1, 10])
+
+        assert np.all(np.abs(solution.residual) <= solution.tolerances * (1 + 1e-9))
+        assert np.allclose(solution.tolerances, 0.01 * np.abs(self.exposure))
+        assert np.allclose(solution.quantities[:3], np.round(solution.quantities[:3]))
+        assert np.allclose(solution.quantities[3] % 10, 0)
+
+    def test_shouldTradeNoMoreCandidatesThanGreeks_whenContinuous(self):
+        """Test the fee-minimal fractional hedge is sparse among many candidates"""
+        candidates = self.optimizer.candidate_greeks(
+            370.0, np.repeat([350.0, 360.0, 370.0, 380.0, 390.0], 4), np.tile([0.08, 0.08, 0.16, 0.16], 5),
+            np.tile(['call', 'put'], 10), 0.25)
+        solution = self.optimizer.optimize(self.exposure, candidates, costs=0.65, integer=False)
+
+        assert np.count_nonzero(np.abs(solution.continuous) > 1e-9) <= len(self.optimizer.greeks)
+        assert np.all(np.abs(solution.residual) <= solution.tolerances * (1 + 1e-6))
+
+    def test_shouldAvoidExpensiveCandidates(self):
+        """Test fees steer the hedge to the cheaper of two equivalent instruments"""
+        optimizer = HedgeOptimizer(greeks=("delta",))
+        candidates = optimizer.candidate_greeks(370.0, [0.0, 0.0], [0.0, 0.0], ['stock', 'stock'], 0.25)
+        solution = optimizer.optimize([-1000.0], candidates, costs=[0.01, 0.005])
+
+        assert solution.quantities[0] == 0 and abs(solution.quantities[1] - 1000) <= 10
+        assert abs(solution.cost - 0.005 * abs(solution.quantities[1])) < 1e-9
+
+    def test_shouldRaise_whenNoWholeLotHedgeFitsTolerances(self):
+        """Test an infeasible band is reported rather than silently missed"""
+        with pytest.raises(ValueError):
+            self.optimizer.optimize(self.exposure, self.candidates, tolerances=0.0)
+
+    def test_shouldRejectUnknownInstrumentTypes(self):
+        """Test candidate types are validated"""
+        with pytest.raises(ValueError):
+            self.optimizer.candidate_greeks(370.0, [380.0], [0.1], ['future'], 0.25)
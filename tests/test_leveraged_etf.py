@@ -0,0 +1,61 @@
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from delta_calculator import OptionCalculator
+from leveraged_etf import LeveragedETFModel
+from option_analyzer.pricing import BlackScholesCalculator
+
+
+class TestLeveragedETFModel:
+
+    def test_shouldMatchInstantaneousRatio_overOneDayWithoutNoise(self):
+        """Test one-day TQQQ moves are exactly leverage * TQQQ/QQQ times QQQ moves without noise or QQQ fees"""
+        model = LeveragedETFModel(underlying_expense_ratio=0.0, tracking_error=0.0)
+        paths = model.simulate(370.0, 45.0, 21, n_paths=20_000)
+        ratios = model.horizon_hedge_ratio(paths)
+
+        assert ratios.shape == (21,)
+        assert abs(ratios[0] - 3 * 45.0 / 370.0) < 1e-9
+        # Daily compounding is convex in the index, so the ratio grows with the horizon
+        assert ratios[-1] > ratios[4] > ratios[0]
+
+    def test_shouldDecayBelowLeveragedIndex_whenVolatile(self):
+        """Test fees and volatility decay keep mean TQQQ growth below 3x the QQQ growth"""
+        model = LeveragedETFModel(tracking_error=0.0)
+        paths = model.simulate(100.0, 100.0, 252, volatility=0.6, drift=0.0, risk_free_rate=0.0,
+                               n_paths=20_000)
+        median_tqqq = np.median(paths.tqqq[:, -1])
+        assert median_tqqq < np.median(paths.qqq[:, -1])
+
+    def test_shouldPriceLikeBlackScholes_forUnleveragedFund(self):
+        """Test a 1x fund with no costs reproduces Black-Scholes option values"""
+        model = LeveragedETFModel(leverage=1.0, expense_ratio=0.0, underlying_expense_ratio=0.0,
+                                  tracking_error=0.0)
+        paths = model.simulate(100.0, 100.0, 63, volatility=0.3, n_paths=200_000, seed=1)
+        values, errors = model.option_values(paths, [90.0, 100.0, 110.0], [21, 63], [True, False, True])
+
+        pricer = BlackScholesCalculator()
+        expected = pricer.calculate_option_prices(100.0, np.array([90.0, 100.0, 110.0]),
+                                                  np.array([[21], [63]]) / 252, 0.05, 0.3,
+                                                  np.array([True, False, True]))
+        assert values.shape == (2, 3)
+        # Daily compounding of simple returns is a slightly different lognormal; allow 4 std errors
+        assert np.all(np.abs(values - expected) < 4 * errors + 0.01)
+        with pytest.raises(ValueError):
+            model.option_values(paths, [100.0], [64])
+
+    def test_shouldScaleHedge_withLeverageRatio(self):
+        """Test a horizon ratio replaces the fixed 3:1 ratio in the hedge quantity"""
+        calculator = OptionCalculator()
+        position = dict(tqqq_price=45.0, tqqq_strike=46.0, tqqq_quantity=-10, tqqq_option_type='call',
+                        qqq_price=370.0, qqq_strike=380.0, qqq_option_type='call',
+                        time_to_expiry=0.1, risk_free_rate=0.05, volatility=0.25)
+        fixed = calculator.calculate_hedge_quantity(**position)
+        horizon = calculator.calculate_hedge_quantity(leverage_ratio=0.3668, **position)
+        assert abs(horizon - fixed * 0.3668 / 3.0) < 1e-9
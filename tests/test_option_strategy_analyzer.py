@@ -17,10 +17,18 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
 
 from option_analyzer import (
-    BlackScholesCalculator, StrategyFactory, StrategyConfig,
+    BlackScholesCalculator, GreeksCalculator, ImpliedVolatilityCalculator, LatticeCalculator,
+    LatticeGreeksCalculator, StrategyFactory, StrategyConfig,
     LongCallStrategy, LongPutStrategy, ShortCallStrategy, 
-    ShortPutStrategy, SpreadStrategy, VisualizationEngine
+    ShortPutStrategy, SpreadStrategy, IronCondorStrategy, LegTable, VisualizationEngine,
+    PayoffAnalyzer, PnLSurface, MomentAnalyzer, ProbabilityAnalyzer
 )
+from option_analyzer.pricing import (
+    FourierCalculator, GeometricBrownianModel, HestonModel, MertonModel, MonteCarloEngine,
+    VarianceGammaModel, norm_cdf
+)
+from option_analyzer.strategies import CALL, PUT, LONG, SHORT
+from option_analyzer.visualization import CurveExporter, FigureTemplate, PlotCache
 
 class TestBlackScholesCalculator(unittest.TestCase):
     """Test Black-Scholes option pricing calculations"""
@@ -82,6 +90,203 @@ class TestBlackScholesCalculator(unittest.TestCase):
         put_price = self.calculator.calculate_put_price(95, 100, 0, self.r, self.sigma)
         self.assertEqual(put_price, 5.0)
 
+class TestBlackScholesArrayAPI(unittest.TestCase):
+    """Test broadcast array pricing entry points"""
+    
+    def setUp(self):
+        self.calculator = BlackScholesCalculator()
+    
+    def test_array_prices_match_scalar(self):
+        """Test array prices agree with the scalar formulas"""
+        stock_prices = np.linspace(80, 120, 9)
+        calls = self.calculator.calculate_call_prices(stock_prices, 100, 0.25, 0.05, 0.2)
+        puts = self.calculator.calculate_put_prices(stock_prices, 100, 0.25, 0.05, 0.2)
+        for S, call, put in zip(stock_prices, calls, puts):
+            self.assertAlmostEqual(call, self.calculator.calculate_call_price(S, 100, 0.25, 0.05, 0.2))
+            self.assertAlmostEqual(put, self.calculator.calculate_put_price(S, 100, 0.25, 0.05, 0.2))
+    
+    def test_broadcasting_shape(self):
+        """Test inputs broadcast against each other"""
+        prices = self.calculator.calculate_call_prices(
+            np.linspace(80, 120, 5)[:, None, None], np.array([95, 100, 105])[None, :, None],
+            0.25, 0.05, np.array([0.1, 0.2, 0.3, 0.4])
+        )
+        self.assertEqual(prices.shape, (5, 3, 4))
+    
+    def test_expired_and_zero_vol_masks(self):
+        """Test T<=0 gives intrinsic value and sigma<=0 gives discounted forward intrinsic"""
+        T = np.array([0.0, -0.1, 0.5, 0.5])
+        sigma = np.array([0.2, 0.2, 0.0, 0.0])
+        S = np.array([105.0, 95.0, 105.0, 95.0])
+        calls = self.calculator.calculate_call_prices(S, 100, T, 0.05, sigma)
+        expected = [5.0, 0.0, 105 - 100*np.exp(-0.025), 0.0]
+        np.testing.assert_array_almost_equal(calls, expected)
+        self.assertTrue(np.all(np.isfinite(calls)))
+    
+    def test_mixed_option_types(self):
+        """Test is_call selects the formula per element"""
+        prices = self.calculator.calculate_option_prices(100, 100, 0.25, 0.05, 0.2, [True, False])
+        self.assertAlmostEqual(prices[0], self.calculator.calculate_call_price(100, 100, 0.25, 0.05, 0.2))
+        self.assertAlmostEqual(prices[1], self.calculator.calculate_put_price(100, 100, 0.25, 0.05, 0.2))
+    
+    def test_negative_stock_price_rejected(self):
+        """Test negative stock prices raise like the scalar API"""
+        with self.assertRaises(ValueError):
+            self.calculator.calculate_call_prices([-10, 100], 100, 0.25, 0.05, 0.2)
+
+class TestGreeksCalculator(unittest.TestCase):
+    """Test analytic Greeks against finite differences of the pricer"""
+    
+    def setUp(self):
+        self.pricer = BlackScholesCalculator()
+        self.greeks = GreeksCalculator(self.pricer)
+        self.args = dict(S=100.0, K=105.0, T=0.25, r=0.05, sigma=0.2)
+    
+    def _price(self, is_call, **overrides):
+        args = dict(self.args, **overrides)
+        return self.pricer.calculate_option_prices(is_call=is_call, **args)
+    
+    def test_first_order_greeks_match_finite_differences(self):
+        """Test delta, vega, theta and rho against bumped prices"""
+        h = 1e-4
+        for is_call in (True, False):
+            g = self.greeks.calculate_greeks(is_call=is_call, **self.args)
+            S, T, r, sigma = self.args["S"], self.args["T"], self.args["r"], self.args["sigma"]
+            delta = (self._price(is_call, S=S + h) - self._price(is_call, S=S - h)) / (2*h)
+            vega = (self._price(is_call, sigma=sigma + h) - self._price(is_call, sigma=sigma - h)) / (2*h)
+            theta = -(self._price(is_call, T=T + h) - self._price(is_call, T=T - h)) / (2*h)
+            rho = (self._price(is_call, r=r + h) - self._price(is_call, r=r - h)) / (2*h)
+            self.assertAlmostEqual(float(g["delta"]), float(delta), places=5)
+            self.assertAlmostEqual(float(g["vega"]), float(vega), places=4)
+            self.assertAlmostEqual(float(g["theta"]), float(theta), places=4)
+            self.assertAlmostEqual(float(g["rho"]), float(rho), places=4)
+            self.assertAlmostEqual(float(g["price"]), float(self._price(is_call)), places=10)
+    
+    def test_second_order_greeks_match_finite_differences(self):
+        """Test gamma, vanna and volga against bumped first-order Greeks"""
+        h = 1e-4
+        S, sigma = self.args["S"], self.args["sigma"]
+        g = self.greeks.calculate_greeks(is_call=True, **self.args)
+        up = self.greeks.calculate_greeks(is_call=True, **dict(self.args, sigma=sigma + h))
+        down = self.greeks.calculate_greeks(is_call=True, **dict(self.args, sigma=sigma - h))
+        s_up = self.greeks.calculate_greeks(is_call=True, **dict(self.args, S=S + h))
+        s_down = self.greeks.calculate_greeks(is_call=True, **dict(self.args, S=S - h))
+        self.assertAlmostEqual(float(g["gamma"]), float((s_up["delta"] - s_down["delta"]) / (2*h)), places=5)
+        self.assertAlmostEqual(float(g["vanna"]), float((up["delta"] - down["delta"]) / (2*h)), places=4)
+        self.assertAlmostEqual(float(g["volga"]), float((up["vega"] - down["vega"]) / (2*h)), places=3)
+    
+    def test_expired_greeks(self):
+        """Test expired options have step delta and no second-order Greeks"""
+        g = self.greeks.calculate_greeks([90.0, 110.0], 100.0, 0.0, 0.05, 0.2, True)
+        np.testing.assert_array_equal(g["delta"], [0.0, 1.0])
+        np.testing.assert_array_equal(g["gamma"], [0.0, 0.0])
+        np.testing.assert_array_equal(g["price"], [0.0, 10.0])
+
+class TestStrategyGreeks(unittest.TestCase):
+    """Test position Greeks aggregated over strategy legs"""
+    
+    def setUp(self):
+        self.factory = StrategyFactory()
+    
+    def test_base_price_greeks_are_floats(self):
+        """Test default call returns float Greeks at the base price"""
+        greeks = self.factory.create_strategy("C7").calculate_greeks()
+        for name in ("delta", "gamma", "vega", "theta", "rho", "vanna", "volga", "value"):
+            self.assertIsInstance(greeks[name], float)
+        self.assertGreater(greeks["delta"], 0.5)
+        self.assertGreater(greeks["gamma"], 0)
+    
+    def test_short_put_greeks_mirror_long_put(self):
+        """Test short legs flip the sign of every Greek"""
+        long_put = self.factory.create_strategy("P7").calculate_greeks()
+        short_put = self.factory.create_strategy("SP7").calculate_greeks()
+        for name, value in long_put.items():
+            self.assertAlmostEqual(short_put[name], -value)
+    
+    def test_grid_greeks_match_leg_sum(self):
+        """Test iron condor grid Greeks equal the sum of its four legs"""
+        strategy = self.factory.create_strategy("S19")
+        stock_prices = np.linspace(80, 120, 50)
+        greeks = strategy.calculate_greeks(stock_prices)
+        self.assertEqual(greeks["delta"].shape, (50,))
+        
+        calculator = GreeksCalculator()
+        expected = np.zeros(50)
+        for strike, is_call, quantity in zip(*strategy._get_legs()):
+            expected += quantity * calculator.calculate_greeks(
+                stock_prices, strike, strategy.time_to_expiration,
+                strategy.risk_free_rate, strategy.volatility, is_call)["gamma"]
+        np.testing.assert_array_almost_equal(greeks["gamma"], expected)
+        # Short body: the condor is short gamma at the money
+        self.assertLess(greeks["gamma"][25], 0)
+    
+    def test_grid_value_matches_payoff(self):
+        """Test the aggregated position value reproduces calculate_payoff"""
+        strategy = self.factory.create_strategy("S1")
+        stock_prices = np.linspace(80, 120, 20)
+        greeks = strategy.calculate_greeks(stock_prices, time_to_exp=0)
+        payoffs = strategy.calculate_payoff(stock_prices, 0)
+        np.testing.assert_array_almost_equal(greeks["value"] - strategy.get_initial_cost(), payoffs)
+
+class TestImpliedVolatilityCalculator(unittest.TestCase):
+    """Test batched implied volatility inversion"""
+    
+    def setUp(self):
+        self.pricer = BlackScholesCalculator()
+        self.solver = ImpliedVolatilityCalculator(self.pricer)
+    
+    def test_round_trip_chain(self):
+        """Test a whole chain of calls and puts recovers the pricing vols"""
+        rng = np.random.default_rng(7)
+        strikes = rng.uniform(70, 130, 500)
+        expiries = rng.uniform(0.05, 1.5, 500)
+        vols = rng.uniform(0.1, 0.9, 500)
+        is_call = rng.random(500) < 0.5
+        prices = self.pricer.calculate_option_prices(100.0, strikes, expiries, 0.03, vols, is_call)
+        
+        # Quotes with no time value left carry no volatility information
+        vega = GreeksCalculator(self.pricer).calculate_greeks(
+            100.0, strikes, expiries, 0.03, vols, is_call)["vega"]
+        informative = vega > 1e-3
+        
+        implied, converged = self.solver.solve(prices, 100.0, strikes, expiries, 0.03, is_call)
+        self.assertTrue(np.all(converged[informative]))
+        np.testing.assert_allclose(implied[informative], vols[informative], atol=1e-5)
+    
+    def test_arbitrage_violations_are_nan(self):
+        """Test quotes outside the no-arbitrage bounds and expired quotes give NaN"""
+        implied = self.solver.calculate_implied_volatility(
+            [150.0, 0.5, 5.0], 100.0, [100.0, 80.0, 100.0], [0.25, 0.25, 0.0], 0.05, True
+        )
+        self.assertTrue(np.all(np.isnan(implied)))
+
+    def test_deep_otm_quotes_recover_vol(self):
+        """Test quotes far below the price tolerance still solve to their own volatility"""
+        strikes = np.array([150.0, 160.0, 200.0])
+        expiries = np.array([30/365, 30/365, 0.1])
+        prices = self.pricer.calculate_option_prices(100.0, strikes, expiries, 0.03, 0.25, True)
+        self.assertLess(prices.max(), 1e-7)
+
+        implied, converged = self.solver.solve(prices, 100.0, strikes, expiries, 0.03, True)
+        self.assertTrue(np.all(converged))
+        np.testing.assert_allclose(implied, 0.25, atol=1e-5)
+
+    def test_strategy_calibration(self):
+        """Test a single-leg strategy can be calibrated to a market premium"""
+        strategy = StrategyFactory().create_strategy("SP7")
+        strategy.volatility = 0.4
+        premium = strategy.get_initial_cost()
+        strategy.volatility = 0.25
+        
+        self.assertAlmostEqual(strategy.calibrate_volatility(premium), 0.4, places=6)
+        self.assertAlmostEqual(strategy.get_initial_cost(), premium, places=8)
+    
+    def test_multi_leg_calibration_rejected(self):
+        """Test calibrating a spread raises because its implied vol is not unique"""
+        strategy = StrategyFactory().create_strategy("S19")
+        with self.assertRaises(ValueError):
+            strategy.calibrate_volatility(1.0)
+
 class TestStrategyFactory(unittest.TestCase):
     """Test strategy factory functionality"""
     
@@ -299,6 +504,773 @@ class TestSpreadStrategy(unittest.TestCase):
         self.assertLess(max_profit, 100)  # Reasonable upper bound
         self.assertGreater(max_loss, -100)  # Reasonable lower bound
 
+class TestPricingCache(unittest.TestCase):
+    """Test memoized entry cost and leg premiums"""
+    
+    def setUp(self):
+        self.factory = StrategyFactory()
+    
+    def test_payoff_grid_reuses_entry_cost(self):
+        """Test repeated payoff calls price the entry legs only once"""
+        strategy = self.factory.create_strategy("S19")
+        stock_prices = np.linspace(80, 120, 100)
+        for time_left in (0, 0.02, 0.05):
+            strategy.calculate_payoff(stock_prices, time_left)
+        
+        info = strategy.pricing_cache_info()
+        self.assertEqual(info.misses, 2)  # get_initial_cost + get_leg_premiums
+        self.assertEqual(info.hits, 2)
+    
+    def test_volatility_change_invalidates(self):
+        """Test scenario changes to volatility, rate and base price reprice the legs"""
+        strategy = self.factory.create_strategy("S1")
+        original = strategy.get_initial_cost()
+        
+        strategy.volatility = 0.40
+        self.assertNotAlmostEqual(strategy.get_initial_cost(), original)
+        strategy.volatility = 0.25
+        self.assertAlmostEqual(strategy.get_initial_cost(), original)
+        
+        strategy.risk_free_rate = 0.01
+        self.assertNotAlmostEqual(strategy.get_initial_cost(), original)
+        strategy.risk_free_rate = 0.05
+        strategy.base_price = 105.0
+        self.assertNotAlmostEqual(strategy.get_initial_cost(), original)
+    
+    def test_cached_cost_matches_scalar_pricing(self):
+        """Test cached premiums agree with the scalar Black-Scholes formulas"""
+        strategy = self.factory.create_strategy("S7")  # Bull put spread
+        calculator = BlackScholesCalculator()
+        args = (strategy.time_to_expiration, strategy.risk_free_rate, strategy.volatility)
+        long_premium = calculator.calculate_put_price(strategy.base_price, strategy.long_strike, *args)
+        short_premium = calculator.calculate_put_price(strategy.base_price, strategy.short_strike, *args)
+        self.assertAlmostEqual(strategy.get_initial_cost(), short_premium - long_premium)
+        self.assertAlmostEqual(strategy.get_initial_cost(), short_premium - long_premium)
+        self.assertEqual(strategy.pricing_cache_info().hits, 1)
+    
+    def test_clear_cache(self):
+        """Test clearing the cache resets statistics"""
+        strategy = self.factory.create_strategy("C7")
+        strategy.get_initial_cost()
+        strategy.clear_pricing_cache()
+        self.assertEqual(strategy.pricing_cache_info(), (0, 0, 0))
+
+class TestLegTable(unittest.TestCase):
+    """Test the columnar leg model and its valuation kernel"""
+    
+    def setUp(self):
+        self.calculator = BlackScholesCalculator()
+    
+    def test_intrinsic_value_matches_legs(self):
+        """Test expiry value of a call butterfly"""
+        legs = LegTable.from_legs([(CALL, 95, 1, 0.1, LONG), (CALL, 100, 2, 0.1, SHORT),
+                                   (CALL, 105, 1, 0.1, LONG)])
+        stock_prices = np.array([90.0, 95.0, 100.0, 105.0, 110.0])
+        np.testing.assert_array_almost_equal(legs.intrinsic_value(stock_prices)[:, 0], [0, 0, 5, 0, 0])
+        np.testing.assert_array_almost_equal(legs.value(stock_prices, elapsed=0.1)[:, 0], [0, 0, 5, 0, 0])
+    
+    def test_value_matches_scalar_pricing(self):
+        """Test each leg is priced with its own remaining time"""
+        legs = LegTable.from_legs([(PUT, 100, 1, 0.1, SHORT), (PUT, 100, 1, 0.3, LONG)])
+        value = legs.value(100.0, elapsed=0.05, volatility=0.2)[0]
+        expected = (self.calculator.calculate_put_price(100, 100, 0.25, 0.05, 0.2)
+                    - self.calculator.calculate_put_price(100, 100, 0.05, 0.05, 0.2))
+        self.assertAlmostEqual(value, expected)
+    
+    def test_book_of_positions(self):
+        """Test a concatenated book values each position separately in one call"""
+        factory = StrategyFactory()
+        strategies = [factory.create_strategy(code) for code in ("C7", "S1", "S19", "S22")]
+        book = LegTable.concatenate([strategy.legs for strategy in strategies])
+        self.assertEqual(book.n_positions, 4)
+        
+        stock_prices = np.linspace(80, 120, 30)
+        values = book.value(stock_prices, elapsed=0.0)
+        self.assertEqual(values.shape, (30, 4))
+        for i, strategy in enumerate(strategies):
+            expected = strategy.calculate_payoff(stock_prices, strategy.time_to_expiration)
+            np.testing.assert_array_almost_equal(values[:, i] - strategy.get_net_debit(), expected)
+        
+        subset = book.select([2, 0])
+        np.testing.assert_array_almost_equal(subset.value(stock_prices), values[:, [2, 0]])
+    
+    def test_invalid_columns_rejected(self):
+        """Test mismatched columns and unknown codes raise"""
+        with self.assertRaises(ValueError):
+            LegTable([CALL], [100.0, 105.0], [1], [0.1], [LONG])
+        with self.assertRaises(ValueError):
+            LegTable([2], [100.0], [1], [0.1], [LONG])
+
+class TestSpreadStructures(unittest.TestCase):
+    """Test every spread code compiles to its own leg structure"""
+    
+    def setUp(self):
+        self.factory = StrategyFactory()
+        self.stock_prices = np.linspace(60, 140, 161)
+    
+    def test_every_spread_has_a_structure(self):
+        """Test S1-S24 carry an explicit structure"""
+        for i in range(1, 25):
+            config = self.factory.get_strategy_info(f"S{i}")
+            self.assertNotEqual(config.structure, "")
+            self.assertGreaterEqual(self.factory.create_strategy(f"S{i}").legs.n_legs, 2)
+    
+    def test_iron_condor_keeps_class_and_strikes(self):
+        """Test Iron Condor codes still build IronCondorStrategy with ordered strikes"""
+        strategy = self.factory.create_strategy("S20")
+        self.assertIsInstance(strategy, IronCondorStrategy)
+        self.assertLess(strategy.put_long_strike, strategy.put_short_strike)
+        self.assertLess(strategy.call_short_strike, strategy.call_long_strike)
+        self.assertTrue(strategy.is_credit)
+    
+    def test_butterfly_payoff_shape(self):
+        """Test butterfly peaks at the body and loses the debit on the wings"""
+        strategy = self.factory.create_strategy("S22")
+        payoffs = strategy.calculate_payoff(self.stock_prices, 0)
+        cost = strategy.get_initial_cost()
+        self.assertFalse(strategy.is_credit)
+        self.assertAlmostEqual(payoffs[0], -cost)
+        self.assertAlmostEqual(payoffs[-1], -cost)
+        self.assertAlmostEqual(self.stock_prices[np.argmax(payoffs)], 100.0)
+    
+    def test_ratio_and_back_ratio_tails(self):
+        """Test ratio spreads lose on a rally and back ratios profit from one"""
+        ratio = self.factory.create_strategy("S15").calculate_payoff(self.stock_prices, 0)
+        back_ratio = self.factory.create_strategy("S17").calculate_payoff(self.stock_prices, 0)
+        self.assertLess(ratio[-1], ratio[len(ratio) // 2])
+        self.assertGreater(back_ratio[-1], back_ratio[len(back_ratio) // 2])
+    
+    def test_calendar_keeps_back_month_value(self):
+        """Test calendar payoff at front expiry includes the long back-month option"""
+        strategy = self.factory.create_strategy("S13")
+        expiries = strategy.legs.expiry
+        self.assertAlmostEqual(expiries[1], 2 * expiries[0])
+        payoffs = strategy.calculate_payoff(self.stock_prices, 0)
+        # Best outcome is the short strike pinned at front expiry
+        self.assertAlmostEqual(self.stock_prices[np.argmax(payoffs)], 100.0, delta=1.0)
+        self.assertGreater(payoffs.max(), 0)
+    
+    def test_hand_built_config_without_structure(self):
+        """Test configs built without a structure fall back to the catalogue name"""
+        config = StrategyConfig("X1", "Bear Put Spread - Near", "spread", "Mixed", "Near", "")
+        strategy = SpreadStrategy(config)
+        self.assertFalse(strategy.is_credit)
+        self.assertGreater(strategy.long_strike, strategy.short_strike)
+
+class TestBatchEvaluation(unittest.TestCase):
+    """Test catalogue-wide evaluation as one labelled tensor"""
+    
+    def setUp(self):
+        self.factory = StrategyFactory()
+        self.stock_prices = np.linspace(80, 120, 21)
+        self.times = np.array([0.0, 10/365, 30/365])
+        self.vols = np.array([0.15, 0.25, 0.40])
+    
+    def test_full_catalogue_shape(self):
+        """Test every strategy lands on its own slice with labelled axes"""
+        tensor = self.factory.evaluate_batch(stock_prices=self.stock_prices, times=self.times,
+                                             volatilities=self.vols)
+        self.assertEqual(tensor.shape, (84, 21, 3, 3))
+        self.assertEqual(tensor.codes, self.factory.list_strategies())
+        self.assertEqual(tensor.axis("volatility"), 3)
+        with self.assertRaises(KeyError):
+            tensor.sel("INVALID")
+    
+    def test_matches_per_strategy_payoff(self):
+        """Test slices equal calculate_payoff at the strategy's own volatility"""
+        tensor = self.factory.evaluate_batch(stock_prices=self.stock_prices, times=self.times,
+                                             volatilities=self.vols)
+        for code in ("C1", "SP7", "S1", "S13", "S19", "S24"):
+            strategy = self.factory.create_strategy(code)
+            for t, elapsed in enumerate(self.times):
+                expected = strategy.calculate_payoff(self.stock_prices,
+                                                     strategy.time_to_expiration - elapsed)
+                np.testing.assert_array_almost_equal(tensor.sel(code)[:, t, 1], expected)
+    
+    def test_filtered_subset_and_chunking(self):
+        """Test predicate filtering and that price chunking does not change results"""
+        is_short_put = lambda config: config.strategy_type == "short_put"
+        whole = self.factory.evaluate_batch(where=is_short_put, stock_prices=self.stock_prices,
+                                            times=self.times, volatilities=self.vols)
+        chunked = self.factory.evaluate_batch(where=is_short_put, stock_prices=self.stock_prices,
+                                              times=self.times, volatilities=self.vols,
+                                              max_chunk_elements=1)
+        self.assertEqual(len(whole.codes), 15)
+        self.assertTrue(all(code.startswith("SP") for code in whole.codes))
+        np.testing.assert_array_equal(whole.values, chunked.values)
+
+class TestPayoffSummary(unittest.TestCase):
+    """Test closed-form breakevens and max profit/loss"""
+    
+    def setUp(self):
+        self.factory = StrategyFactory()
+        self.analyzer = PayoffAnalyzer()
+    
+    def test_long_call_unbounded_profit(self):
+        """Test a long call breaks even at strike plus premium with loss capped at the premium"""
+        strategy = self.factory.create_strategy("C8")
+        summary = self.analyzer.summarize(strategy)
+        premium = strategy.get_net_debit()
+        self.assertFalse(summary.profit_bounded)
+        self.assertAlmostEqual(summary.max_loss, premium)
+        np.testing.assert_array_almost_equal(summary.breakevens, [strategy.strike_price + premium])
+    
+    def test_short_put_breakeven(self):
+        """Test a short put breaks even at strike minus premium"""
+        strategy = self.factory.create_strategy("SP8")
+        summary = self.analyzer.summarize(strategy)
+        credit = -strategy.get_net_debit()
+        self.assertAlmostEqual(summary.max_profit, credit)
+        self.assertAlmostEqual(summary.max_loss, strategy.strike_price - credit)
+        np.testing.assert_array_almost_equal(summary.breakevens, [strategy.strike_price - credit])
+    
+    def test_vertical_spread_bounds(self):
+        """Test a bull call spread risks the debit to make the width minus the debit"""
+        strategy = self.factory.create_strategy("S1")
+        summary = self.analyzer.summarize(strategy)
+        debit = strategy.get_net_debit()
+        width = strategy.short_strike - strategy.long_strike
+        self.assertAlmostEqual(summary.max_profit, width - debit)
+        self.assertAlmostEqual(summary.max_loss, debit)
+        np.testing.assert_array_almost_equal(summary.breakevens, [strategy.long_strike + debit])
+    
+    def test_iron_condor_two_breakevens(self):
+        """Test the iron condor breakevens sit at the short strikes shifted by the credit"""
+        strategy = self.factory.create_strategy("S19")
+        summary = self.analyzer.summarize(strategy)
+        credit = -strategy.get_net_debit()
+        np.testing.assert_array_almost_equal(
+            summary.breakevens, [strategy.put_short_strike - credit, strategy.call_short_strike + credit]
+        )
+        self.assertTrue(summary.profit_bounded and summary.loss_bounded)
+        self.assertAlmostEqual(summary.max_profit, credit)
+    
+    def test_calendar_is_refined_numerically(self):
+        """Test calendar breakevens are roots of the front-expiry P&L"""
+        strategy = self.factory.create_strategy("S13")
+        self.assertEqual(strategy.structure, "calendar")
+        summary = self.analyzer.summarize(strategy)
+        self.assertFalse(summary.exact)
+        self.assertEqual(len(summary.breakevens), 2)
+        np.testing.assert_array_almost_equal(strategy.calculate_payoff(summary.breakevens, 0),
+                                             [0.0, 0.0], decimal=6)
+    
+    def test_catalogue_matches_dense_grid(self):
+        """Test batch summaries of every strategy agree with a dense expiry grid"""
+        summaries = self.analyzer.summarize_catalogue(self.factory)
+        self.assertEqual(list(summaries), self.factory.list_strategies())
+        grid = np.linspace(0, 200, 20001)
+        for code, summary in summaries.items():
+            if not summary.exact:
+                continue
+            payoffs = self.factory.create_strategy(code).calculate_payoff(grid, 0)
+            if summary.profit_bounded:
+                self.assertAlmostEqual(summary.max_profit, payoffs.max(), places=6)
+            if summary.loss_bounded:
+                self.assertAlmostEqual(summary.max_loss, -payoffs.min(), places=6)
+
+class TestPnLSurface(unittest.TestCase):
+    """Test the lazily built, interpolated P&L surface"""
+    
+    def setUp(self):
+        self.strategy = StrategyFactory().create_strategy("S22")
+        rng = np.random.default_rng(7)
+        self.stock_prices = rng.uniform(70, 130, 2000)
+        self.times = rng.uniform(0, self.strategy.time_to_expiration, 2000)
+        self.vols = rng.uniform(0.1, 0.6, 2000)
+    
+    def test_matches_exact_pricing_within_tolerance(self):
+        """Test interpolated P&L agrees with calculate_payoff"""
+        surface = PnLSurface(self.strategy, tolerance=0.01)
+        for time_left in (0.0, self.strategy.time_to_expiration / 2):
+            np.testing.assert_allclose(surface.pnl(self.stock_prices, time_left),
+                                       self.strategy.calculate_payoff(self.stock_prices, time_left),
+                                       atol=0.01)
+        exact = np.array([self._exact(S, t, v) for S, t, v in
+                          zip(self.stock_prices[:50], self.times[:50], self.vols[:50])])
+        np.testing.assert_allclose(surface(self.stock_prices[:50], self.times[:50], self.vols[:50]),
+                                   exact, atol=0.01)
+    
+    def _exact(self, stock_price, time_left, vol):
+        original = self.strategy.volatility
+        net_debit = self.strategy.get_net_debit()
+        self.strategy.volatility = vol
+        try:
+            value = self.strategy.calculate_payoff(np.array([stock_price]), time_left)[0]
+            return value + self.strategy.get_net_debit() - net_debit
+        finally:
+            self.strategy.volatility = original
+    
+    def test_blocks_are_computed_once(self):
+        """Test repeated queries reuse cached blocks"""
+        surface = PnLSurface(self.strategy)
+        surface.pnl(self.stock_prices, self.times, self.vols)
+        first = surface.cache_info()
+        surface.pnl(self.stock_prices * 1.0001, self.times, self.vols)
+        second = surface.cache_info()
+        self.assertEqual(second.misses, first.misses)
+        self.assertGreater(second.hits, first.hits)
+    
+    def test_memory_budget_evicts_blocks(self):
+        """Test the LRU cache stays within its memory budget"""
+        surface = PnLSurface(self.strategy, memory_budget=50_000)
+        surface.pnl(self.stock_prices, self.times, self.vols)
+        info = surface.cache_info()
+        self.assertGreater(info.evictions, 0)
+        self.assertLessEqual(info.nbytes, 50_000)
+    
+    def test_outside_domain_is_priced_exactly(self):
+        """Test queries beyond the surface ranges fall back to exact pricing"""
+        surface = PnLSurface(self.strategy, spot_range=(90, 110))
+        prices = np.array([50.0, 150.0])
+        np.testing.assert_allclose(surface.pnl(prices), self.strategy.calculate_payoff(prices, 0))
+        self.assertEqual(surface.cache_info().misses, 0)
+
+    def test_single_leg_black_scholes_is_priced_exactly(self):
+        """Test a single Black-Scholes leg skips the surface, while a lattice-priced one keeps it"""
+        factory = StrategyFactory()
+        strategy = factory.create_strategy("SP1")
+        surface = PnLSurface(strategy)
+        self.assertTrue(surface.exact_only)
+        np.testing.assert_allclose(surface.pnl(self.stock_prices, 0.01),
+                                   strategy.calculate_payoff(self.stock_prices, 0.01))
+        self.assertEqual(surface.cache_info().currsize, 0)
+
+        self.assertFalse(PnLSurface(self.strategy).exact_only)
+        self.assertFalse(PnLSurface(factory.create_strategy("SP1", pricer=LatticeCalculator())).exact_only)
+
+    def test_visualization_reads_surface(self):
+        """Test scenario panels from a surface match exact re-pricing"""
+        surface = PnLSurface(self.strategy)
+        exact_viz = VisualizationEngine(self.strategy)
+        surface_viz = VisualizationEngine(self.strategy, surface=surface)
+        for time_left, vol in ((0.0, None), (self.strategy.time_to_expiration, 0.4)):
+            np.testing.assert_allclose(
+                surface_viz._scenario_payoff(self.stock_prices, time_left, vol),
+                exact_viz._scenario_payoff(self.stock_prices, time_left, vol), atol=0.01
+            )
+        self.assertGreater(surface.cache_info().misses, 0)
+
+class TestCurveExport(unittest.TestCase):
+    """Test exporting chart curves as columnar data"""
+    
+    def setUp(self):
+        import tempfile
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.factory = StrategyFactory()
+        self.exporter = CurveExporter(stock_range=(80, 120), n_prices=50)
+    
+    def test_npy_round_trip_is_memory_mapped(self):
+        """Test an npy export loads back memory-mapped and matches the engine"""
+        strategies = [self.factory.create_strategy(code) for code in ("S1", "S19")]
+        path = self.exporter.export(strategies, os.path.join(self.tmp.name, "curves"))
+        curves = CurveExporter.load(path)
+        self.assertEqual(curves.codes, ["S1", "S19"])
+        self.assertIsInstance(curves.time_decay, np.memmap)
+        self.assertEqual(curves.time_decay.shape, (2, 5, 50))
+        
+        prices = np.linspace(80, 120, 50)
+        iron_condor = curves.sel("S19")
+        np.testing.assert_allclose(iron_condor["expiration"], strategies[1].calculate_payoff(prices, 0))
+        expected = VisualizationEngine(strategies[1], output_dir=None).compute_curves(prices)
+        np.testing.assert_allclose(iron_condor["volatility"],
+                                   [payoffs for _, payoffs in expected["volatility"]])
+        with self.assertRaises(KeyError):
+            curves.sel("S999")
+    
+    def test_catalogue_csv(self):
+        """Test a catalogue CSV export writes one row per curve point"""
+        import csv
+        path = self.exporter.export_catalogue(self.factory, os.path.join(self.tmp.name, "curves.csv"),
+                                              codes=["S1", "S2", "S3"], format="csv")
+        with open(path, newline="") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ["code", "curve", "scenario", "stock_price", "pnl"])
+        self.assertEqual(len(rows) - 1, 3 * (1 + 5 + 5) * 50)
+    
+    def test_render_hands_curves_to_exporter(self):
+        """Test rendered charts export the curves they drew without re-pricing"""
+        from unittest import mock
+        exporter = CurveExporter()
+        strategies = [self.factory.create_strategy(code) for code in ("S1", "S19")]
+        with mock.patch.object(CurveExporter, "compute", side_effect=AssertionError("re-priced")):
+            for strategy in strategies:
+                VisualizationEngine(strategy, output_dir=None, exporter=exporter).render_bytes(dpi=20)
+            path = exporter.write(os.path.join(self.tmp.name, "rendered"))
+        
+        curves = CurveExporter.load(path)
+        self.assertEqual(curves.codes, ["S1", "S19"])
+        expected = self.exporter.compute(strategies)
+        self.assertEqual(curves.expiration.shape, (2, 100))
+        np.testing.assert_allclose(curves.sel("S19")["expiration"],
+                                   strategies[1].calculate_payoff(curves.stock_prices, 0))
+        np.testing.assert_allclose(curves.time_left, expected.time_left)
+        with self.assertRaises(ValueError):
+            exporter.add(strategies[0], np.linspace(80, 120, 50), expected.sel("S1"))
+    
+    def test_unknown_format_rejected(self):
+        """Test unsupported export formats raise ValueError"""
+        with self.assertRaises(ValueError):
+            self.exporter.export([self.factory.create_strategy("S1")], self.tmp.name, format="xlsx")
+
+class TestLazyImports(unittest.TestCase):
+    """Test the pricing, strategy and factory layers import without heavy modules"""
+    
+    def test_light_layers_skip_matplotlib_and_scipy_stats(self):
+        """Test a fresh interpreter importing the core layers loads neither"""
+        import subprocess
+        src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+        code = ("import sys; import option_analyzer, option_analyzer.pricing, "
+                "option_analyzer.strategies, option_analyzer.factory; "
+                "print(sorted(m for m in ('matplotlib', 'scipy.stats') if m in sys.modules))")
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                env=dict(os.environ, PYTHONPATH=src), check=True)
+        self.assertEqual(result.stdout.strip(), "[]")
+    
+    def test_curve_export_skips_matplotlib(self):
+        """Test data-only curve export never imports matplotlib"""
+        import subprocess
+        src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+        code = ("import sys; from option_analyzer import StrategyFactory; "
+                "from option_analyzer.visualization import CurveExporter; "
+                "CurveExporter().compute([StrategyFactory().create_strategy('S1')]); "
+                "print('matplotlib' in sys.modules)")
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                env=dict(os.environ, PYTHONPATH=src), check=True)
+        self.assertEqual(result.stdout.strip(), "False")
+    
+    def test_lazy_attributes_resolve(self):
+        """Test the lazily imported top-level names still resolve"""
+        import option_analyzer
+        self.assertIs(option_analyzer.VisualizationEngine, VisualizationEngine)
+        self.assertTrue(callable(option_analyzer.main))
+        self.assertIn('main', dir(option_analyzer))
+        with self.assertRaises(AttributeError):
+            option_analyzer.NoSuchThing
+
+class TestNormalKernels(unittest.TestCase):
+    """Test the scalar and array normal CDF/PDF kernels"""
+    
+    def test_known_values(self):
+        """Test norm_cdf/norm_pdf against reference values on both paths"""
+        from option_analyzer.pricing import norm_cdf, norm_pdf
+        points = [0.0, 1.96, -1.0, -10.0]
+        cdf = [0.5, 0.9750021048517795, 0.15865525393145707, 7.61985302416047e-24]
+        np.testing.assert_allclose(norm_cdf(np.array(points)), cdf, rtol=1e-14)
+        np.testing.assert_allclose([norm_cdf(x) for x in points], cdf, rtol=1e-13)
+        np.testing.assert_allclose([norm_pdf(x) for x in (0.0, 1.0)],
+                                   [0.3989422804014327, 0.24197072451914337], rtol=1e-15)
+        self.assertIsInstance(norm_cdf(0.3), float)
+    
+    def test_scalar_call_delta_matches_array_path(self):
+        """Test the scalar call delta agrees with calculate_delta, limits included"""
+        greeks = GreeksCalculator()
+        for args in ((100.0, 105.0, 0.25, 0.05, 0.2), (80.0, 100.0, 2.0, 0.01, 0.6),
+                     (100.0, 90.0, 0.0, 0.05, 0.2), (100.0, 102.0, 0.5, 0.05, 0.0)):
+            self.assertAlmostEqual(greeks.calculate_call_delta(*args),
+                                   float(greeks.calculate_delta(*args, True)), places=14)
+
+class TestLatticeCalculator(unittest.TestCase):
+    """Test the binomial/trinomial lattice pricer"""
+    
+    def test_european_trees_match_black_scholes(self):
+        """Test European trees converge to Black-Scholes prices, deltas and gammas"""
+        S = np.array([80.0, 100.0, 120.0])
+        is_call = np.array([True, False, True])
+        exact = GreeksCalculator().calculate_greeks(S, 100.0, 0.5, 0.05, 0.3, is_call)
+        for method in ("crr", "trinomial"):
+            tree = LatticeCalculator(method=method, american=False).calculate_greeks(
+                S, 100.0, 0.5, 0.05, 0.3, is_call)
+            np.testing.assert_allclose(tree["price"], exact["price"], atol=1e-3)
+            np.testing.assert_allclose(tree["delta"], exact["delta"], atol=1e-4)
+            np.testing.assert_allclose(tree["gamma"], exact["gamma"], atol=1e-4)
+    
+    def test_lattice_greeks_match_black_scholes_when_european(self):
+        """Test every bumped lattice Greek converges to its analytic value"""
+        S = np.array([80.0, 100.0, 120.0])
+        is_call = np.array([True, False, True])
+        exact = GreeksCalculator().calculate_greeks(S, 100.0, 0.5, 0.05, 0.3, is_call)
+        tree = LatticeGreeksCalculator(LatticeCalculator(american=False)).calculate_greeks(
+            S, 100.0, 0.5, 0.05, 0.3, is_call)
+        self.assertEqual(set(tree), set(exact))
+        for name in exact:
+            np.testing.assert_allclose(tree[name], exact[name], rtol=0.05 if name == "volga" else 2e-3,
+                                       atol=2e-3, err_msg=name)
+    
+    def test_strategy_greeks_follow_american_pricer(self):
+        """Test calculate_greeks values a lattice-priced position like calculate_payoff"""
+        strategy = StrategyFactory().create_strategy("P1", pricer=LatticeCalculator())
+        greeks = strategy.calculate_greeks()
+        marked = strategy.calculate_payoff(np.array([strategy.base_price]), strategy.time_to_expiration)[0]
+        self.assertAlmostEqual(greeks["value"], marked + strategy.get_net_debit(), places=9)
+        european = StrategyFactory().create_strategy("P1").calculate_greeks()
+        self.assertGreater(greeks["value"], european["value"] + 0.1)
+        self.assertLess(greeks["delta"], european["delta"])
+    
+    def test_american_put_reference_values(self):
+        """Test American puts against the Longstaff-Schwartz benchmark values"""
+        for method in ("crr", "trinomial"):
+            lattice = LatticeCalculator(method=method)
+            self.assertAlmostEqual(lattice.calculate_put_price(36, 40, 1, 0.06, 0.2), 4.4867, places=2)
+            self.assertAlmostEqual(lattice.calculate_put_price(44, 40, 2, 0.06, 0.4), 5.647, places=2)
+            # Without dividends early exercise of a call is never optimal
+            self.assertAlmostEqual(lattice.calculate_call_price(100, 100, 1, 0.05, 0.2),
+                                   BlackScholesCalculator().calculate_call_price(100, 100, 1, 0.05, 0.2),
+                                   places=3)
+    
+    def test_batch_shapes_and_limits(self):
+        """Test broadcasting, chunking and the expired/zero-vol limits"""
+        lattice = LatticeCalculator(steps=50, max_batch_nodes=200)
+        prices = lattice.calculate_option_prices(np.linspace(80, 120, 12).reshape(3, 4), 100.0,
+                                                 [[0.25], [0.5], [1.0]], 0.05, 0.25, False)
+        self.assertEqual(prices.shape, (3, 4))
+        single = [lattice.calculate_put_price(S, 100.0, T, 0.05, 0.25)
+                  for T, row in zip((0.25, 0.5, 1.0), np.linspace(80, 120, 12).reshape(3, 4)) for S in row]
+        np.testing.assert_allclose(prices.ravel(), single)
+        np.testing.assert_allclose(lattice.calculate_option_prices(90.0, 100.0, [0.0, 0.5], 0.05, [0.2, 0.0], False),
+                                   [10.0, 10.0])
+        with self.assertRaises(ValueError):
+            LatticeCalculator(steps=7)
+    
+    def test_strategy_uses_lattice_pricer(self):
+        """Test a short put priced on the lattice collects the early-exercise premium"""
+        factory = StrategyFactory()
+        european = factory.create_strategy("SP8")
+        american = factory.create_strategy("SP8", pricer=LatticeCalculator())
+        self.assertIsInstance(american.calculator, LatticeCalculator)
+        self.assertLess(american.get_net_debit(), european.get_net_debit())
+        grid = np.linspace(80, 120, 9)
+        halfway = american.time_to_expiration / 2
+        # The short position's mark-to-market value is lower when the put is American
+        american_value = american.calculate_payoff(grid, halfway) + american.get_net_debit()
+        european_value = european.calculate_payoff(grid, halfway) + european.get_net_debit()
+        self.assertTrue(np.all(american_value <= european_value + 1e-9))
+        tensor = factory.evaluate_batch(["SP8"], stock_prices=grid, pricer=LatticeCalculator(steps=50))
+        self.assertEqual(tensor.values.shape, (1, 9, 1, 1))
+
+class TestMonteCarloEngine(unittest.TestCase):
+    """Test the chunked Monte Carlo pricer and path P&L simulator"""
+    
+    def setUp(self):
+        self.S = np.array([80.0, 100.0, 120.0])
+        self.is_call = np.array([True, False, True])
+        self.exact = BlackScholesCalculator().calculate_option_prices(self.S, 100.0, 0.5, 0.05, 0.3,
+                                                                       self.is_call)
+    
+    def test_estimates_match_black_scholes(self):
+        """Test pseudo-random and Sobol estimates agree with Black-Scholes"""
+        for sobol in (False, True):
+            estimate = MonteCarloEngine(n_paths=100_000, sobol=sobol).estimate(
+                self.S, 100.0, 0.5, 0.05, 0.3, self.is_call)
+            self.assertEqual(estimate.n_paths, 100_000)
+            np.testing.assert_array_less(np.abs(estimate.price - self.exact), 5 * estimate.std_error + 1e-3)
+    
+    def test_variance_reduction(self):
+        """Test antithetic and control variates shrink the standard error"""
+        plain = MonteCarloEngine(n_paths=50_000, antithetic=False, control_variate=False)
+        reduced = MonteCarloEngine(n_paths=50_000)
+        args = (self.S, 100.0, 0.5, 0.05, 0.3, self.is_call)
+        self.assertTrue(np.all(reduced.estimate(*args).std_error < plain.estimate(*args).std_error / 2))
+    
+    def test_chunks_stream_and_reproduce_across_workers(self):
+        """Test running estimates stream per chunk and the result ignores worker count"""
+        args = (self.S, 100.0, 0.5, 0.05, 0.3, self.is_call)
+        serial = MonteCarloEngine(n_paths=20_000, max_chunk_elements=6_000)
+        running = list(serial.iter_estimates(*args))
+        self.assertGreater(len(running), 1)
+        self.assertEqual([e.n_paths for e in running], sorted(e.n_paths for e in running))
+        pooled = MonteCarloEngine(n_paths=20_000, max_chunk_elements=6_000, workers=2).estimate(*args)
+        np.testing.assert_array_equal(pooled.price, running[-1].price)
+    
+    def test_strategy_pnl_along_paths(self):
+        """Test simulated iron condor P&L agrees with the expiry payoff distribution"""
+        strategy = StrategyFactory().create_strategy("S19")
+        result = MonteCarloEngine(n_paths=20_000, max_chunk_elements=200_000).strategy_pnl(strategy, n_steps=10)
+        self.assertEqual(result.n_paths, 20_000)
+        self.assertEqual(result.mean.shape, (11,))
+        self.assertAlmostEqual(result.mean[0], strategy.calculate_payoff(np.array([100.0]),
+                                                                         strategy.time_to_expiration)[0])
+        self.assertTrue(np.all(result.minimum <= result.final) and np.all(result.final <= result.maximum))
+        payoff = strategy.calculate_payoff(np.linspace(50, 150, 1001), 0)
+        self.assertLessEqual(result.final.max(), payoff.max() + 1e-9)
+        self.assertGreaterEqual(result.final.min(), payoff.min() - 1e-9)
+        self.assertAlmostEqual(result.mean[-1], result.final.mean())
+
+class TestFourierCalculator(unittest.TestCase):
+    """Test the Carr-Madan FFT pricer and its models"""
+    
+    def setUp(self):
+        self.strikes = np.linspace(60, 160, 21)
+        self.bs = BlackScholesCalculator()
+    
+    def test_geometric_brownian_model_matches_black_scholes(self):
+        """Test the constant-volatility model reproduces Black-Scholes calls and puts"""
+        fourier = FourierCalculator(GeometricBrownianModel(0.25))
+        for T in (1 / 12, 0.5, 2.0):
+            for is_call in (True, False):
+                np.testing.assert_allclose(
+                    fourier.calculate_option_prices(100.0, self.strikes, T, 0.05, 0.0, is_call),
+                    self.bs.calculate_option_prices(100.0, self.strikes, T, 0.05, 0.25, is_call), atol=1e-5)
+    
+    def test_merton_matches_series_solution(self):
+        """Test Merton prices against the Poisson-weighted Black-Scholes series"""
+        import math
+        model = MertonModel(sigma=0.2, jump_intensity=0.8, jump_mean=-0.1, jump_std=0.2)
+        T, r = 0.5, 0.03
+        k = math.exp(model.jump_mean + model.jump_std**2 / 2) - 1
+        intensity = model.jump_intensity * (1 + k)
+        series = sum(
+            math.exp(-intensity * T) * (intensity * T)**n / math.factorial(n)
+            * self.bs.calculate_option_prices(
+                100.0, self.strikes, T, r - model.jump_intensity * k + n * math.log(1 + k) / T,
+                math.sqrt(model.sigma**2 + n * model.jump_std**2 / T), False)
+            for n in range(60)
+        )
+        np.testing.assert_allclose(FourierCalculator(model).calculate_option_prices(
+            100.0, self.strikes, T, r, 0.0, False), series, atol=1e-5)
+    
+    def test_heston_and_variance_gamma_reference_prices(self):
+        """Test Heston and VG calls against direct numerical integration"""
+        strikes = [80.0, 100.0, 120.0]
+        np.testing.assert_allclose(
+            FourierCalculator(HestonModel()).calculate_option_prices(100.0, strikes, 1.0, 0.05, 0.0, True),
+            [25.23676411, 10.15462703, 1.73823236], atol=1e-5)
+        np.testing.assert_allclose(
+            FourierCalculator(VarianceGammaModel()).calculate_option_prices(100.0, strikes, 1.0, 0.05, 0.0, True),
+            [24.94186114, 10.65696423, 3.09809988], atol=1e-5)
+    
+    def test_strategy_legs_priced_from_cached_grids(self):
+        """Test strategies price their legs from one cached grid per expiry"""
+        fourier = FourierCalculator(HestonModel(), cache_size=4)
+        strategy = StrategyFactory().create_strategy("S19", pricer=fourier)
+        legs = strategy.legs
+        np.testing.assert_allclose(strategy.get_leg_premiums(), [
+            fourier.calculate_option_prices(100.0, K, T, 0.05, 0.0, call)
+            for K, T, call in zip(legs.strike, legs.expiry, legs.is_call)])
+        self.assertEqual(len(fourier._grids), 1)
+        strategy.calculate_payoff(np.linspace(80, 120, 50), strategy.time_to_expiration / 2)
+        self.assertEqual(len(fourier._grids), 2)
+        fourier.calculate_option_prices(100.0, 100.0, np.linspace(0.1, 1, 10), 0.05, 0.0, True)
+        self.assertEqual(len(fourier._grids), 4)
+        strikes, calls = fourier.price_strike_grid(100.0, 0.5, 0.05)
+        self.assertEqual(len(strikes), fourier.n)
+        np.testing.assert_allclose(np.interp([90.0, 110.0], strikes, calls),
+                                   fourier.calculate_option_prices(100.0, [90.0, 110.0], 0.5, 0.05, 0.0, True),
+                                   atol=1e-2)
+
+class TestMomentAnalyzer(unittest.TestCase):
+    """Test closed-form moments of expiry P&L"""
+    
+    def setUp(self):
+        self.factory = StrategyFactory()
+        self.analyzer = MomentAnalyzer()
+        self.moments = self.analyzer.moments_catalogue(self.factory, base_prices=[90.0, 100.0],
+                                                       volatilities=[0.15, 0.25, 0.4])
+    
+    def test_catalogue_shapes_and_calendars(self):
+        """Test the catalogue grid shape and that calendars are flagged inexact"""
+        self.assertEqual(self.moments.mean.shape, (84, 2, 3))
+        calendars = [code for code, exact in zip(self.moments.codes, self.moments.exact) if not exact]
+        self.assertEqual(calendars, ["S13", "S14"])
+        self.assertEqual(self.moments.sel("C1")["kurtosis"].shape, (2, 3))
+        ranking = self.moments.rank("kurtosis")
+        self.assertEqual(sorted(ranking), sorted(self.moments.codes))
+        values = self.moments.kurtosis[:, 0, 0]
+        self.assertEqual(ranking[0], self.moments.codes[int(np.nanargmax(values))])
+    
+    def test_risk_neutral_mean_grows_premium_at_the_rate(self):
+        """Test E[payoff] = premium * e^{rT} for every single-expiry position"""
+        for code in ("C1", "SP7", "S4", "S19", "S22"):
+            strategy = self.factory.create_strategy(code)
+            expected = strategy.get_net_debit() * np.expm1(strategy.risk_free_rate * strategy.time_to_expiration)
+            self.assertAlmostEqual(self.analyzer.moments(strategy)["mean"], expected, places=10)
+    
+    def test_analytic_matches_quadrature(self):
+        """Test the analytic segment sums agree with piecewise Gauss-Legendre integration"""
+        _, book, _ = self.factory.create_book(["C1", "SP7", "S19", "S4"])
+        vols = np.array([0.15, 0.4])
+        analytic = self.analyzer._lognormal_moments(book, 100.0, vols)
+        quadrature = self.analyzer._quadrature_moments(book, 100.0, vols)
+        for exact, integrated in zip(analytic, quadrature):
+            np.testing.assert_allclose(exact, integrated, rtol=1e-7, atol=1e-9)
+    
+    def test_user_supplied_distribution(self):
+        """Test a discretized lognormal reproduces the analytic moments"""
+        strategy = self.factory.create_strategy("S19")
+        T, sigma = strategy.time_to_expiration, strategy.volatility
+        z = np.linspace(-9, 9, 200_001)
+        relative = np.exp((strategy.risk_free_rate - 0.5 * sigma**2) * T + sigma * np.sqrt(T) * z)
+        discrete = self.analyzer.moments(strategy, (relative, np.exp(-0.5 * z**2)))
+        for name, value in self.analyzer.moments(strategy).items():
+            self.assertAlmostEqual(discrete[name], value, places=4)
+
+class TestProbabilityAnalyzer(unittest.TestCase):
+    """Test closed-form probability of profit, expected P&L and shortfall"""
+    
+    def setUp(self):
+        self.factory = StrategyFactory()
+        self.analyzer = ProbabilityAnalyzer()
+    
+    def test_long_call_matches_black_scholes(self):
+        """Test a long call profits exactly when S_T exceeds its breakeven"""
+        strategy = self.factory.create_strategy("C1")
+        T, sigma = strategy.time_to_expiration, strategy.volatility
+        breakeven = strategy.legs.strike[0] + strategy.get_net_debit()
+        d2 = (np.log(strategy.base_price / breakeven) + (strategy.risk_free_rate - 0.5 * sigma**2) * T) \
+            / (sigma * np.sqrt(T))
+        results = self.analyzer.analyze(strategy)
+        self.assertAlmostEqual(results["probability_of_profit"], norm_cdf(d2), places=10)
+        expected = strategy.get_net_debit() * np.expm1(strategy.risk_free_rate * T)
+        self.assertAlmostEqual(results["expected_pnl"], expected, places=10)
+        # The worst 5% of outcomes lose the whole premium
+        self.assertAlmostEqual(results["expected_shortfall"], strategy.get_net_debit(), places=8)
+    
+    def test_matches_simulation(self):
+        """Test spreads, condors and calendars against simulated expiry P&L"""
+        rng = np.random.default_rng(7)
+        z = rng.standard_normal(400_000)
+        for code in ("SP7", "S19", "S13"):
+            strategy = self.factory.create_strategy(code)
+            front = float(strategy.legs.expiry.min())
+            sigma = strategy.volatility
+            terminal = strategy.base_price * np.exp((0.05 - 0.5 * sigma**2) * front + sigma * np.sqrt(front) * z)
+            legs = strategy.legs
+            shifted = LegTable(legs.option_type, legs.strike, legs.quantity, legs.expiry - front,
+                               legs.side, legs.position)
+            pnl = shifted.value(terminal, 0.0, 0.05, sigma)[:, 0] - strategy.get_net_debit()
+            tail = np.sort(pnl)[:len(pnl) // 20]
+            results = self.analyzer.analyze(strategy)
+            self.assertAlmostEqual(results["probability_of_profit"], np.mean(pnl > 0), delta=0.005)
+            self.assertAlmostEqual(results["expected_shortfall"], -tail.mean(), delta=0.05)
+    
+    def test_touch_probability(self):
+        """Test touch probabilities against the driftless reflection principle"""
+        analyzer = ProbabilityAnalyzer(drift=0.5 * 0.2**2)
+        touch = analyzer.touch_probability(100.0, [80.0, 100.0, 125.0], 0.5, 0.2)
+        s = 0.2 * np.sqrt(0.5)
+        np.testing.assert_allclose(touch, [2 * norm_cdf(np.log(0.8) / s), 1.0,
+                                           2 * norm_cdf(-np.log(1.25) / s)], rtol=1e-10)
+        # A real-world drift upward makes the upper strike more likely to be touched
+        bullish = ProbabilityAnalyzer(drift=0.3).touch_probability(100.0, 125.0, 0.5, 0.2)
+        self.assertGreater(bullish, touch[2])
+    
+    def test_catalogue(self):
+        """Test the whole registry in one batch"""
+        results = self.analyzer.analyze_catalogue(self.factory, base_prices=[90.0, 100.0],
+                                                  volatilities=[0.2, 0.3])
+        self.assertEqual(results.probability_of_profit.shape, (84, 2, 2))
+        self.assertEqual(results.touch_probability.shape, (len(results.leg_position), 2, 2))
+        self.assertTrue(np.all((results.probability_of_profit >= 0) & (results.probability_of_profit <= 1)))
+        self.assertTrue(np.all((results.touch_probability >= 0) & (results.touch_probability <= 1)))
+        self.assertEqual([code for code, exact in zip(results.codes, results.exact) if not exact],
+                         ["S13", "S14"])
+        iron_condor = results.sel("S19")
+        self.assertEqual(iron_condor["strikes"].shape, (4, 2))
+        self.assertEqual(results.rank()[0], results.codes[int(np.argmax(results.probability_of_profit[:, 0, 0]))])
+        with self.assertRaises(KeyError):
+            results.sel("nope")
+
 class TestMoneyness(unittest.TestCase):
     """Test that moneyness is correctly implemented"""
     
@@ -354,6 +1326,103 @@ class TestVisualizationEngine(unittest.TestCase):
         # Verify that matplotlib show was called
         mock_show.assert_called_once()
     
+    @patch('matplotlib.pyplot.show')
+    def test_batch_rendering_closes_figures(self, mock_show):
+        """Test headless rendering neither shows nor leaks figures"""
+        import tempfile
+        import matplotlib.pyplot as plt
+        with tempfile.TemporaryDirectory() as output_dir:
+            viz = VisualizationEngine(self.strategy, output_dir)
+            path = viz.generate_full_analysis(show=False, dpi=50)
+            self.assertTrue(os.path.exists(path))
+        mock_show.assert_not_called()
+        self.assertEqual(plt.get_fignums(), [])
+    
+    def test_plot_cache_skips_unchanged_renders(self):
+        """Test identical inputs reuse the indexed plot and changed inputs re-render"""
+        import tempfile
+        with tempfile.TemporaryDirectory() as output_dir:
+            viz = VisualizationEngine(self.strategy, output_dir, cache=PlotCache(output_dir))
+            path = viz.generate_full_analysis(show=False, dpi=50)
+            self.assertIn(os.path.basename(path), viz.cache.load_index())
+            
+            with patch('matplotlib.pyplot.subplots') as mock_subplots:
+                self.assertEqual(viz.generate_full_analysis(show=False, dpi=50), path)
+                mock_subplots.assert_not_called()
+            
+            first_key = viz.render_key(dpi=50)
+            self.strategy.volatility = 0.30
+            self.assertNotEqual(viz.render_key(dpi=50), first_key)
+            self.assertIsNone(viz.cache.lookup(os.path.basename(path), viz.render_key(dpi=50)))
+    
+    def test_figure_template_is_reused(self):
+        """Test a template renders several strategies on one figure with fresh data"""
+        import tempfile
+        import matplotlib.pyplot as plt
+        template = FigureTemplate()
+        factory = StrategyFactory()
+        try:
+            with tempfile.TemporaryDirectory() as output_dir:
+                for code in ("SP7", "S19"):
+                    viz = VisualizationEngine(factory.create_strategy(code), output_dir)
+                    path = viz.generate_full_analysis(show=False, dpi=50, template=template)
+                    self.assertTrue(os.path.exists(path))
+                self.assertEqual(plt.get_fignums(), [template.fig.number])
+            
+            stock_prices = np.linspace(80, 120, 100)
+            np.testing.assert_allclose(template.expiration_line.get_ydata(),
+                                       viz.compute_curves(stock_prices)["expiration"])
+            self.assertIn("S19", template.title.get_text())
+            self.assertEqual(len(template.fills), 2)
+        finally:
+            template.close()
+
+    def test_figure_template_relayouts_when_labels_grow(self):
+        """Test wider tick labels move the panels and recrop, narrower ones keep the layout"""
+        import io
+        template = FigureTemplate()
+        stock_prices = np.linspace(80, 120, 100)
+
+        def draw(scale, title):
+            payoffs = (stock_prices - 100) * scale
+            curves = {"expiration": payoffs,
+                      "time_decay": [(f"{i} days", payoffs) for i in range(5)],
+                      "volatility": [(f"IV = {i}%", payoffs) for i in range(5)]}
+            template.draw(title, stock_prices, 100.0, curves, "Net Debit: $1.00")
+            template.save(io.BytesIO(), dpi=20)
+            return template.ax_expiration.get_position().x0, template._bbox_inches
+
+        try:
+            narrow_x0, narrow_bbox = draw(1.0, "S1")
+            wide_x0, wide_bbox = draw(1e4, "S1")
+            self.assertGreater(wide_x0, narrow_x0)
+            self.assertIsNot(wide_bbox, narrow_bbox)
+            self.assertEqual(draw(1.0, "S1"), (wide_x0, wide_bbox))
+        finally:
+            template.close()
+
+    def test_output_profiles(self):
+        """Test vector, preview and in-memory thumbnail outputs with per-profile timings"""
+        import tempfile
+        with tempfile.TemporaryDirectory() as output_dir:
+            viz = VisualizationEngine(self.strategy, output_dir)
+            svg_path = viz.generate_full_analysis(show=False, profile="svg")
+            self.assertTrue(svg_path.endswith("SP7_analysis.svg"))
+            with open(svg_path) as f:
+                self.assertIn("<svg", f.read(2000))
+            preview_path = viz.generate_full_analysis(show=False, profile="preview")
+            self.assertTrue(preview_path.endswith("SP7_analysis_preview.png"))
+            
+            before = set(os.listdir(output_dir))
+            thumbnail = viz.render_bytes()
+            self.assertEqual(set(os.listdir(output_dir)), before)
+        self.assertTrue(thumbnail.startswith(b"\x89PNG"))
+        self.assertEqual([timing.profile for timing in viz.render_timings],
+                         ["svg", "preview", "thumbnail"])
+        self.assertEqual(viz.render_timings[-1].nbytes, len(thumbnail))
+        with self.assertRaises(ValueError):
+            viz.render_bytes(profile="poster")
+    
     def test_visualization_engine_creation(self):
         """Test that visualization engine can be created"""
         self.assertIsNotNone(self.viz)